@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+import argparse
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+from overview import align_ponds, overview_stats, pond_arrays  # noqa: E402
+from retrieve import SENSOR_COLS  # noqa: E402
+
+# bench_overview.py
+# Benchmarks the data preparation of the "Aggregate Overview" page against the number of ponds:
+#   - loop: the previous per-sensor, per-pond positional alignment with pd.DataFrame(aligned).T and row-wise min/median/max
+#   - cube: one as-of join to a ponds x time x sensor array, reduced across ponds once for all sensors
+# Chart rendering is the same for both and is not included.
+#
+# Usage (from apps/dashboard_app):
+#   python benchmarks/bench_overview.py --ponds 4 16 50 100 --window 100 1000
+
+
+def make_pond(rng: np.random.Generator, rows: int) -> pd.DataFrame:
+    # One reading every ~5 s with jitter, like the sensor feed; Ponds are not synchronised
+    start = pd.Timestamp("2024-01-01") + pd.Timedelta(seconds=float(rng.uniform(0, 5)))
+    times = start + pd.to_timedelta(np.cumsum(rng.uniform(4, 6, rows)), unit="s")
+    values = rng.normal(size=(rows, len(SENSOR_COLS)))
+    return pd.DataFrame({"created_at": times, **dict(zip(SENSOR_COLS, values.T))})
+
+def build_loop(pond_dfs: list[pd.DataFrame], base_df: pd.DataFrame) -> list[pd.DataFrame]:
+    charts = []
+    for col in SENSOR_COLS:
+        aligned = []
+        for df in pond_dfs:
+            aligned.append(df.loc[base_df.index, col].values)
+
+        agg_df = pd.DataFrame(aligned).T
+        charts.append(pd.DataFrame({
+            "created_at": base_df["created_at"],
+            "min": agg_df.min(axis=1),
+            "median": agg_df.median(axis=1),
+            "max": agg_df.max(axis=1),
+        }))
+    return charts
+
+def build_cube(pond_dfs: list[pd.DataFrame], base_df: pd.DataFrame) -> list[pd.DataFrame]:
+    ponds = [pond_arrays(f"pond_{i}", df, SENSOR_COLS) for i, df in enumerate(pond_dfs)]
+    time_index = base_df["created_at"].to_numpy()
+    stats = overview_stats(align_ponds(ponds, time_index))
+    return [
+        pd.DataFrame({"created_at": time_index, "min": stats["min"][:, i], "median": stats["median"][:, i], "max": stats["max"][:, i]})
+        for i in range(len(SENSOR_COLS))
+    ]
+
+def median_ms(function, repeats: int, *args) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function(*args)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--ponds", type=int, nargs="+", default=[4, 16, 50, 100])
+    parser.add_argument("--window", type=int, nargs="+", default=[100, 1000])
+    parser.add_argument("--rows", type=int, default=200000, help="Rows per pond")
+    parser.add_argument("--repeats", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    all_ponds = [make_pond(rng, args.rows) for _ in range(max(args.ponds))]
+
+    print(f"{'ponds':>6} {'window':>7} {'loop ms':>9} {'cube ms':>9} {'speedup':>8}")
+    for window in args.window:
+        for n_ponds in args.ponds:
+            pond_dfs = all_ponds[:n_ponds]
+            base_df = pond_dfs[0].iloc[args.rows // 2:args.rows // 2 + window]
+
+            # Array extraction is cached per frame on the page; Warm it like a refresh without new rows
+            build_cube(pond_dfs, base_df)
+
+            loop = median_ms(build_loop, args.repeats, pond_dfs, base_df)
+            cube = median_ms(build_cube, args.repeats, pond_dfs, base_df)
+            print(f"{n_ponds:>6} {window:>7} {loop:>9.2f} {cube:>9.2f} {loop / cube:>7.1f}x")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+import numpy as np
+
+# Smoothing of the level and of the trend (Holt's linear method)
+ALPHA = 0.3
+BETA = 0.05
+
+
+class HoltForecaster:
+    """
+    Holt's linear exponential smoothing (level + trend) for every pond and sensor at once.
+
+    State is a (ponds, sensors) array per term, so one update step covers all series. Rows are consumed incrementally:
+    `update()` only runs the rows with a created_at after the last one consumed for each pond. Progress is tracked by
+    time rather than row index, since sources trim and re-sort their frames. A pond is re-warmed on its newest `warmup`
+    rows when its end time moves backwards (e.g. a replay wrapping around) or more than `warmup` rows are new.
+    """
+
+    def __init__(self, n_ponds: int, n_sensors: int, alpha: float = ALPHA, beta: float = BETA, warmup: int = 100):
+        self.alpha = alpha
+        self.beta = beta
+        self.warmup = warmup
+
+        self.level = np.full((n_ponds, n_sensors), np.nan)
+        self.trend = np.zeros((n_ponds, n_sensors))
+        self.variance = np.zeros((n_ponds, n_sensors))      # Exponentially weighted one-step-ahead squared error
+        self.last_time = np.zeros(n_ponds, dtype=np.int64)  # created_at of the last row consumed per pond; 0 before any
+        self.interval = np.full(n_ponds, np.nan)             # Exponentially weighted time between rows, in ns
+
+    def update(self, ponds: list[tuple[np.ndarray, np.ndarray]], end_times: list[int]):
+        """
+        Consumes each pond's rows up to and including the created_at `end_times[p]`.
+
+        :param ponds: Per pond, created_at as sorted int64 ns and sensor values as a (rows, sensors) array
+        :param end_times: Per pond, created_at of the newest row to use, as int64 ns
+        """
+        batches = []
+        for p, ((times, values), end_time) in enumerate(zip(ponds, end_times)):
+            end = int(np.searchsorted(times, end_time, side="right"))
+            start = int(np.searchsorted(times, self.last_time[p], side="right"))
+            if self.last_time[p] == 0 or end_time < self.last_time[p] or end - start > self.warmup:
+                self._reset(p)
+                start = max(end - self.warmup, 0)
+            batches.append((times[start:end], values[start:end]))
+
+        steps = max(len(times) for times, _ in batches)
+        if steps == 0:
+            return
+
+        # Pad to (ponds, steps, sensors); Ponds with fewer new rows skip the trailing steps
+        x = np.full((len(batches), steps, self.level.shape[1]), np.nan)
+        t = np.zeros((len(batches), steps), dtype=np.int64)
+        has_row = np.zeros((len(batches), steps), dtype=bool)
+        for p, (times, values) in enumerate(batches):
+            x[p, :len(times)] = values
+            t[p, :len(times)] = times
+            has_row[p, :len(times)] = True
+
+        for i in range(steps):
+            self._step(x[:, i], t[:, i], has_row[:, i])
+
+    def _step(self, x: np.ndarray, t: np.ndarray, has_row: np.ndarray):
+        observed = ~np.isnan(x)
+        first = observed & np.isnan(self.level)
+        smooth = observed & ~first
+
+        predicted = self.level + self.trend
+        error = x - predicted
+        level = self.alpha * x + (1 - self.alpha) * predicted
+        trend = self.beta * (level - self.level) + (1 - self.beta) * self.trend
+
+        self.variance = np.where(smooth, (1 - self.alpha) * self.variance + self.alpha * error ** 2, self.variance)
+        self.trend = np.where(smooth, trend, self.trend)
+        self.level = np.where(smooth, level, np.where(first, x, self.level))
+
+        # Sampling interval, to place the forecast timestamps
+        seen = has_row & (self.last_time != 0)
+        gap = (t - self.last_time).astype(np.float64)
+        self.interval = np.where(seen & np.isnan(self.interval), gap, self.interval)
+        self.interval = np.where(seen, (1 - self.alpha) * self.interval + self.alpha * gap, self.interval)
+        self.last_time = np.where(has_row, t, self.last_time)
+
+    def _reset(self, p: int):
+        self.level[p] = np.nan
+        self.trend[p] = 0.0
+        self.variance[p] = 0.0
+        self.last_time[p] = 0
+        self.interval[p] = np.nan
+
+    def forecast(self, horizon: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Forecasts the next `horizon` rows of every pond and sensor.
+
+        :return: Values and standard deviations of shape (ponds, horizon, sensors), and times of shape (ponds, horizon)
+            as datetime64[ns]
+        """
+        h = np.arange(1, horizon + 1)
+        values = self.level[:, None, :] + h[None, :, None] * self.trend[:, None, :]
+
+        # Forecast variance of the additive-trend model: sigma^2 * (1 + (h-1) * (a^2 + a*b*h + b^2*h*(2h-1)/6)), b = a*beta
+        a, b = self.alpha, self.alpha * self.beta
+        factor = 1 + (h - 1) * (a ** 2 + a * b * h + b ** 2 * h * (2 * h - 1) / 6)
+        stds = np.sqrt(self.variance[:, None, :] * factor[None, :, None])
+
+        interval = np.nan_to_num(self.interval, nan=0.0)
+        times = (self.last_time[:, None] + h[None, :] * interval[:, None]).astype("datetime64[ns]")
+        return values, stds, times
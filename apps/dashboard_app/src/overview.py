@@ -0,0 +1,61 @@
+import warnings
+import numpy as np
+import pandas as pd
+
+# Readings older than this at a grid time count as missing for that pond
+ASOF_TOLERANCE = pd.Timedelta("5min")
+
+# Times and sensor values per pond, reused while the source still holds the same frame
+_array_cache: dict[str, tuple[pd.DataFrame, np.ndarray, np.ndarray]] = {}
+
+
+def pond_arrays(key: str, df: pd.DataFrame, columns: list[str]) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Returns a pond's created_at as int64 nanoseconds and its sensor values as a (rows, sensors) float array.
+
+    Sources replace their frame instead of modifying it, so the arrays are rebuilt only when the frame changes.
+    """
+    cached = _array_cache.get(key)
+    if cached is not None and cached[0] is df:
+        return cached[1], cached[2]
+
+    times = df["created_at"].to_numpy(dtype="datetime64[ns]").view(np.int64)
+    values = df[columns].to_numpy(dtype=np.float64)
+    _array_cache[key] = (df, times, values)
+    return times, values
+
+
+def align_ponds(ponds: list[tuple[np.ndarray, np.ndarray]], grid: np.ndarray, tolerance: pd.Timedelta = ASOF_TOLERANCE) -> np.ndarray:
+    """
+    Aligns every pond on a common time grid with an as-of join: each grid time takes the pond's latest reading at or
+    before it, or NaN if there is none within `tolerance`.
+
+    :return: Array of shape (ponds, time, sensors)
+    """
+    grid = np.asarray(grid, dtype="datetime64[ns]").view(np.int64)
+    cube = np.full((len(ponds), len(grid), ponds[0][1].shape[1]), np.nan)
+
+    for i, (times, values) in enumerate(ponds):
+        # Index of the latest reading at or before each grid time
+        index = np.searchsorted(times, grid, side="right") - 1
+        found = index >= 0
+        found[found] = grid[found] - times[index[found]] <= tolerance.value
+        cube[i, found] = values[index[found]]
+
+    return cube
+
+
+def overview_stats(cube: np.ndarray) -> dict[str, np.ndarray]:
+    """
+    Min, median and max across ponds for every time and sensor, one reduction each.
+
+    :return: Arrays of shape (time, sensors); NaN where no pond has a reading
+    """
+    with warnings.catch_warnings():
+        # All-NaN slices (no pond reporting) are expected and stay NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        return {
+            "min": np.nanmin(cube, axis=0),
+            "median": np.nanmedian(cube, axis=0),
+            "max": np.nanmax(cube, axis=0),
+        }
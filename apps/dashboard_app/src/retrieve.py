@@ -1,16 +1,39 @@
+import io
+import os
+import time
+import logging
+import threading
 import pandas as pd
 from pathlib import Path
+from rollups import PondRollups
 
+logger = logging.getLogger(__name__)
 
-def load_pond_data(csv_path: str) -> pd.DataFrame:
-    """
-    Loads and cleans pond CSV data.
-    """
-    if not Path(csv_path).exists():
-        raise FileNotFoundError(f"CSV not found: {csv_path}")
+# Sensor columns, as named after cleaning
+SENSOR_COLS = [
+    "temperaturec",
+    "ph",
+    "dissolvedoxygeng/ml",
+    "turbidityntu",
+    "ammoniag/ml",
+    "nitrateg/ml"
+]
+
+# Sensor columns of the sensor-db tables (scripts/python_helpers/database_csv_upload.py), renamed to the cleaned CSV names
+DB_SENSOR_COLS = {
+    "temperature": "temperaturec",
+    "ph": "ph",
+    "dissolved_oxygen": "dissolvedoxygeng/ml",
+    "turbidity": "turbidityntu",
+    "ammonia": "ammoniag/ml",
+    "nitrate": "nitrateg/ml",
+}
 
-    df = pd.read_csv(csv_path)
 
+def clean_pond_data(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Cleans raw pond rows: normalises column names, parses dates and sensor values, drops unusable rows.
+    """
     df.columns = df.columns.str.lower().str.replace(" ", "").str.replace("(", "").str.replace(")", "")
 
     # Parse datetime
@@ -22,25 +45,280 @@ def load_pond_data(csv_path: str) -> pd.DataFrame:
 
     df = df.dropna(subset=["created_at"])
 
-
-# Convert sensor columns to numeric
-    sensor_cols = [
-        "temperaturec",
-        "ph",
-        "dissolvedoxygeng/ml",
-        "turbidityntu",
-        "ammoniag/ml",
-        "nitrateg/ml"
-]
-
-    for col in sensor_cols:
+    # Convert sensor columns to numeric
+    for col in SENSOR_COLS:
         if col in df.columns:
             df[col] = pd.to_numeric(df[col], errors="coerce")
 
     # Drop rows where all sensors are NaN
-    df = df.dropna(subset=sensor_cols, how="all")
+    return df.dropna(subset=SENSOR_COLS, how="all")
+
+
+def load_pond_data(csv_path: str) -> pd.DataFrame:
+    """
+    Loads and cleans pond CSV data.
+    """
+    if not Path(csv_path).exists():
+        raise FileNotFoundError(f"CSV not found: {csv_path}")
+
+    df = clean_pond_data(pd.read_csv(csv_path))
 
     # Sort chronologically
     df = df.sort_values("created_at")
 
     return df
+
+
+class PondSource:
+    """
+    Keeps one pond CSV parsed in memory and reads only the rows appended since the last refresh.
+
+    The byte offset after the last complete line is tracked. A last line without a newline is provisional: it is shown
+    once it has every field, but never added to the frame or the rollups, and it is parsed again from its start on the
+    next refresh, so a row the writer is still completing (or a finished file without a trailing newline) is never
+    split or counted twice. If the file shrinks or is replaced, it is read again from the start. The frame is shared by every session, so
+    callers must not modify it in place. New rows are also added to the pond's rollups.
+    """
+
+    def __init__(self, csv_path: str):
+        self.csv_path = csv_path
+        self.frame = pd.DataFrame(columns=["created_at", *SENSOR_COLS])     # Empty until the first rows, but with its columns
+        self.rollups = PondRollups(SENSOR_COLS)
+        self.version = 0                # Incremented whenever rows are added
+        self._offset = 0
+        self._tail = b""                # Unterminated last line, shown provisionally
+        self._view = self.frame         # Frame plus the provisional row; what refresh returns
+        self._file_id = None
+        self._header = None
+        self._lock = threading.Lock()
+
+    def refresh(self) -> pd.DataFrame:
+        """
+        Parses rows appended since the last refresh and returns the whole frame, sorted by created_at.
+        """
+        with self._lock:
+            if not Path(self.csv_path).exists():
+                raise FileNotFoundError(f"CSV not found: {self.csv_path}")
+
+            start = time.perf_counter()
+            stat = os.stat(self.csv_path)
+            file_id = (stat.st_dev, stat.st_ino)
+
+            if file_id != self._file_id or stat.st_size < self._offset:
+                # First read, or the file was truncated / replaced
+                self._reset(file_id)
+
+            if stat.st_size == self._offset:
+                return self._view
+
+            with open(self.csv_path, "rb") as f:
+                if self._header is None:
+                    self._header = list(pd.read_csv(f, nrows=0).columns)
+                    f.seek(0)
+                    self._offset = len(f.readline())
+                f.seek(self._offset)
+                data = f.read(stat.st_size - self._offset)
+
+            # Complete lines are committed; the offset stays at the start of an unterminated last line
+            end = data.rfind(b"\n") + 1
+            complete, tail = data[:end], data[end:]
+            if complete:
+                self._offset += len(complete)
+                new_rows = clean_pond_data(pd.read_csv(io.BytesIO(complete), header=None, names=self._header))
+                self._append(new_rows)
+
+                logger.info(
+                    f"{self.csv_path}: parsed {len(new_rows)} new rows ({len(complete)} bytes) in "
+                    f"{(time.perf_counter() - start) * 1000:.1f} ms, {len(self.frame)} rows in memory"
+                )
+
+            if complete or tail != self._tail:
+                self._tail = tail
+                self._view = self._with_provisional(tail)
+            return self._view
+
+    def _with_provisional(self, tail: bytes) -> pd.DataFrame:
+        """
+        Returns the frame plus the unterminated last line, if it already has as many fields as the header.
+        """
+        if not tail or tail.count(b",") + 1 != len(self._header):
+            return self.frame
+
+        row = clean_pond_data(pd.read_csv(io.BytesIO(tail), header=None, names=self._header))
+        if row.empty:
+            return self.frame
+
+        frame = pd.concat([self.frame, row], ignore_index=True) if not self.frame.empty else row.reset_index(drop=True)
+        if not frame["created_at"].is_monotonic_increasing:
+            frame = frame.sort_values("created_at", kind="stable").reset_index(drop=True)
+        return frame
+
+    def _reset(self, file_id):
+        self.frame = pd.DataFrame(columns=["created_at", *SENSOR_COLS])
+        self.rollups = PondRollups(SENSOR_COLS)
+        self.version += 1
+        self._offset = 0
+        self._tail = b""
+        self._view = self.frame
+        self._file_id = file_id
+        self._header = None
+
+    def _append(self, new_rows: pd.DataFrame):
+        if new_rows.empty:
+            return
+
+        in_order = self.frame.empty or new_rows["created_at"].iloc[0] >= self.frame["created_at"].iloc[-1]
+        frame = pd.concat([self.frame, new_rows], ignore_index=True) if not self.frame.empty else new_rows
+        if not (in_order and new_rows["created_at"].is_monotonic_increasing):
+            # Out-of-order rows: stable sort keeps the file order of equal timestamps
+            frame = frame.sort_values("created_at", kind="stable")
+
+        self.frame = frame.reset_index(drop=True)
+        self.rollups.add(new_rows)
+        self.version += 1
+
+
+# One source per CSV, shared by every session in the process
+_sources: dict[str, PondSource] = {}
+_sources_lock = threading.Lock()
+
+
+def get_pond_source(csv_path: str) -> PondSource:
+    """
+    Returns the process-wide source of a pond CSV.
+    """
+    with _sources_lock:
+        if csv_path not in _sources:
+            _sources[csv_path] = PondSource(csv_path)
+        return _sources[csv_path]
+
+
+class DatabaseSource:
+    """
+    Keeps the newest rows of every pond table in memory, updated by one background poller thread per process.
+
+    Each poll reads the rows with entry_id above the last seen one, for all tables in a single UNION ALL query over one
+    pooled connection. Sessions only read the in-memory frames, so the number of open tabs does not change the query load.
+    At most `history_rows` rows per table are kept; the rollups keep the aggregated history beyond that.
+    """
+
+    def __init__(self, engine, tables: list[str], poll_seconds: float = 5.0, history_rows: int = 50000):
+        self.engine = engine
+        self.tables = list(tables)
+        self.poll_seconds = poll_seconds
+        self.history_rows = history_rows
+
+        self.frames = {table: pd.DataFrame(columns=["created_at", "entry_id", *SENSOR_COLS]) for table in self.tables}
+        self.rollups = {table: PondRollups(SENSOR_COLS) for table in self.tables}
+        self.versions = {table: 0 for table in self.tables}   # Incremented whenever rows are added
+        self.last_entry_id: dict[str, int | None] = {table: None for table in self.tables}
+        self.last_poll_ms = None
+        self.last_poll_error = None
+
+        self._ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="pond-db-poller", daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        self.engine.dispose()
+
+    def frame(self, table: str, timeout: float = 30.0) -> pd.DataFrame:
+        """
+        Returns the in-memory rows of a table, sorted by created_at; waits for the first poll on startup.
+        """
+        self._ready.wait(timeout)
+        return self.frames[table]
+
+    def _run(self):
+        while not self._stop.is_set():
+            try:
+                self.poll()
+                self.last_poll_error = None
+            except Exception as e:
+                self.last_poll_error = repr(e)
+                logger.exception("Polling the pond tables failed")
+            self._ready.set()
+            self._stop.wait(self.poll_seconds)
+
+    def poll(self):
+        """
+        Reads the new rows of every table in one query and appends them to the frames.
+        """
+        from sqlalchemy import text
+
+        quote = self.engine.dialect.identifier_preparer.quote
+        columns = ", ".join(["created_at", "entry_id", *DB_SENSOR_COLS])
+        queries, params = [], {"history_rows": self.history_rows}
+        for i, table in enumerate(self.tables):
+            where_clause = ""
+            if self.last_entry_id[table] is not None:
+                where_clause = f"WHERE entry_id > :last_entry_id_{i}"
+                params[f"last_entry_id_{i}"] = self.last_entry_id[table]
+            # Newest rows first, so a long gap (or the first poll) only reads the rows that are kept
+            queries.append(f"(SELECT {i} AS table_index, {columns} FROM {quote(table)} {where_clause} ORDER BY entry_id DESC LIMIT :history_rows)")
+
+        start = time.perf_counter()
+        with self.engine.connect() as conn:
+            df = pd.read_sql(text(" UNION ALL ".join(queries)), conn, params=params)
+        self.last_poll_ms = (time.perf_counter() - start) * 1000
+
+        df = df.rename(columns=DB_SENSOR_COLS)
+        df["created_at"] = pd.to_datetime(df["created_at"], utc=True).dt.tz_convert(None)
+        for i, new_rows in df.groupby("table_index", sort=False):
+            self._append(self.tables[i], new_rows.drop(columns="table_index").sort_values("entry_id"))
+
+        log = logger.info if len(df) else logger.debug
+        log(f"Polled {len(self.tables)} pond tables in {self.last_poll_ms:.1f} ms, {len(df)} new rows")
+
+    def _append(self, table: str, new_rows: pd.DataFrame):
+        self.last_entry_id[table] = int(new_rows["entry_id"].iloc[-1])
+
+        frame = self.frames[table]
+        frame = pd.concat([frame, new_rows], ignore_index=True) if not frame.empty else new_rows
+        if not frame["created_at"].is_monotonic_increasing:
+            frame = frame.sort_values("created_at", kind="stable")
+
+        # Replaced, not modified: sessions may still be reading the previous frame
+        self.frames[table] = frame.iloc[-self.history_rows:].reset_index(drop=True)
+        self.rollups[table].add(new_rows)
+        self.versions[table] += 1
+
+
+def create_database_engine(pool_size: int = 1):
+    """
+    Creates a pooled engine for the sensor-db database from the same env vars as the monitoring backend.
+    """
+    from sqlalchemy import URL, create_engine
+
+    port = os.getenv("DATABASE_PORT")
+    url = URL.create(
+        "postgresql+psycopg2",
+        username=os.getenv("DATABASE_USER", "admin"),
+        password=os.getenv("POSTGRES_PASS"),
+        host=os.getenv("DATABASE_DNS"),
+        port=int(port) if port else None,
+        database=os.getenv("DATABASE_NAME", "sensor-db"),
+    )
+    return create_engine(url, pool_size=pool_size, max_overflow=0, pool_pre_ping=True, pool_recycle=1800)
+
+
+_database_source: DatabaseSource | None = None
+
+
+def get_database_source(tables: list[str], poll_seconds: float = 5.0, history_rows: int = 50000) -> DatabaseSource:
+    """
+    Returns the process-wide database source, starting its poller on first use.
+
+    Needs SQLAlchemy and psycopg2, which the CSV source does not.
+    """
+    global _database_source
+    with _sources_lock:
+        if _database_source is None:
+            _database_source = DatabaseSource(create_database_engine(), tables, poll_seconds, history_rows)
+            _database_source.start()
+        return _database_source
@@ -0,0 +1,134 @@
+import logging
+import threading
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+# Rollup resolutions, finest first; each must divide the next so a coarser bucket never starts after a finer one
+RESOLUTIONS = ["1min", "15min", "1h"]
+
+# Aggregates kept per sensor and bucket; count is used to merge buckets
+AGGREGATES = ["count", "min", "mean", "max", "median"]
+
+# Buckets kept per resolution (about 2 weeks of 1 min buckets)
+MAX_BUCKETS = 20000
+
+
+class PondRollups:
+    """
+    Min/mean/max/median of every sensor per time bucket, at several resolutions, updated as rows arrive.
+
+    Closed buckets are aggregated once. Only the raw rows of the open buckets (at most one bucket of the coarsest
+    resolution) are kept, so each update costs O(new rows + one coarse bucket) regardless of history length. Rows that
+    arrive after their bucket was closed are not counted in it.
+    """
+
+    def __init__(self, columns: list[str], resolutions: list[str] = RESOLUTIONS, max_buckets: int = MAX_BUCKETS):
+        self.columns = list(columns)
+        self.resolutions = [pd.Timedelta(r) for r in resolutions]
+        self.max_buckets = max_buckets
+
+        self.closed = {r: pd.DataFrame() for r in self.resolutions}
+        self.open = {r: pd.DataFrame() for r in self.resolutions}
+        self.closed_until = {r: pd.Timestamp.min for r in self.resolutions}
+        self.pending = pd.DataFrame(columns=["created_at", *self.columns])
+        self.late_rows = 0
+        self._lock = threading.Lock()
+
+    def add(self, new_rows: pd.DataFrame):
+        """
+        Adds new raw rows; they do not need to be sorted.
+        """
+        if new_rows.empty:
+            return
+
+        rows = new_rows[["created_at", *self.columns]]
+        with self._lock:
+            finest = self.resolutions[0]
+            late = rows["created_at"] < self.closed_until[finest]
+            if late.any():
+                self.late_rows += int(late.sum())
+                logger.debug(f"{int(late.sum())} rows arrived after their rollup bucket closed")
+
+            pending = pd.concat([self.pending, rows], ignore_index=True) if not self.pending.empty else rows
+            latest = pending["created_at"].max()
+
+            for r in self.resolutions:
+                open_start = latest.floor(r)
+
+                # One aggregation covers the buckets that closed since the last update and the open bucket
+                aggregated = _aggregate(pending[pending["created_at"] >= self.closed_until[r]], r)
+                closed = aggregated[aggregated.index < open_start]
+                if not closed.empty:
+                    self.closed[r] = pd.concat([self.closed[r], closed]).iloc[-self.max_buckets:] if not self.closed[r].empty else closed
+                self.open[r] = aggregated[aggregated.index >= open_start]
+                self.closed_until[r] = open_start
+
+            # Only rows of the open coarsest bucket can still change an aggregate
+            self.pending = pending[pending["created_at"] >= latest.floor(self.resolutions[-1])].reset_index(drop=True)
+
+    def query(self, start: pd.Timestamp, end: pd.Timestamp, max_points: int) -> tuple[pd.Timedelta, pd.DataFrame]:
+        """
+        Returns the aggregates between `start` and `end` at the finest resolution with at most `max_points` buckets.
+
+        When even the coarsest resolution has too many buckets, they are merged into wider ones (the median then becomes
+        the median of the bucket medians).
+
+        :return: Returns the bucket width and a frame indexed by bucket start with (sensor, aggregate) columns
+        """
+        span = end - start
+        resolution = next((r for r in self.resolutions if span / r <= max_points), self.resolutions[-1])
+
+        with self._lock:
+            parts = [p for p in (self.closed[resolution], self.open[resolution]) if not p.empty]
+        if not parts:
+            return resolution, pd.DataFrame()
+
+        # Buckets are labelled by their start, so the bucket holding `start` begins before it
+        frame = pd.concat(parts) if len(parts) > 1 else parts[0]
+        frame = frame.loc[start.floor(resolution):end]
+
+        if len(frame) > max_points:
+            factor = -(-len(frame) // max_points)
+            resolution = resolution * factor
+            frame = _merge_buckets(frame, resolution, self.columns)
+
+        return resolution, frame
+
+
+    def oldest(self) -> pd.Timestamp | None:
+        """
+        Returns the start of the oldest bucket kept at any resolution; None before the first rows arrive.
+
+        Coarser resolutions keep the same number of buckets over a longer time, so this reaches further back than the
+        raw rows a source keeps.
+        """
+        with self._lock:
+            starts = [
+                frame.index[0]
+                for r in self.resolutions
+                for frame in (self.closed[r], self.open[r])
+                if not frame.empty
+            ]
+        return min(starts, default=None)
+
+
+def _aggregate(rows: pd.DataFrame, resolution: pd.Timedelta) -> pd.DataFrame:
+    grouped = rows.groupby(rows["created_at"].dt.floor(resolution))[rows.columns.drop("created_at")]
+    # One grouped reduction per aggregate covers every sensor; agg() with a list reduces column by column
+    aggregated = pd.concat({name: getattr(grouped, name)() for name in AGGREGATES}, axis=1)
+    return aggregated.swaplevel(axis=1)[rows.columns.drop("created_at")]
+
+
+def _merge_buckets(frame: pd.DataFrame, resolution: pd.Timedelta, columns: list[str]) -> pd.DataFrame:
+    buckets = frame.index.floor(resolution)
+    merged = {}
+    for col in columns:
+        count = frame[(col, "count")]
+        merged[(col, "count")] = count.groupby(buckets).sum()
+        merged[(col, "min")] = frame[(col, "min")].groupby(buckets).min()
+        # Count-weighted mean of the bucket means
+        merged[(col, "mean")] = (frame[(col, "mean")] * count).groupby(buckets).sum(min_count=1) / merged[(col, "count")]
+        merged[(col, "max")] = frame[(col, "max")].groupby(buckets).max()
+        merged[(col, "median")] = frame[(col, "median")].groupby(buckets).median()
+    return pd.DataFrame(merged)
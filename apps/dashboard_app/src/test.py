@@ -244,12 +244,18 @@
 
 import streamlit as st
 from pathlib import Path
-from retrieve import load_pond_data
+from retrieve import get_database_source, get_pond_source
+from overview import align_ponds, overview_stats, pond_arrays
+from forecast import HoltForecaster
 from streamlit_autorefresh import st_autorefresh
 import datetime
+import logging
+import os
 import pandas as pd
 import altair as alt
 
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
 # -------------------------------
 # Page config
 # -------------------------------
@@ -268,6 +274,19 @@ POND_FILES = {
     "Pond 4": r"archive\IoTpond4.csv",
 }
 
+# -------------------------------
+# Data source: "csv" reads POND_FILES, "postgres" polls the sensor-db tables
+# -------------------------------
+DATA_SOURCE = os.getenv("DASHBOARD_SOURCE", "csv").lower()
+POLL_SECONDS = float(os.getenv("DASHBOARD_POLL_SECONDS", "5"))
+
+POND_TABLES = {
+    "Pond 1": "iot_pond_1",
+    "Pond 2": "iot_pond_2",
+    "Pond 3": "iot_pond_3",
+    "Pond 4": "iot_pond_4",
+}
+
 # -------------------------------
 # Sensor configuration
 # -------------------------------
@@ -284,6 +303,19 @@ WINDOW_SIZE = 100
 FORECAST_HORIZON = 10
 TREND_EPSILON = 0.01
 
+# -------------------------------
+# History charts: visible range, and points per chart (about one per 2 px of a wide-layout chart)
+# -------------------------------
+HISTORY_RANGES = {
+    "Last hour": pd.Timedelta("1h"),
+    "Last 6 hours": pd.Timedelta("6h"),
+    "Last day": pd.Timedelta("1D"),
+    "Last week": pd.Timedelta("7D"),
+    "Last 30 days": pd.Timedelta("30D"),
+    "All": None,
+}
+CHART_POINTS = 600
+
 # -------------------------------
 # Sidebar controls
 # -------------------------------
@@ -316,11 +348,28 @@ st.caption(
 )
 
 # -------------------------------
-# Cached data retrieval (FIXED)
+# Shared data retrieval
 # -------------------------------
-@st.cache_data
-def get_data(csv_path, refresh_counter):  # 🔁 refresh fix
-    return load_pond_data(csv_path)
+def get_data(pond_name):
+    # One copy per pond for the whole process, already sorted by created_at
+    if DATA_SOURCE == "postgres":
+        # One background poller per process; sessions never query the database themselves
+        return get_database_source(list(POND_TABLES.values()), POLL_SECONDS).frame(POND_TABLES[pond_name])
+    # Each refresh only parses the rows appended to the CSV since the previous one
+    return get_pond_source(POND_FILES[pond_name]).refresh()
+
+def get_rollups(pond_name):
+    # Kept up to date by the data source; call get_data first so CSV sources have refreshed
+    if DATA_SOURCE == "postgres":
+        return get_database_source(list(POND_TABLES.values()), POLL_SECONDS).rollups[POND_TABLES[pond_name]]
+    return get_pond_source(POND_FILES[pond_name]).rollups
+
+if DATA_SOURCE == "postgres":
+    source = get_database_source(list(POND_TABLES.values()), POLL_SECONDS)
+    if source.last_poll_ms is not None:
+        st.sidebar.caption(f"🗄️ Last database poll: {source.last_poll_ms:.0f} ms")
+    if source.last_poll_error:
+        st.sidebar.error(f"Database poll failed: {source.last_poll_error}")
 
 # -------------------------------
 # Sliding window helper
@@ -329,7 +378,8 @@ def get_sliding_window(df, state_key):
     if state_key not in st.session_state:
         st.session_state[state_key] = 0
 
-    max_start = len(df) - (WINDOW_SIZE + FORECAST_HORIZON)
+    # Fewer rows than a window plus horizon: the window starts at the first row instead of a negative position
+    max_start = max(len(df) - (WINDOW_SIZE + FORECAST_HORIZON), 0)
     start = min(st.session_state[state_key], max_start)
 
     window_df = df.iloc[start : start + WINDOW_SIZE]
@@ -341,25 +391,53 @@ def get_sliding_window(df, state_key):
 
     return window_df, forecast_df
 
+# -------------------------------
+# Forecasting helper
+# -------------------------------
+def get_forecaster(state_key, n_ponds):
+    # Kept per session, like the sliding windows it follows; each refresh only feeds the rows the windows advanced by
+    if state_key not in st.session_state:
+        st.session_state[state_key] = HoltForecaster(n_ponds, len(SENSORS), warmup=WINDOW_SIZE)
+    return st.session_state[state_key]
+
 # =====================================================
 # MAIN PAGE — LATEST VALUES + TRENDS
 # =====================================================
 if selected_page == "Main Page":
     st.title("🌊 Aquaponics System Overview")
 
-    for pond_name, csv_path in POND_FILES.items():
+    sensor_cols = list(SENSORS.values())
+    windows, ponds = [], []
+    for pond_name in POND_FILES:
+        df = get_data(pond_name)
+        window_df, _ = get_sliding_window(df, f"main_{pond_name}_idx")
+        windows.append(window_df)
+        ponds.append(pond_arrays(pond_name, df, sensor_cols))
+
+    if all(window_df.empty for window_df in windows):
+        st.info("Waiting for data…")
+        st.stop()
+
+    # One batched update and forecast for every pond and sensor; ponds without readings yet feed no rows
+    forecaster = get_forecaster("main_forecaster", len(POND_FILES))
+    forecaster.update(ponds, [window_df["created_at"].iloc[-1].value if len(window_df) else 0 for window_df in windows])
+    forecast_values, _, _ = forecaster.forecast(FORECAST_HORIZON)
+
+    for p, (pond_name, window_df) in enumerate(zip(POND_FILES, windows)):
         st.markdown(f"## 🌱 {pond_name}")
 
-        df = get_data(csv_path, refresh_counter).sort_values("created_at").reset_index(drop=True)
-        window_df, forecast_df = get_sliding_window(df, f"main_{pond_name}_idx")
+        if window_df.empty:
+            st.info("Waiting for data…")
+            st.markdown("---")
+            continue
 
         latest = window_df.iloc[-1]
-        future = forecast_df.iloc[-1]
 
         cols = st.columns(len(SENSORS))
 
         for i, (label, col) in enumerate(SENSORS.items()):
-            delta = future[col] - latest[col]
+            # Forecast FORECAST_HORIZON rows ahead against the latest reading
+            delta = forecast_values[p, -1, i] - latest[col]
 
             if delta > TREND_EPSILON:
                 arrow, color = "🔺", "green"
@@ -390,27 +468,27 @@ if selected_page == "Main Page":
 elif selected_page == "Aggregate Overview":
     st.title("📊 Aggregate Sensor Overview (All Ponds)")
 
-    pond_dfs = []
-    for name, path in POND_FILES.items():
-        df = get_data(path, refresh_counter).sort_values("created_at").reset_index(drop=True)
-        pond_dfs.append(df)
+    sensor_cols = list(SENSORS.values())
+    ponds = [pond_arrays(name, get_data(name), sensor_cols) for name in POND_FILES]
 
-    base_df, _ = get_sliding_window(pond_dfs[0], "aggregate_idx")
-    time_index = base_df["created_at"]
+    # Time axis: the first pond's window; every pond is aligned to it by timestamp (as-of join), not by row position
+    base_df, _ = get_sliding_window(get_data(next(iter(POND_FILES))), "aggregate_idx")
+    if base_df.empty:
+        st.info("Waiting for data…")
+        st.stop()
+    time_index = base_df["created_at"].to_numpy()
 
-    for label, col in SENSORS.items():
-        st.markdown(f"### {label}")
+    # ponds x time x sensor, reduced across ponds once for all sensors
+    stats = overview_stats(align_ponds(ponds, time_index))
 
-        aligned = []
-        for df in pond_dfs:
-            aligned.append(df.loc[base_df.index, col].values)
+    for i, (label, col) in enumerate(SENSORS.items()):
+        st.markdown(f"### {label}")
 
-        agg_df = pd.DataFrame(aligned).T
         stats_df = pd.DataFrame({
             "created_at": time_index,
-            "min": agg_df.min(axis=1),
-            "median": agg_df.median(axis=1),
-            "max": agg_df.max(axis=1),
+            "min": stats["min"][:, i],
+            "median": stats["median"][:, i],
+            "max": stats["max"][:, i],
         })
 
         area = alt.Chart(stats_df).mark_area(
@@ -444,12 +522,18 @@ elif selected_page == "Aggregate Overview":
 else:
     st.title(f"🌱 {selected_page} Monitoring Dashboard")
 
-    df = get_data(POND_FILES[selected_page], refresh_counter)\
-            .sort_values("created_at").reset_index(drop=True)
+    df = get_data(selected_page)
+    if df.empty:
+        st.info("Waiting for data…")
+        st.stop()
 
-    window_df, forecast_df = get_sliding_window(df, f"{selected_page}_idx")
+    window_df, _ = get_sliding_window(df, f"{selected_page}_idx")
     latest = window_df.iloc[-1]
 
+    forecaster = get_forecaster(f"{selected_page}_forecaster", 1)
+    forecaster.update([pond_arrays(selected_page, df, list(SENSORS.values()))], [window_df["created_at"].iloc[-1].value])
+    forecast_values, forecast_stds, forecast_times = forecaster.forecast(FORECAST_HORIZON)
+
     st.subheader("📊 Latest Readings")
     cols = st.columns(3)
     for i, (label, col) in enumerate(SENSORS.items()):
@@ -457,12 +541,23 @@ else:
 
     st.subheader("📈 Sensor Forecasts")
 
-    for label, col in SENSORS.items():
+    for i, (label, col) in enumerate(SENSORS.items()):
         hist_df = window_df[["created_at", col]]
-        fut_df = forecast_df[["created_at", col]]
+        # Forecast with a band of +/- 2 standard deviations
+        fut_df = pd.DataFrame({
+            "created_at": forecast_times[0],
+            col: forecast_values[0, :, i],
+            "lower": forecast_values[0, :, i] - 2 * forecast_stds[0, :, i],
+            "upper": forecast_values[0, :, i] + 2 * forecast_stds[0, :, i],
+        })
 
         chart = (
-            alt.Chart(hist_df).mark_line().encode(
+            alt.Chart(fut_df).mark_area(opacity=0.2, color="#FF9800").encode(
+                x="created_at:T",
+                y="lower:Q",
+                y2="upper:Q"
+            )
+            + alt.Chart(hist_df).mark_line().encode(
                 x="created_at:T",
                 y=f"{col}:Q"
             )
@@ -483,3 +578,47 @@ else:
         ).properties(height=320)
 
         st.altair_chart(chart, use_container_width=True)
+
+    st.subheader("🗂️ Sensor History")
+
+    range_col, sensor_col = st.columns(2)
+    range_label = range_col.selectbox("Range", list(HISTORY_RANGES), index=2)
+    history_label = sensor_col.selectbox("Sensor", list(SENSORS))
+    history_col = SENSORS[history_label]
+
+    # The range ends at the newest reading; the rollup resolution is picked so the chart stays within CHART_POINTS
+    # "All" starts at the oldest rollup bucket, which reaches further back than the raw rows kept in memory
+    rollups = get_rollups(selected_page)
+    end = df["created_at"].iloc[-1]
+    span = HISTORY_RANGES[range_label]
+    start = (rollups.oldest() or df["created_at"].iloc[0]) if span is None else end - span
+    resolution, rollup_df = rollups.query(start, end, CHART_POINTS)
+
+    if rollup_df.empty:
+        st.info("No history in this range yet.")
+    else:
+        stats_df = rollup_df[history_col].reset_index(names="created_at")
+        st.caption(f"{len(stats_df)} buckets of {resolution}")
+
+        band = alt.Chart(stats_df).mark_area(opacity=0.25, color="#90CAF9").encode(
+            x="created_at:T",
+            y=alt.Y("min:Q", title=history_label),
+            y2="max:Q"
+        )
+        mean_line = alt.Chart(stats_df).mark_line(color="#1E88E5").encode(
+            x="created_at:T",
+            y="mean:Q",
+            tooltip=[
+                alt.Tooltip("created_at:T", title="Bucket start"),
+                alt.Tooltip("mean:Q", title="Mean"),
+                alt.Tooltip("median:Q", title="Median"),
+                alt.Tooltip("min:Q", title="Min"),
+                alt.Tooltip("max:Q", title="Max"),
+            ]
+        )
+        median_line = alt.Chart(stats_df).mark_line(strokeDash=[4, 4], color="#0D47A1").encode(
+            x="created_at:T",
+            y="median:Q"
+        )
+
+        st.altair_chart((band + mean_line + median_line).properties(height=320), use_container_width=True)
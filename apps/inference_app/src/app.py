@@ -0,0 +1,162 @@
+import os
+import json
+import time
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+
+import pandas as pd
+from sqlalchemy import create_engine, text
+from sqlalchemy.engine import URL
+from .batching import LatencyStats, MicroBatcher
+from .registry import ModelRegistry, LoadedModel
+
+from fastapi import FastAPI, HTTPException, status
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel
+
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Trained models are read from the training pipeline's output volume
+OUTPUT_PATH = os.getenv("OUTPUT_PATH", "/vol/models")
+
+# Micro-batching latency budget
+MAX_BATCH_SIZE      = int(os.getenv("MAX_BATCH_SIZE", "256"))
+MAX_BATCH_WAIT_MS   = float(os.getenv("MAX_BATCH_WAIT_MS", "5"))
+
+# Model cache: resident artifact budget and how often to look for retrained models
+MAX_RESIDENT_MB         = float(os.getenv("MAX_RESIDENT_MB", "256"))
+ARTIFACT_POLL_SECONDS   = float(os.getenv("ARTIFACT_POLL_SECONDS", "30"))
+USE_COMPILED_TREES      = os.getenv("USE_COMPILED_TREES", "true").lower() == "true"
+
+# Accessing the database for bulk scoring
+POSTGRES_PASS = os.getenv("POSTGRES_PASS")
+DATABASE_DNS = os.getenv("DATABASE_DNS")
+DATABASE_PORT = os.getenv("DATABASE_PORT")
+
+DB_NAME     = "sensor-db"
+USER        = "admin"
+PASSWORD    = POSTGRES_PASS
+HOST        = DATABASE_DNS
+PORT        = DATABASE_PORT
+# URL.create escapes the credentials, which the f-string URL did not
+engine = create_engine(
+    URL.create("postgresql", username=USER, password=PASSWORD, host=HOST, port=int(PORT) if PORT else None, database=DB_NAME)
+)
+logger.debug("Engine created successfully")
+
+
+registry: ModelRegistry | None = None
+batchers: dict[tuple[str, str], MicroBatcher] = {}
+bulk_stats = LatencyStats()
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global registry
+
+    # Models are only indexed here; Each one is loaded on its first request
+    registry = await asyncio.to_thread(
+        ModelRegistry, OUTPUT_PATH, int(MAX_RESIDENT_MB * 1024 * 1024), ARTIFACT_POLL_SECONDS, USE_COMPILED_TREES
+    )
+    watcher = asyncio.create_task(registry.watch())
+    logger.debug(f"Found {len(registry.keys())} models in {OUTPUT_PATH}")
+    yield
+
+    watcher.cancel()
+    for batcher in batchers.values():
+        await batcher.stop()
+
+
+app = FastAPI(lifespan=lifespan)
+
+
+def check_model(table: str, model: str) -> tuple[str, str]:
+    key = (table, model)
+    if key not in registry:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No model {model} for table {table}")
+    return key
+
+def get_batcher(key: tuple[str, str]) -> MicroBatcher:
+    batcher = batchers.get(key)
+    if batcher is None:
+        # The batcher outlives any one model version: Every batch is scored by whichever version is current,
+        # so swaps and evictions never strand queued requests
+        def predict(rows: list[dict]) -> list[tuple[list, list[float]]]:
+            loaded = registry.get(key)
+            return [(loaded.classes, row) for row in loaded.predict_proba(rows).tolist()]
+
+        batcher = batchers[key] = MicroBatcher(predict, MAX_BATCH_SIZE, MAX_BATCH_WAIT_MS)
+        batcher.start()
+    return batcher
+
+
+class Predict(BaseModel):
+    table       : str
+    model       : str
+    features    : dict[str, float | None]
+
+class BulkPredict(BaseModel):
+    table           : str
+    model           : str
+    start_entry_id  : int           = 0
+    end_entry_id    : int | None    = None
+    chunk_size      : int           = 10000
+
+@app.post("/predict", status_code=status.HTTP_200_OK)
+async def post_predict(payload: Predict):
+    key = check_model(payload.table, payload.model)
+
+    # Concurrent requests for the same model are scored together
+    classes, probabilities = await get_batcher(key).submit(payload.features)
+
+    return {"classes": classes, "probabilities": probabilities}
+
+@app.post("/predict/bulk", status_code=status.HTTP_200_OK)
+def post_predict_bulk(payload: BulkPredict):
+    # The whole stream is scored by the version resident when it started, even if a retrained model is swapped in meanwhile
+    served: LoadedModel = registry.get(check_model(payload.table, payload.model))
+
+    # Table names only come from the artifact directory names, never from free-form input
+    columns = ", ".join(f'"{column}"' for column in served.columns)
+    end_clause = "AND entry_id <= :end_entry_id" if payload.end_entry_id is not None else ""
+    sql_query = text(
+        f'SELECT entry_id, {columns} FROM "{served.table}" '
+        f"WHERE entry_id > :last_entry_id {end_clause} ORDER BY entry_id LIMIT :chunk_size;"
+    )
+
+    def stream():
+        # Keyset pagination: each chunk starts after the last entry_id of the previous one
+        last_entry_id = payload.start_entry_id
+        while True:
+            start = time.perf_counter()
+            params = {"last_entry_id": last_entry_id, "chunk_size": payload.chunk_size}
+            if payload.end_entry_id is not None:
+                params["end_entry_id"] = payload.end_entry_id
+
+            chunk = pd.read_sql(sql_query, engine, params=params)
+            if chunk.empty:
+                break
+
+            probabilities = served.predict_proba(chunk)
+            bulk_stats.record(time.perf_counter() - start, rows=len(chunk))
+
+            for entry_id, row in zip(chunk["entry_id"].tolist(), probabilities.tolist()):
+                yield json.dumps({"entry_id": entry_id, "probabilities": row}) + "\n"
+
+            last_entry_id = int(chunk["entry_id"].iloc[-1])
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+@app.get("/stats", status_code=status.HTTP_200_OK)
+def get_stats():
+    return {
+        "models": {f"{table}/{name}": batcher.snapshot() for (table, name), batcher in batchers.items()},
+        "bulk": bulk_stats.snapshot(),
+        "registry": registry.snapshot(),
+    }
+
+@app.get("/", status_code=status.HTTP_200_OK)
+def get_root():
+    return
@@ -0,0 +1,106 @@
+import os
+import json
+import logging
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.pipeline import Pipeline
+
+# Typing
+from sklearn.base import BaseEstimator
+from typing import Any
+
+# artifacts.py
+# Finds and loads the model artifacts written by the training pipeline (training_app/utils._write_to_disk)
+
+logger = logging.getLogger(__name__)
+
+MODEL_FILE = "model.joblib"
+MANIFEST_FILE = "manifest.json"
+
+
+def discover_artifacts(output_path: str) -> dict[tuple[str, str], str]:
+    """
+    `discover_artifacts()` lists every trained model below the training output directory
+
+    The training pipeline writes to OUTPUT_PATH/<table>/<model config path without .yaml>,
+    so the first directory level is the table and the rest is the model name
+
+    :param output_path: Root directory the training pipeline writes to (OUTPUT_PATH)
+    :type output_path: str
+
+    :return: Mapping of (table, model) to the directory holding the artifact
+    :rtype: dict[tuple[str, str], str]
+    """
+    artifacts = {}
+    for directory, _, files in os.walk(output_path):
+        if MODEL_FILE not in files:
+            continue
+
+        relative = os.path.relpath(directory, output_path).split(os.sep)
+        if len(relative) < 2:
+            continue
+
+        table, model = relative[0], "/".join(relative[1:])
+        artifacts[(table, model)] = directory
+
+    return artifacts
+
+
+def read_manifest(final_dir: str) -> dict[str, Any]:
+    """
+    Reads manifest.json of an artifact; Artifacts written before manifests existed return {}
+    """
+    manifest_path = os.path.join(final_dir, MANIFEST_FILE)
+    if not os.path.exists(manifest_path):
+        return {}
+
+    with open(manifest_path, "r") as f:
+        return json.load(f)
+
+
+def load_artifact(final_dir: str) -> tuple[BaseEstimator, dict[str, Any]]:
+    """
+    `load_artifact()` loads a model the same way training_app/utils._load_artifact does
+
+    Uncompressed artifacts are memory-mapped read-only, and 'native' artifacts get their XGBoost booster loaded from booster.ubj
+
+    :param final_dir: Directory holding model.joblib
+    :type final_dir: str
+
+    :return: Returns the fitted model and its manifest
+    :rtype: BaseEstimator, dict
+    """
+    manifest = read_manifest(final_dir)
+
+    mmap_mode = None if manifest.get("compress") else "r"
+    model = joblib.load(os.path.join(final_dir, MODEL_FILE), mmap_mode=mmap_mode)
+
+    if manifest.get("format") == "native":
+        estimator = model.steps[-1][1] if isinstance(model, Pipeline) else model
+        estimator.load_model(os.path.join(final_dir, "booster.ubj"))
+
+    return model, manifest
+
+
+def feature_names(model: BaseEstimator, manifest: dict[str, Any]) -> list[str]:
+    """
+    Returns the input columns of a model, from its manifest schema or the fitted model
+    """
+    if manifest.get("feature_schema"):
+        return [feature["name"] for feature in manifest["feature_schema"]]
+    return [str(name) for name in getattr(model, "feature_names_in_", [])]
+
+
+def to_features(rows: list[dict[str, Any]] | pd.DataFrame, columns: list[str]) -> pd.DataFrame:
+    """
+    Builds the model input frame in column order, cast to float32
+
+    Tree ensembles compare features as float32 internally, so casting up front changes no prediction and halves the frame size.
+    Missing values become NaN.
+    """
+    if not isinstance(rows, pd.DataFrame):
+        rows = pd.DataFrame.from_records(rows)
+
+    return rows.reindex(columns=columns).astype(np.float32)
@@ -0,0 +1,135 @@
+import time
+import asyncio
+import logging
+from collections import deque
+
+import numpy as np
+
+# Typing
+from typing import Any, Callable
+
+# batching.py
+# Coalesces concurrent single-row prediction requests into vectorised model calls
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyStats:
+    """
+    Rolling request latency and throughput statistics
+
+    Keeps the most recent `window` observations of (timestamp, latency, rows)
+    """
+
+    def __init__(self, window: int = 10000):
+        self.observations = deque(maxlen=window)
+
+    def record(self, latency: float, rows: int = 1):
+        self.observations.append((time.monotonic(), latency, rows))
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Returns p50/p99 latency in milliseconds and rows/sec over the observed window
+        """
+        if not self.observations:
+            return {"count": 0, "p50_ms": 0.0, "p99_ms": 0.0, "rows_per_sec": 0.0}
+
+        timestamps, latencies, rows = zip(*self.observations)
+        elapsed = time.monotonic() - timestamps[0]
+        p50, p99 = np.percentile(latencies, [50, 99]) * 1000
+
+        return {
+            "count": len(latencies),
+            "p50_ms": float(p50),
+            "p99_ms": float(p99),
+            "rows_per_sec": sum(rows) / elapsed if elapsed > 0 else 0.0,
+        }
+
+
+class MicroBatcher:
+    """
+    Collects single-row requests for one model and scores them together
+
+    A batch is flushed when it reaches `max_batch_size` rows or when its oldest
+    request has waited `max_wait_ms`, whichever comes first. The model call runs
+    in a worker thread so the event loop keeps accepting requests meanwhile.
+    """
+
+    def __init__(
+            self,
+            predict_fn: Callable[[list[dict[str, Any]]], np.ndarray],
+            max_batch_size: int = 256,
+            max_wait_ms: float = 5.0,
+        ):
+        self.predict_fn = predict_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self.stats = LatencyStats()
+        self.batch_sizes = deque(maxlen=1000)
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: asyncio.Task | None = None
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def submit(self, row: dict[str, Any]) -> np.ndarray:
+        """
+        Queues one row and waits for its predicted class probabilities
+        """
+        start = time.perf_counter()
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((row, future))
+
+        result = await future
+        self.stats.record(time.perf_counter() - start)
+        return result
+
+    async def _collect(self) -> list[tuple[dict[str, Any], asyncio.Future]]:
+        # Block for the first request, then gather more until the batch is full or the wait budget is spent
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.max_wait
+
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            rows = [row for row, _ in batch]
+            self.batch_sizes.append(len(rows))
+
+            try:
+                probabilities = await asyncio.to_thread(self.predict_fn, rows)
+            except Exception as e:
+                logger.exception("Batch prediction failed")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(result)
+
+    def snapshot(self) -> dict[str, float]:
+        """
+        Returns latency statistics and the mean batch size
+        """
+        mean_batch = float(np.mean(self.batch_sizes)) if self.batch_sizes else 0.0
+        return {**self.stats.snapshot(), "mean_batch_size": mean_batch}
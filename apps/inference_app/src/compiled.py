@@ -0,0 +1,117 @@
+import json
+
+import numpy as np
+
+# Typing
+from typing import Any
+
+# compiled.py
+# Batched NumPy predictor for tree ensembles compiled by the training pipeline (training_app/utils._compile_ensemble)
+# Only depends on NumPy: sklearn and xgboost are never imported
+
+COMPILED_FILE = "compiled.npz"
+
+
+class CompiledEnsemble:
+    """
+    Scores a tree ensemble stored as one flat node table
+
+    All rows step through all trees together: Each step gathers the split feature and threshold of the current
+    node of every (row, tree) pair and moves to a child. Pairs that reach a leaf drop out of the next steps.
+    """
+
+    def __init__(self, arrays: dict[str, np.ndarray], meta: dict[str, Any]):
+        self.feature = arrays["feature"]
+        self.threshold = arrays["threshold"]
+        self.left = arrays["left"]
+        self.right = arrays["right"]
+        self.missing_left = arrays["missing_left"]
+        self.value = arrays["value"]
+        self.roots = arrays["roots"]
+        self.group = arrays["group"]
+        self.intercept = arrays["intercept"]
+
+        self.link = meta["link"]
+        self.classes_ = meta["classes"]
+        self.feature_names_in_ = np.asarray(meta.get("feature_names", []), dtype=object)
+        self.max_depth = meta["max_depth"]
+        self.is_leaf = self.left == np.arange(self.left.size)
+
+        # Children interleaved as [left, right] per node: One gather picks the next node
+        self.children = np.column_stack([self.left, self.right]).ravel()
+
+        # Sums leaf margins per class with one matrix product
+        if self.link != "mean":
+            self.group_matrix = np.zeros((self.roots.size, self.intercept.size))
+            self.group_matrix[np.arange(self.roots.size), self.group] = 1.0
+
+    @classmethod
+    def load(cls, path: str) -> "CompiledEnsemble":
+        with np.load(path) as npz:
+            arrays = {key: npz[key] for key in npz.files if key != "meta"}
+            meta = json.loads(str(npz["meta"]))
+        return cls(arrays, meta)
+
+    def apply(self, X: np.ndarray) -> np.ndarray:
+        """
+        Returns the leaf node reached in every tree, shape (rows, trees)
+        """
+        n_rows, n_features = X.shape
+        n_trees = self.roots.size
+        X = X.ravel()
+
+        # One entry per (row, tree) pair still inside its tree; Pairs leave the arrays once they reach a leaf,
+        # so each step only pays for the trees that are still deep enough
+        leaves = np.tile(self.roots, n_rows)
+        active = np.flatnonzero(~self.is_leaf[leaves])
+        node = leaves[active]
+        offset = (active // n_trees) * n_features
+        has_missing = bool(np.isnan(X).any())
+
+        for _ in range(self.max_depth):
+            if not active.size:
+                break
+
+            x = X[offset + self.feature[node]]
+            go_right = ~(x <= self.threshold[node])
+            if has_missing:
+                go_right = np.where(np.isnan(x), ~self.missing_left[node], go_right)
+            node = self.children[2 * node + go_right]
+
+            done = self.is_leaf[node]
+            if done.any():
+                leaves[active[done]] = node[done]
+                keep = ~done
+                active, node, offset = active[keep], node[keep], offset[keep]
+
+        return leaves.reshape(n_rows, n_trees)
+
+    def predict_proba(self, X: np.ndarray, block_rows: int = 1024) -> np.ndarray:
+        """
+        Returns class probabilities, shape (rows, classes)
+
+        Rows are scored in blocks of `block_rows` so the (rows, trees) work arrays stay small for bulk scoring
+
+        :param X: Features in training column order, float32; NaN marks a missing value
+        :type X: np.ndarray
+        """
+        X = np.ascontiguousarray(X, dtype=np.float32)
+        return np.concatenate(
+            [self._predict_block(X[start:start + block_rows]) for start in range(0, len(X), block_rows)]
+            or [np.zeros((0, len(self.classes_)))]
+        )
+
+    def _predict_block(self, X: np.ndarray) -> np.ndarray:
+        leaves = self.apply(X)
+
+        if self.link == "mean":
+            return self.value[leaves].mean(axis=1, dtype=np.float64)
+
+        margin = self.value[leaves, 0].astype(np.float64) @ self.group_matrix + self.intercept
+        if self.link == "sigmoid":
+            positive = 1.0 / (1.0 + np.exp(-margin[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+
+        margin -= margin.max(axis=1, keepdims=True)
+        exp = np.exp(margin)
+        return exp / exp.sum(axis=1, keepdims=True)
@@ -0,0 +1,277 @@
+import os
+import time
+import asyncio
+import logging
+import threading
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+from .artifacts import MANIFEST_FILE, MODEL_FILE, discover_artifacts, read_manifest, load_artifact, feature_names, to_features
+from .compiled import CompiledEnsemble
+
+# Typing
+from typing import Any
+
+# registry.py
+# Lazily loads trained models on demand, keeps the resident set under a memory budget and hot-swaps retrained models
+
+logger = logging.getLogger(__name__)
+
+# Loads of an artifact that is replaced meanwhile are retried
+LOAD_ATTEMPTS       = 3
+LOAD_RETRY_SECONDS  = 0.5
+
+
+class LoadedModel:
+    """
+    One resident version of a trained model
+
+    Tree ensembles exported as compiled.npz are scored by the NumPy predictor unless `use_compiled` is False
+    """
+
+    def __init__(self, table: str, name: str, final_dir: str, version: float, use_compiled: bool = True):
+        self.table = table
+        self.name = name
+        self.version = version
+
+        manifest = read_manifest(final_dir)
+        compiled = manifest.get("compiled")
+        self.compiled = bool(use_compiled and compiled)
+        if self.compiled:
+            self.manifest = manifest
+            self.model = CompiledEnsemble.load(os.path.join(final_dir, compiled["file"]))
+        else:
+            self.model, self.manifest = load_artifact(final_dir)
+
+        # Compressed artifacts take several times their file size once loaded, so the budget counts the loaded arrays
+        self.size_bytes = loaded_size(self.model)
+
+        self.columns = feature_names(self.model, self.manifest)
+        self.classes = [c.item() if isinstance(c, np.generic) else c for c in self.model.classes_]
+
+    def predict_proba(self, rows: list[dict[str, Any]] | pd.DataFrame) -> np.ndarray:
+        features = to_features(rows, self.columns)
+        return self.model.predict_proba(features.to_numpy() if self.compiled else features)
+
+
+def loaded_size(model: Any) -> int:
+    """
+    Returns the in-memory size of a loaded model: the bytes of every NumPy array it references
+
+    sklearn trees keep their nodes in Cython objects, which are measured through their pickled state (views of the
+    node arrays, not copies). XGBoost boosters are measured by their serialised size.
+    """
+    # Objects are kept referenced while walking, so the id of a freed temporary cannot be reused
+    seen = {}
+    total = 0
+    stack = [model]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, (type, str, bytes, int, float, bool, type(None))):
+            continue
+        seen[id(obj)] = obj
+
+        if isinstance(obj, np.ndarray):
+            if obj.dtype != object:
+                total += obj.nbytes
+                continue
+            stack.extend(obj.ravel())
+        elif isinstance(obj, dict):
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set)):
+            stack.extend(obj)
+        elif type(obj).__name__ == "Tree" and hasattr(obj, "__getstate__"):
+            stack.extend(obj.__getstate__().values())
+        elif type(obj).__name__ == "Booster" and hasattr(obj, "save_raw"):
+            total += len(obj.save_raw())
+        elif hasattr(obj, "__dict__"):
+            stack.extend(vars(obj).values())
+
+    return total
+
+
+def artifact_version(final_dir: str) -> float:
+    """
+    Returns the modification time of an artifact
+
+    The training pipeline replaces manifest.json last, so its mtime changes only once the new artifact is complete
+    """
+    manifest_path = os.path.join(final_dir, MANIFEST_FILE)
+    if os.path.exists(manifest_path):
+        return os.path.getmtime(manifest_path)
+    return os.path.getmtime(os.path.join(final_dir, MODEL_FILE))
+
+
+class ModelRegistry:
+    """
+    LRU-bounded cache of trained models over the training output directory
+
+    - Models are loaded the first time they are requested
+    - When the loaded models exceed `max_resident_bytes`, the least recently used models are evicted
+    - `watch()` rescans the directory; A retrained model is loaded next to the old one and swapped in
+      with a single dict assignment, so requests already holding the old model finish on it
+    """
+
+    def __init__(self, output_path: str, max_resident_bytes: int, poll_seconds: float = 30.0, use_compiled: bool = True):
+        self.output_path = output_path
+        self.max_resident_bytes = max_resident_bytes
+        self.poll_seconds = poll_seconds
+        self.use_compiled = use_compiled
+
+        self._artifacts: dict[tuple[str, str], str] = {}
+        self._resident: OrderedDict[tuple[str, str], LoadedModel] = OrderedDict()
+        self._lock = threading.Lock()
+        self._load_locks: dict[tuple[str, str], threading.Lock] = {}
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.swaps = 0
+        self.load_seconds = deque(maxlen=1000)
+
+        self.refresh()
+
+    def keys(self) -> list[tuple[str, str]]:
+        with self._lock:
+            return list(self._artifacts)
+
+    def __contains__(self, key: tuple[str, str]) -> bool:
+        with self._lock:
+            return key in self._artifacts
+
+    def get(self, key: tuple[str, str]) -> LoadedModel:
+        """
+        Returns the resident model for `key`, loading it on a miss
+
+        :raises KeyError: When no artifact exists for `key`
+        """
+        with self._lock:
+            loaded = self._resident.get(key)
+            if loaded is not None:
+                self._resident.move_to_end(key)
+                self.hits += 1
+                return loaded
+
+            final_dir = self._artifacts[key]
+            load_lock = self._load_locks.setdefault(key, threading.Lock())
+
+        # Only one thread loads a given model; Others wait and then hit the cache
+        with load_lock:
+            with self._lock:
+                loaded = self._resident.get(key)
+                if loaded is not None:
+                    self._resident.move_to_end(key)
+                    self.hits += 1
+                    return loaded
+                self.misses += 1
+
+            loaded = self._load(key, final_dir)
+            with self._lock:
+                self._resident[key] = loaded
+                self._evict()
+
+        return loaded
+
+    def _load(self, key: tuple[str, str], final_dir: str) -> LoadedModel:
+        start = time.perf_counter()
+
+        # A retrain can replace the files while they are read; The manifest changes last, so a load is kept only
+        # when the version is the same before and after it
+        for attempt in range(LOAD_ATTEMPTS):
+            version = artifact_version(final_dir)
+            try:
+                loaded = LoadedModel(*key, final_dir, version, self.use_compiled)
+            except Exception:
+                if attempt + 1 == LOAD_ATTEMPTS or artifact_version(final_dir) == version:
+                    raise
+                loaded = None
+
+            if loaded is not None and artifact_version(final_dir) == version:
+                break
+            logger.debug(f"{key[0]}/{key[1]} changed while loading, retrying")
+            time.sleep(LOAD_RETRY_SECONDS)
+        else:
+            raise RuntimeError(f"{key[0]}/{key[1]} kept changing while loading")
+
+        elapsed = time.perf_counter() - start
+
+        self.load_seconds.append(elapsed)
+        kind = "compiled" if loaded.compiled else "native"
+        logger.debug(f"Loaded {key[0]}/{key[1]} ({kind}, {loaded.size_bytes / (1024 * 1024):.1f} MiB) in {elapsed:.2f}s")
+        return loaded
+
+    def _evict(self):
+        # Called with self._lock held; The most recently used model always stays, even if it alone exceeds the budget
+        while len(self._resident) > 1 and self.resident_bytes() > self.max_resident_bytes:
+            key, _ = self._resident.popitem(last=False)
+            self.evictions += 1
+            logger.debug(f"Evicted {key[0]}/{key[1]}")
+
+    def resident_bytes(self) -> int:
+        return sum(loaded.size_bytes for loaded in self._resident.values())
+
+    def refresh(self):
+        """
+        Rescans the output directory for new, retrained and removed artifacts
+
+        Resident models with a newer artifact on disk are reloaded and swapped in
+        """
+        artifacts = discover_artifacts(self.output_path)
+
+        with self._lock:
+            self._artifacts = artifacts
+            for key in [key for key in self._resident if key not in artifacts]:
+                del self._resident[key]
+            stale = [
+                key for key, loaded in self._resident.items()
+                if artifact_version(artifacts[key]) > loaded.version
+            ]
+
+        for key in stale:
+            try:
+                loaded = self._load(key, artifacts[key])
+            except Exception:
+                # A failed reload keeps serving the previous version
+                logger.exception(f"Reloading {key[0]}/{key[1]} failed")
+                continue
+
+            with self._lock:
+                if key in self._resident:
+                    self._resident[key] = loaded
+                    self.swaps += 1
+                    # The new version can be larger than the one it replaced
+                    self._evict()
+            logger.debug(f"Swapped in retrained {key[0]}/{key[1]}")
+
+    async def watch(self):
+        """
+        Rescans the output directory every `poll_seconds`
+        """
+        while True:
+            await asyncio.sleep(self.poll_seconds)
+            try:
+                await asyncio.to_thread(self.refresh)
+            except Exception:
+                logger.exception("Artifact rescan failed")
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns cache and loading metrics
+        """
+        with self._lock:
+            requests = self.hits + self.misses
+            load_seconds = list(self.load_seconds)
+            return {
+                "artifacts": len(self._artifacts),
+                "resident": [f"{table}/{name}" for table, name in self._resident],
+                "resident_mb": self.resident_bytes() / (1024 * 1024),
+                "max_resident_mb": self.max_resident_bytes / (1024 * 1024),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / requests if requests else 0.0,
+                "evictions": self.evictions,
+                "swaps": self.swaps,
+                "load_p50_s": float(np.percentile(load_seconds, 50)) if load_seconds else 0.0,
+                "load_max_s": max(load_seconds, default=0.0),
+            }
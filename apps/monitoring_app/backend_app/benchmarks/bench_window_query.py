@@ -0,0 +1,112 @@
+import os
+import time
+import argparse
+
+import numpy as np
+import psycopg2
+
+# bench_window_query.py
+# Benchmarks the monitoring backend's recent-window reads against table size:
+#   - the original ORDER BY created_at DESC FETCH FIRST n query, without and with the (created_at, entry_id) index
+#   - keyset reads of the rows after the last seen row, by entry_id (primary key) and by (created_at, entry_id)
+#   - a created_at range read on a BRIN index
+#
+# Usage (database port-forwarded to localhost:5432, POSTGRES_PASS set):
+#   python benchmarks/bench_window_query.py --rows 10000 100000 1000000
+#
+# Creates and drops scratch tables named bench_window_<rows>.
+
+WINDOW_ROWS = 10000
+NEW_ROWS = 100
+
+QUERIES = {
+    "order by created_at": "SELECT * FROM {table} ORDER BY created_at DESC FETCH FIRST {window} ROWS ONLY;",
+    "keyset entry_id": "SELECT * FROM {table} WHERE entry_id > {last_entry_id} ORDER BY entry_id DESC LIMIT {window};",
+    "keyset created_at": (
+        "SELECT * FROM {table} WHERE created_at >= '{last_created_at}' "
+        "AND (created_at, entry_id) > ('{last_created_at}', {last_entry_id}) "
+        "ORDER BY created_at DESC, entry_id DESC LIMIT {window};"
+    ),
+}
+
+
+def create_table(cursor, table: str, rows: int):
+    cursor.execute(f"DROP TABLE IF EXISTS {table};")
+    cursor.execute(f'''
+        CREATE TABLE {table} (
+            created_at TIMESTAMPTZ,
+            entry_id SERIAL PRIMARY KEY,
+            temperature FLOAT,
+            turbidity FLOAT,
+            dissolved_oxygen FLOAT,
+            ph FLOAT,
+            ammonia FLOAT,
+            nitrate FLOAT,
+            population INT,
+            fish_length FLOAT,
+            fish_weight FLOAT
+        );
+    ''')
+    # One reading every 5 seconds, appended in time order like the sensor feed
+    cursor.execute(f'''
+        INSERT INTO {table} (created_at, temperature, turbidity, dissolved_oxygen, ph, ammonia, nitrate, population, fish_length, fish_weight)
+        SELECT TIMESTAMPTZ '2024-01-01' + i * INTERVAL '5 seconds', random() * 30, random() * 100, random() * 10, 6 + random() * 3,
+               random(), random() * 200, 50 + (random() * 10)::INT, random() * 40, random() * 400
+        FROM generate_series(1, {rows}) AS i;
+    ''')
+    cursor.execute(f"ANALYZE {table};")
+
+def median_ms(cursor, sql_query: str, repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        cursor.execute(sql_query)
+        cursor.fetchall()
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings)) * 1000
+
+def run(cursor, rows: int, repeats: int) -> dict[str, float]:
+    table = f"bench_window_{rows}"
+    create_table(cursor, table, rows)
+
+    # Keyset reads fetch the NEW_ROWS rows added since the last evaluation
+    cursor.execute(f"SELECT created_at, entry_id FROM {table} ORDER BY entry_id DESC OFFSET {NEW_ROWS} LIMIT 1;")
+    last_created_at, last_entry_id = cursor.fetchone()
+    params = {"table": table, "window": WINDOW_ROWS, "last_entry_id": last_entry_id, "last_created_at": last_created_at}
+
+    results = {"no index: order by created_at": median_ms(cursor, QUERIES["order by created_at"].format(**params), repeats)}
+
+    cursor.execute(f"CREATE INDEX {table}_created_at_entry_id_idx ON {table} (created_at, entry_id);")
+    cursor.execute(f"ANALYZE {table};")
+    for name, sql_query in QUERIES.items():
+        results[f"btree: {name}"] = median_ms(cursor, sql_query.format(**params), repeats)
+
+    cursor.execute(f"DROP INDEX {table}_created_at_entry_id_idx;")
+    cursor.execute(f"CREATE INDEX {table}_created_at_brin ON {table} USING BRIN (created_at);")
+    cursor.execute(f"ANALYZE {table};")
+    results["brin: created_at range"] = median_ms(
+        cursor, f"SELECT * FROM {table} WHERE created_at > '{last_created_at}';", repeats
+    )
+
+    cursor.execute(f"DROP TABLE {table};")
+    return results
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--repeats", type=int, default=20)
+    parser.add_argument("--host", default=os.getenv("DATABASE_DNS", "127.0.0.1"))
+    parser.add_argument("--port", default=os.getenv("DATABASE_PORT", "5432"))
+    args = parser.parse_args()
+
+    with psycopg2.connect(user="admin", password=os.getenv("POSTGRES_PASS"), host=args.host, port=args.port, database="sensor-db") as conn:
+        conn.autocommit = True
+        cursor = conn.cursor()
+
+        print(f"{'rows':>9} {'query':<34} {'median ms':>10}")
+        for rows in args.rows:
+            for name, latency in run(cursor, rows, args.repeats).items():
+                print(f"{rows:>9} {name:<34} {latency:>10.2f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+import time
+import json
+import argparse
+import threading
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+# load_test.py
+# Concurrent load test for the monitoring backend: POST / throughput and latency, and GET / health check latency while the POSTs run
+#
+# Usage (backend on localhost:8001):
+#   python benchmarks/load_test.py --url http://localhost:8001 --tables iot_pond_1 iot_pond_2 --concurrency 1 4 16
+#
+# Run it once against the previous image and once against the current one to compare. FULL_REPORT_INTERVAL_S=0 makes every
+# POST generate a full Evidently report, which is the worst case for the event loop.
+
+
+def post(url: str, table: str) -> float:
+    body = json.dumps({"table_name": table}).encode()
+    request = urllib.request.Request(url, data=body, headers={"Content-Type": "application/json"}, method="POST")
+
+    start = time.perf_counter()
+    with urllib.request.urlopen(request, timeout=300) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def get(url: str) -> float:
+    start = time.perf_counter()
+    with urllib.request.urlopen(url, timeout=300) as response:
+        response.read()
+    return time.perf_counter() - start
+
+def probe_health(url: str, interval: float, stop: threading.Event, latencies: list[float]):
+    # Plays the role of the kubelet / HPA probes: One GET / at a fixed interval
+    while not stop.is_set():
+        latencies.append(get(url))
+        stop.wait(interval)
+
+def run(url: str, tables: list[str], concurrency: int, requests: int) -> dict[str, float]:
+    """
+    Sends `requests` POSTs with `concurrency` in flight, cycling through `tables`, while probing GET /
+
+    :return: Throughput and latency percentiles in milliseconds
+    :rtype: dict[str, float]
+    """
+    stop = threading.Event()
+    health: list[float] = []
+    prober = threading.Thread(target=probe_health, args=(url, 0.1, stop, health))
+    prober.start()
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(lambda i: post(url, tables[i % len(tables)]), range(requests)))
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    prober.join()
+
+    post_p50, post_p99 = np.percentile(latencies, [50, 99]) * 1000
+    health_p50, health_p99 = np.percentile(health, [50, 99]) * 1000
+    return {
+        "requests_per_sec": requests / elapsed,
+        "post_p50_ms": post_p50,
+        "post_p99_ms": post_p99,
+        "health_p50_ms": health_p50,
+        "health_p99_ms": health_p99,
+        "health_max_ms": max(health) * 1000,
+    }
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--url", default="http://localhost:8001")
+    parser.add_argument("--tables", nargs="+", default=["iot_pond_1"])
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--requests", type=int, default=64)
+    args = parser.parse_args()
+
+    url = args.url.rstrip("/") + "/"
+    print(f"{'conc':>5} {'req/s':>8} {'POST p50':>9} {'POST p99':>9} {'GET / p50':>10} {'GET / p99':>10} {'GET / max':>10}")
+    for concurrency in args.concurrency:
+        result = run(url, args.tables, concurrency, args.requests)
+        print(
+            f"{concurrency:>5} {result['requests_per_sec']:>8.2f} {result['post_p50_ms']:>9.1f} {result['post_p99_ms']:>9.1f} "
+            f"{result['health_p50_ms']:>10.1f} {result['health_p99_ms']:>10.1f} {result['health_max_ms']:>10.1f}"
+        )
+
+if __name__ == "__main__":
+    main()
@@ -1,34 +1,102 @@
 import os
 import time
+import asyncio
 import logging
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import asynccontextmanager
 
 import pandas as pd
-from sqlalchemy import create_engine
-from .reporting import generate_report, is_data_drift
+from sqlalchemy import URL, text
+from sqlalchemy.ext.asyncio import create_async_engine
+from .drift import DriftState, stacked_psi
+from .jobs import JobQueue
+from . import metrics
+from .reporting import drift_signature, generate_report_json, is_data_drift
+from evidently.core.report import Snapshot
 from evidently.ui.workspace import RemoteWorkspace
 
-from fastapi import FastAPI, status
+from fastapi import FastAPI, HTTPException, Response, status
 from pydantic import BaseModel
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 from requests.exceptions import ConnectionError
 
 logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-app = FastAPI()
-
 # Accessing the database
 POSTGRES_PASS = os.getenv("POSTGRES_PASS")
 DATABASE_DNS = os.getenv("DATABASE_DNS")
 DATABASE_PORT = os.getenv("DATABASE_PORT")
 
-DB_NAME     = "sensor-db"
-USER        = "admin"
+DB_NAME     = os.getenv("DATABASE_NAME", "sensor-db")
+USER        = os.getenv("DATABASE_USER", "admin")
 PASSWORD    = POSTGRES_PASS
 HOST        = DATABASE_DNS
 PORT        = DATABASE_PORT
-engine = create_engine(f'postgresql://{USER}:{PASSWORD}@{HOST}:{PORT}/{DB_NAME}')
+
+# Connection pool per replica: Each replica opens at most DB_POOL_SIZE + DB_MAX_OVERFLOW connections, so Postgres
+# max_connections has to cover that times the HPA's maximum replica count
+DB_POOL_SIZE        = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW     = int(os.getenv("DB_MAX_OVERFLOW", "5"))
+DB_POOL_TIMEOUT_S   = float(os.getenv("DB_POOL_TIMEOUT_S", "30"))
+DB_POOL_RECYCLE_S   = int(os.getenv("DB_POOL_RECYCLE_S", "1800"))
+DB_POOL_PRE_PING    = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# Async driver: Reads wait on the event loop instead of blocking it
+# URL.create escapes the credentials, which the f-string URL did not
+engine = create_async_engine(
+    URL.create("postgresql+asyncpg", username=USER, password=PASSWORD, host=HOST, port=int(PORT) if PORT else None, database=DB_NAME),
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW,
+    pool_timeout=DB_POOL_TIMEOUT_S,
+    pool_recycle=DB_POOL_RECYCLE_S,
+    pool_pre_ping=DB_POOL_PRE_PING,
+)
+metrics.instrument_pool(engine)
 logger.debug("Engine created successfully")
 
+# Full Evidently reports run at most this often per table, or as soon as the incremental PSI check detects drift
+FULL_REPORT_INTERVAL_S = float(os.getenv("FULL_REPORT_INTERVAL_S", "3600"))
+
+# Reports with the same drift result as the last uploaded one are only uploaded every N seconds (0 uploads every report);
+# The frontend's compact_ws.py keeps the uploaded ones within the workspace volume's budget
+UNCHANGED_UPLOAD_INTERVAL_S = float(os.getenv("UNCHANGED_UPLOAD_INTERVAL_S", "86400"))
+
+# Recent-window reads: "entry_id" keyset on the primary key, or "created_at" keyset on the created_at index
+WINDOW_ORDER    = os.getenv("WINDOW_ORDER", "entry_id").lower()
+MANAGE_INDEXES  = os.getenv("MANAGE_INDEXES", "false").lower() == "true"
+
+# Evidently reports are CPU-bound and run in this many worker processes
+REPORT_WORKERS = int(os.getenv("REPORT_WORKERS", "1"))
+report_pool: ProcessPoolExecutor | None = None
+
+# Evaluation job queue: Concurrent evaluations, minimum seconds between evaluations of one table, finished jobs kept for polling
+EVALUATION_WORKERS      = int(os.getenv("EVALUATION_WORKERS", "2"))
+TABLE_MIN_INTERVAL_S    = float(os.getenv("TABLE_MIN_INTERVAL_S", "60"))
+JOB_HISTORY             = int(os.getenv("JOB_HISTORY", "1000"))
+job_queue: JobQueue | None = None
+
+# Workspace uploads in flight; Referenced so they are not garbage collected
+uploads: set[asyncio.Task] = set()
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global report_pool, job_queue
+
+    # Spawned workers only import reporting.py, not this module with its engine and workspace connection
+    report_pool = ProcessPoolExecutor(max_workers=REPORT_WORKERS, mp_context=multiprocessing.get_context("spawn"))
+    job_queue = JobQueue(EVALUATION_WORKERS, TABLE_MIN_INTERVAL_S, JOB_HISTORY)
+    job_queue.start()
+    yield
+
+    await job_queue.stop()
+    report_pool.shutdown(cancel_futures=True)
+    await engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
+
 # Connect to the remote workspace for updating the monitoring dashboards
 WORKSPACE_URL = os.getenv("WORKSPACE_URL")
 ws = None
@@ -51,44 +119,280 @@ class Evaluate(BaseModel):
     columns_to_check    : list[str] = ["temperature", "turbidity", "dissolved_oxygen", "ph", "ammonia", "nitrate", "population", "fish_length", "fish_weight"]
     report_range        : int       = 10000
 
-@app.post("/", status_code=status.HTTP_202_ACCEPTED)
-async def post_root(payload: Evaluate):
-    # Get the most recent {report_range} rows
-    sql_query = f"SELECT * FROM {payload.table_name} ORDER BY created_at DESC FETCH FIRST {payload.report_range} ROWS ONLY;"
-    df = pd.read_sql(sql_query, engine)
-    df = df.loc[:, payload.columns_to_check]
-    logger.debug("Data has been loaded")
-
-    # Split extracted data into half for reference data and current data splits
-    if payload.report_range % 2 != 0:
-        # Report range must be even
-        report_range = payload.report_range + 1
+class EvaluateBatch(BaseModel):
+    table_names         : list[str]
+    columns_to_check    : list[str] = ["temperature", "turbidity", "dissolved_oxygen", "ph", "ammonia", "nitrate", "population", "fish_length", "fish_weight"]
+    report_range        : int       = 10000
+
+# Rolling drift windows, one per table
+drift_states: dict[str, DriftState] = {}
+
+def get_drift_state(table_name: str, columns: list[str], report_range: int) -> DriftState:
+    state = drift_states.get(table_name)
+    if state is None or state.columns != columns or state.window_rows != report_range + report_range % 2:
+        state = drift_states[table_name] = DriftState(table_name, columns, report_range)
+    return state
+
+# Tables whose created_at index has been checked; The lock keeps two evaluations from building the same index
+checked_indexes: set[str] = set()
+index_lock = asyncio.Lock()
+
+async def ensure_created_at_index(table: str):
+    """
+    Checks once per table that a valid index starts with created_at, and creates one if MANAGE_INDEXES is set
+
+    Without it every created_at-ordered read sorts the whole table. The index is built with CREATE INDEX CONCURRENTLY on an
+    autocommit connection, so inserts into the table continue during the build. Creating fails on read-only replicas; The
+    table is then only logged, and the loader (scripts/python_helpers/database_csv_upload.py) creates the index on the primary.
+    A table is only marked as checked once the check query succeeded, so a failed check is retried on the next evaluation.
+    """
+    if WINDOW_ORDER != "created_at" or table in checked_indexes:
+        return
+
+    async with index_lock:
+        if table not in checked_indexes:
+            await check_created_at_index(table)
+
+async def check_created_at_index(table: str):
+    quote = engine.dialect.identifier_preparer.quote
+    index_name = quote(f"{table}_created_at_entry_id_idx")
+    # A failed concurrent build leaves an invalid index behind, which the planner ignores
+    index_query = text(
+        "SELECT 1 FROM pg_index i "
+        "JOIN pg_attribute a ON a.attrelid = i.indrelid AND a.attnum = i.indkey[0] "
+        "WHERE i.indrelid = to_regclass(:table) AND a.attname = 'created_at' AND i.indisvalid;"
+    )
+    async with metrics.connection(engine) as conn:
+        with metrics.timed_query("index_check"):
+            found = (await conn.execute(index_query, {"table": quote(table)})).first() is not None
+    checked_indexes.add(table)
+    if found:
+        return
+
+    create_index = f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {index_name} ON {quote(table)} (created_at, entry_id);"
+    if not MANAGE_INDEXES:
+        logger.warning(f"{table} has no created_at index, reads sort the whole table: {create_index}")
+        return
+
+    try:
+        # CONCURRENTLY cannot run inside a transaction block
+        async with metrics.connection(engine) as conn:
+            conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+            # An invalid index of an interrupted build would make IF NOT EXISTS skip the build
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name};"))
+            await conn.execute(text(create_index))
+        logger.debug(f"Created the created_at index of {table}")
+    except Exception:
+        logger.exception(f"Creating the created_at index of {table} failed (read-only replica?)")
+
+def new_rows_query(state: DriftState, index: int = 0) -> tuple[str, dict]:
+    """
+    Builds the keyset query for the rows added after the state's last row, at most one window's worth (the whole window on the first call)
+
+    With WINDOW_ORDER "created_at" rows are ordered by (created_at, entry_id); The plain created_at bound lets BRIN and btree
+    indexes skip the older rows. Parameter names are suffixed with `index`, so several queries can be combined with UNION ALL
+    """
+    quote = engine.dialect.identifier_preparer.quote
+    columns = ", ".join(quote(column) for column in state.columns)
+    params = {f"window_rows_{index}": state.window_rows}
+    where_clause = ""
+
+    if WINDOW_ORDER == "created_at":
+        columns = f"created_at, {columns}"
+        order = "created_at DESC, entry_id DESC"
+        if state.last_entry_id is not None:
+            where_clause = (
+                f"WHERE created_at >= :last_created_at_{index} "
+                f"AND (created_at, entry_id) > (:last_created_at_{index}, :last_entry_id_{index})"
+            )
+            params[f"last_created_at_{index}"] = state.last_created_at
+            params[f"last_entry_id_{index}"] = state.last_entry_id
     else:
-        report_range = payload.report_range
-
-    halfway_point = int(report_range / 2)
-    current = df.iloc[:halfway_point, :]
-    reference = df.iloc[halfway_point:, :]
-
-    # Generate a data drift report
-    drift_snapshot, drift_snapshot_dict = generate_report(
-        reference_df=reference, 
-        current_df=current, 
-        columns=payload.columns_to_check,
-        metadata={"table": payload.table_name}
+        order = "entry_id DESC"
+        if state.last_entry_id is not None:
+            where_clause = f"WHERE entry_id > :last_entry_id_{index}"
+            params[f"last_entry_id_{index}"] = state.last_entry_id
+
+    sql_query = (
+        f"SELECT {index} AS table_index, entry_id, {columns} FROM {quote(state.table)} {where_clause} "
+        f"ORDER BY {order} LIMIT :window_rows_{index}"
+    )
+    return sql_query, params
+
+async def fetch_new_rows(states: list[DriftState]) -> list[pd.DataFrame]:
+    """
+    Reads the new rows of every state in a single round trip
+
+    :return: New rows of each state, in entry_id order
+    :rtype: list[pd.DataFrame]
+    """
+    queries, params = [], {}
+    for index, state in enumerate(states):
+        sql_query, query_params = new_rows_query(state, index)
+        queries.append(f"({sql_query})")
+        params.update(query_params)
+
+    async with metrics.connection(engine) as conn:
+        with metrics.timed_query("new_rows" if len(states) == 1 else "new_rows_batch"):
+            result = await conn.execute(text(" UNION ALL ".join(queries) + ";"), params)
+            rows = result.fetchall()
+        df = pd.DataFrame(rows, columns=list(result.keys()))
+    metrics.ROWS_FETCHED.observe(len(df))
+
+    order = ["created_at", "entry_id"] if WINDOW_ORDER == "created_at" else ["entry_id"]
+    groups = dict(tuple(df.groupby("table_index", sort=False))) if not df.empty else {}
+    return [groups.get(index, df.iloc[:0]).sort_values(order) for index in range(len(states))]
+
+def upload_snapshot(snapshot_json: str, table_name: str):
+    """
+    Sends a report to the dashboard; Runs in a thread so the evaluation does not wait for the upload
+    """
+    try:
+        ws.add_run(project.id, Snapshot.loads(snapshot_json))
+        metrics.SNAPSHOT_UPLOADS.labels(outcome="uploaded").inc()
+        logger.debug(f"Report of {table_name} added to workspace")
+    except Exception:
+        metrics.SNAPSHOT_UPLOADS.labels(outcome="failed").inc()
+        logger.exception(f"Uploading the report of {table_name} failed")
+
+async def full_report(state: DriftState) -> bool:
+    """
+    Generates the Evidently report of a state's window in a worker process and uploads it in the background,
+    unless its drift result is unchanged since the last upload
+
+    :return: Returns True if the report finds data drift
+    :rtype: bool
+    """
+    reference, current = state.frames()
+    snapshot_json, drift_snapshot_dict = await asyncio.get_running_loop().run_in_executor(
+        report_pool,
+        generate_report_json,
+        reference,
+        current,
+        state.columns,
+        {"table": state.table},
     )
 
-    # Send the report to the dashboard
-    ws.add_run(project.id, drift_snapshot)
-    logger.debug("Report generated and added to workspace")
+    signature = drift_signature(drift_snapshot_dict)
+    if state.upload_due(signature, UNCHANGED_UPLOAD_INTERVAL_S):
+        # Send the report to the dashboard in the background
+        upload = asyncio.create_task(asyncio.to_thread(upload_snapshot, snapshot_json, state.table))
+        uploads.add(upload)
+        upload.add_done_callback(uploads.discard)
+        state.uploaded_signature = signature
+        state.last_upload = time.monotonic()
+        logger.debug(f"Report of {state.table} generated")
+    else:
+        metrics.SNAPSHOT_UPLOADS.labels(outcome="unchanged").inc()
+        logger.debug(f"Report of {state.table} generated, drift result unchanged since the last upload")
+
+    # Bin edges are refitted to the window the report covered
+    state.refit()
+    state.last_report = time.monotonic()
+    return is_data_drift(drift_snapshot_dict)
+
+async def evaluate_states(states: list[DriftState]) -> dict[str, dict]:
+    """
+    Updates the states with their new rows and evaluates drift; The caller holds the states' locks
+
+    PSI of all tables is computed at once on (tables, columns, bins) counts. Tables that are due get a full report, in parallel.
+    """
+    for state in states:
+        await ensure_created_at_index(state.table)
+
+    frames = await fetch_new_rows(states)
+    rows_fetched = [
+        state.update(
+            df["entry_id"].to_numpy(),
+            df.loc[:, state.columns].to_numpy(dtype=float),
+            df["created_at"].tolist() if "created_at" in df else None,
+        )
+        for state, df in zip(states, frames)
+    ]
+
+    results = {}
+    for state, psi_values, rows in zip(states, stacked_psi(states), rows_fetched):
+        result = state.summary(psi_values)
+        result["rows_fetched"] = rows
+        if len(state.values) == 0:
+            # Empty source table: Nothing to report, Evidently would only get empty frames
+            logger.debug(f"{state.table} has no rows, skipping its drift evaluation")
+            result["full_report"] = False
+            results[state.table] = result
+            continue
+
+        result["full_report"] = state.report_due(result["drift"], FULL_REPORT_INTERVAL_S)
+        state.drift = result["drift"]
+        results[state.table] = result
+
+    due = [state for state in states if results[state.table]["full_report"]]
+    for state, drift in zip(due, await asyncio.gather(*(full_report(state) for state in due))):
+        # The report is the reference result
+        results[state.table]["drift"] = drift
+
+    for table, result in results.items():
+        # If model retraining is required, call the retraining pipeline
+        if result["drift"]:
+            # TODO: Send retraining request to the training pipeline service
+            logger.debug(f"Data drift detected in {table}, sending retraining request")
+
+    return results
+
+async def evaluate(payload: Evaluate) -> dict:
+    """
+    Runs one drift evaluation; Called by the job queue workers
+    """
+    state = get_drift_state(payload.table_name, payload.columns_to_check, payload.report_range)
+
+    async with state.lock:
+        # Only rows newer than the last evaluation are read; The rest of the window is kept in memory
+        results = await evaluate_states([state])
+
+    return results[payload.table_name]
+
+async def evaluate_batch(payload: EvaluateBatch) -> dict:
+    """
+    Runs the drift evaluation of several tables with one query; Called by the job queue workers
+    """
+    tables = sorted(set(payload.table_names))
+    states = [get_drift_state(table, payload.columns_to_check, payload.report_range) for table in tables]
+
+    # Locks are always taken in table name order, so overlapping batches cannot deadlock
+    async with contextlib.AsyncExitStack() as stack:
+        for state in states:
+            await stack.enter_async_context(state.lock)
+        results = await evaluate_states(states)
+
+    return {"tables": results, "drifted_tables": [table for table, result in results.items() if result["drift"]]}
+
+@app.post("/", status_code=status.HTTP_202_ACCEPTED)
+async def post_root(payload: Evaluate):
+    # Requests for a table whose job is still queued share that job
+    job, coalesced = job_queue.submit([payload.table_name], payload, evaluate)
+    return {"job_id": job.id, "status": job.status, "coalesced": coalesced, "not_before": job.not_before}
+
+@app.post("/batch", status_code=status.HTTP_202_ACCEPTED)
+async def post_batch(payload: EvaluateBatch):
+    # Every table of the batch is rate limited, and batches over the same set of tables share a queued job
+    job, coalesced = job_queue.submit(payload.table_names, payload, evaluate_batch)
+    return {"job_id": job.id, "status": job.status, "coalesced": coalesced, "not_before": job.not_before}
+
+@app.get("/jobs", status_code=status.HTTP_200_OK)
+async def get_jobs():
+    # Number of kept jobs per status
+    return job_queue.snapshot()
 
-    # If model retraining is required, call the retraining pipeline
-    if is_data_drift(drift_snapshot_dict):
-        # TODO: Send retraining request to the training pipeline service
-        logger.debug("Data drift detected, sending retraining request")
-        pass
+@app.get("/jobs/{job_id}", status_code=status.HTTP_200_OK)
+async def get_job(job_id: str):
+    job = job_queue.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"No job {job_id}")
+    return job.dict()
 
-    return 
+@app.get("/metrics", status_code=status.HTTP_200_OK)
+def get_metrics():
+    # Prometheus text exposition of the pool, query and row metrics
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
 
 @app.get("/", status_code=status.HTTP_200_OK)
 def get_root():
@@ -0,0 +1,227 @@
+import math
+import time
+import asyncio
+
+import numpy as np
+import pandas as pd
+from .reporting import psi, is_psi_drift
+
+# Typing
+from typing import Any
+
+# drift.py
+# Rolling per-table drift state: The recent window is kept in memory and binned once,
+# so each evaluation only reads the rows added since the previous one
+
+# Value counts instead of histograms below this many distinct reference values (as Evidently does)
+MAX_DISCRETE_VALUES = 20
+
+
+class DriftState:
+    """
+    Reference and current windows of one table with their histogram counts
+
+    The window holds the newest `window_rows` rows in entry_id or (created_at, entry_id) order: The newest half is the current data
+    and the older half is the reference data, like the ORDER BY created_at DESC query it replaces. When k new rows arrive, the oldest
+    k rows leave the reference window, the oldest k current rows move to the reference window and the new rows join the current
+    window; Only those 3k rows are counted, and PSI costs O(columns x bins).
+
+    Bin edges are fitted like Evidently's PSI (Sturges bins over both windows, or value counts for low-cardinality columns) and
+    stay fixed until `refit()`, which runs whenever the full Evidently report is generated. Values outside the fitted range are
+    counted in the outermost bins until then.
+    """
+
+    def __init__(self, table: str, columns: list[str], window_rows: int):
+        self.table = table
+        self.columns = columns
+        self.window_rows = window_rows + window_rows % 2
+        self.half = self.window_rows // 2
+
+        self.values = np.empty((0, len(columns)), dtype=np.float64)
+        self.codes = np.empty((0, len(columns)), dtype=np.uint8)
+        self.last_entry_id: int | None = None
+        self.last_created_at: Any = None
+
+        self.edges: list[np.ndarray] = []
+        self.discrete = np.zeros(len(columns), dtype=bool)
+        self.n_bins = 1
+        self.valid = np.zeros((len(columns), 1), dtype=bool)
+        self.reference_counts = np.zeros((len(columns), 1))
+        self.current_counts = np.zeros((len(columns), 1))
+
+        # monotonic() starts near 0 at boot, so 0.0 would make the first report and upload wait up to one interval
+        self.last_report = -math.inf
+        self.drift = False
+        self.uploaded_signature: tuple | None = None
+        self.last_upload = -math.inf
+        self.lock = asyncio.Lock()
+
+    def update(self, entry_ids: np.ndarray, values: np.ndarray, created_at: np.ndarray | None = None) -> int:
+        """
+        Adds rows newer than the last seen row to the window
+
+        :param entry_ids: entry_id of each row, in window order
+        :param values: Row values in `columns` order
+        :param created_at: created_at of each row; Tracked for keyset reads ordered by created_at
+
+        :type entry_ids: np.ndarray
+        :type values: np.ndarray
+        :type created_at: np.ndarray | None
+
+        :return: Number of rows added
+        :rtype: int
+        """
+        k = len(entry_ids)
+        if k == 0:
+            return 0
+
+        values = np.asarray(values, dtype=np.float64)
+        self.last_entry_id = int(entry_ids[-1])
+        if created_at is not None:
+            self.last_created_at = created_at[-1]
+
+        if not self.edges:
+            self.values = values[-self.window_rows:]
+            self.refit()
+            return k
+
+        codes = self._encode(values)
+        full = len(self.values) == self.window_rows
+
+        if full and k <= self.half:
+            # Incremental update: Only the rows that leave, move between or enter the windows are counted
+            leaving = self.codes[:k]
+            moving = self.codes[self.half:self.half + k]
+            self.reference_counts += self._count(moving) - self._count(leaving)
+            self.current_counts += self._count(codes) - self._count(moving)
+            self.values = np.concatenate([self.values[k:], values])
+            self.codes = np.concatenate([self.codes[k:], codes])
+        else:
+            # The window is still filling up or more than half of it was replaced
+            self.values = np.concatenate([self.values, values])[-self.window_rows:]
+            self.codes = np.concatenate([self.codes, codes])[-self.window_rows:]
+            self._recount()
+
+        return k
+
+    def refit(self):
+        """
+        Fits the bin edges to the current window and recounts it
+        """
+        reference, current = self._split(self.values)
+        self.edges = []
+        for i in range(len(self.columns)):
+            column = self.values[:, i]
+            column = column[~np.isnan(column)]
+            reference_values = reference[:, i][~np.isnan(reference[:, i])]
+
+            self.discrete[i] = 0 < len(np.unique(reference_values)) <= MAX_DISCRETE_VALUES
+            if self.discrete[i]:
+                self.edges.append(np.unique(column))
+            elif len(column):
+                self.edges.append(np.histogram_bin_edges(column, bins="sturges"))
+            else:
+                self.edges.append(np.zeros(2))
+
+        # Discrete columns get one extra bin for values first seen after the fit
+        bins_per_column = np.array([len(e) - 1 + 2 * d for e, d in zip(self.edges, self.discrete)])
+        self.n_bins = int(bins_per_column.max()) + 1  # Last bin holds missing values
+        self.valid = np.arange(self.n_bins)[None, :] < bins_per_column[:, None]
+
+        self.codes = self._encode(self.values)
+        self._recount()
+
+    def _encode(self, values: np.ndarray) -> np.ndarray:
+        # Discrete edges come from the whole window, so there can be up to one bin per row; Smallest type that holds them all
+        codes = np.empty(values.shape, dtype=np.min_scalar_type(self.n_bins))
+        for i, edges in enumerate(self.edges):
+            column = values[:, i]
+            if self.discrete[i]:
+                index = np.searchsorted(edges, column).clip(max=len(edges) - 1)
+                codes[:, i] = np.where(edges[index] == column, index, len(edges))
+            else:
+                # np.histogram bins are right-open except the last one
+                codes[:, i] = np.searchsorted(edges[1:-1], column, side="right")
+            codes[np.isnan(column), i] = self.n_bins - 1
+        return codes
+
+    def _count(self, codes: np.ndarray) -> np.ndarray:
+        # One bincount for every column: Column i uses slots [i * n_bins, (i + 1) * n_bins)
+        offsets = np.arange(codes.shape[1]) * self.n_bins
+        counts = np.bincount((codes + offsets).ravel(), minlength=codes.shape[1] * self.n_bins)
+        return counts.reshape(codes.shape[1], self.n_bins).astype(np.float64)
+
+    def _recount(self):
+        reference, current = self._split(self.codes)
+        self.reference_counts = self._count(reference)
+        self.current_counts = self._count(current)
+
+    def _split(self, window: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Newest `half` rows are current, the rest is reference
+        boundary = max(len(window) - self.half, 0)
+        return window[:boundary], window[boundary:]
+
+    def psi(self) -> np.ndarray:
+        """
+        Returns the PSI of every column between the reference and current windows
+        """
+        return psi(self.reference_counts, self.current_counts, self.valid)
+
+    def frames(self) -> tuple[pd.DataFrame, pd.DataFrame]:
+        """
+        Returns the reference and current windows as DataFrames for the full Evidently report
+        """
+        reference, current = self._split(self.values)
+        return pd.DataFrame(reference, columns=self.columns), pd.DataFrame(current, columns=self.columns)
+
+    def summary(self, psi_values: np.ndarray | None = None) -> dict[str, Any]:
+        """
+        Returns the PSI per column and the drift flag; `psi_values` can be passed in when computed for several tables at once
+        """
+        psi_values = self.psi() if psi_values is None else psi_values
+        return {
+            "table": self.table,
+            "last_entry_id": self.last_entry_id,
+            "window_rows": len(self.values),
+            "psi": {column: None if np.isnan(value) else float(value) for column, value in zip(self.columns, psi_values)},
+            "drift": bool(is_psi_drift(psi_values)),
+        }
+
+    def upload_due(self, signature: tuple, interval: float) -> bool:
+        """
+        A report is uploaded when its drift result differs from the last uploaded one, and otherwise every `interval` seconds
+        (every report if 0), so the dashboard still gets a point now and then while nothing changes
+        """
+        return signature != self.uploaded_signature or time.monotonic() - self.last_upload >= interval
+
+    def report_due(self, drift: bool, interval: float) -> bool:
+        """
+        The full report runs every `interval` seconds, and immediately when the PSI check starts reporting drift
+        """
+        return (drift and not self.drift) or time.monotonic() - self.last_report >= interval
+
+
+def stacked_psi(states: list[DriftState]) -> np.ndarray:
+    """
+    Computes the PSI of several tables at once
+
+    The counts of every state are padded to a common bin count and stacked to (tables, columns, bins), so one vectorised
+    `psi()` call covers all tables. All states must check the same columns.
+
+    :param states: Drift states of the tables
+    :type states: list[DriftState]
+
+    :return: PSI per table and column, shape (tables, columns)
+    :rtype: np.ndarray
+    """
+    n_bins = max(state.n_bins for state in states)
+    shape = (len(states), len(states[0].columns), n_bins)
+    reference_counts, current_counts = np.zeros(shape), np.zeros(shape)
+    valid = np.zeros(shape, dtype=bool)
+
+    for i, state in enumerate(states):
+        reference_counts[i, :, :state.n_bins] = state.reference_counts
+        current_counts[i, :, :state.n_bins] = state.current_counts
+        valid[i, :, :state.n_bins] = state.valid
+
+    return psi(reference_counts, current_counts, valid)
@@ -0,0 +1,185 @@
+import time
+import uuid
+import asyncio
+import logging
+from collections import OrderedDict
+
+from pydantic import BaseModel
+
+# Typing
+from typing import Any, Awaitable, Callable
+
+# jobs.py
+# In-process queue for drift evaluations: Pending requests for the same tables share one job, and each table is evaluated at most once per interval
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """
+    One queued drift evaluation and its outcome
+    """
+
+    def __init__(
+            self,
+            key: str,
+            tables: list[str],
+            payload: BaseModel,
+            handler: Callable[[BaseModel], Awaitable[dict[str, Any]]],
+            not_before: float,
+        ):
+        self.id = uuid.uuid4().hex
+        self.key = key
+        self.tables = tables
+        self.table = ",".join(tables)
+        self.payload = payload
+        self.handler = handler
+        self.status = "queued"
+        self.submitted = 1
+        self.created_at = time.time()
+        self.not_before = not_before
+        self.started_at: float | None = None
+        self.finished_at: float | None = None
+        self.result: dict[str, Any] | None = None
+        self.error: str | None = None
+
+    def dict(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "table": self.table,
+            "tables": self.tables,
+            "status": self.status,
+            "submitted": self.submitted,
+            "created_at": self.created_at,
+            "not_before": self.not_before,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "result": self.result,
+            "error": self.error,
+        }
+
+
+class JobQueue:
+    """
+    Runs drift evaluations on a fixed number of worker tasks
+
+    - A request for the same tables as a job that has not started yet joins that job instead of queueing another one;
+      The job runs with the newest payload, so at most one job per handler and set of tables is ever waiting
+    - Each table gets one start slot per `min_interval` seconds: A job waits for the latest next slot of all its tables and
+      takes the following slot of each, so a flood of triggers for one table produces at most one evaluation per interval,
+      whether it arrives alone or within batches
+    - Finished jobs are kept for status polling, up to `history` of them
+    """
+
+    def __init__(self, workers: int = 2, min_interval: float = 60.0, history: int = 1000):
+        self.workers = workers
+        self.min_interval = min_interval
+        self.history = history
+
+        self.jobs: OrderedDict[str, Job] = OrderedDict()
+        self.pending: dict[str, Job] = {}
+        self.next_slot: dict[str, float] = {}
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._tasks: set[asyncio.Task] = set()
+
+    def start(self):
+        for _ in range(self.workers):
+            self._tasks.add(asyncio.create_task(self._work()))
+
+    async def stop(self):
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+
+    def submit(
+            self,
+            tables: list[str],
+            payload: BaseModel,
+            handler: Callable[[BaseModel], Awaitable[dict[str, Any]]],
+        ) -> tuple[Job, bool]:
+        """
+        Queues an evaluation, or joins the one for the same tables that has not started yet
+
+        :param tables: Tables the payload evaluates; Rate limited per table
+        :param payload: Request body passed to the handler
+        :param handler: Coroutine function that runs the evaluation and returns its result
+
+        :type tables: list[str]
+        :type payload: BaseModel
+        :type handler: Callable[[BaseModel], Awaitable[dict[str, Any]]]
+
+        :return: Returns the job and whether the request was coalesced into an existing job
+        :rtype: Job, bool
+        """
+        tables = sorted(set(tables))
+        key = f"{handler.__name__}:{','.join(tables)}"
+        job = self.pending.get(key)
+        if job is not None:
+            # The newest request's columns and range win; The job keeps its start slot
+            job.payload = payload
+            job.submitted += 1
+            return job, True
+
+        # Start at the latest next slot of the tables, and reserve the following one for each of them
+        now = time.time()
+        not_before = max([now] + [self.next_slot.get(table, now) for table in tables])
+        for table in tables:
+            self.next_slot[table] = not_before + self.min_interval
+
+        job = Job(key, tables, payload, handler, not_before)
+        self.pending[key] = job
+        self._remember(job)
+
+        delay = not_before - now
+        if delay > 0:
+            task = asyncio.create_task(self._enqueue_later(job, delay))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+        else:
+            self._queue.put_nowait(job)
+
+        return job, False
+
+    def get(self, job_id: str) -> Job | None:
+        return self.jobs.get(job_id)
+
+    def _remember(self, job: Job):
+        self.jobs[job.id] = job
+        while len(self.jobs) > self.history:
+            _, oldest = next(iter(self.jobs.items()))
+            if oldest.status in ("queued", "running"):
+                break
+            self.jobs.popitem(last=False)
+
+    async def _enqueue_later(self, job: Job, delay: float):
+        await asyncio.sleep(delay)
+        self._queue.put_nowait(job)
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+
+            # Later requests for the same tables queue a new job from here on
+            self.pending.pop(job.key, None)
+            job.status = "running"
+            job.started_at = time.time()
+
+            try:
+                job.result = await job.handler(job.payload)
+                job.status = "done"
+            except Exception as e:
+                logger.exception(f"Drift evaluation of {job.table} failed")
+                job.error = repr(e)
+                job.status = "failed"
+
+            job.finished_at = time.time()
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Returns the number of jobs per status
+        """
+        counts: dict[str, int] = {}
+        for job in self.jobs.values():
+            counts[job.status] = counts.get(job.status, 0) + 1
+        return {"queued_now": self._queue.qsize(), "pending": len(self.pending), "jobs": counts}
@@ -0,0 +1,82 @@
+import time
+import contextlib
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncEngine
+from prometheus_client import Counter, Gauge, Histogram
+
+# Typing
+from typing import AsyncIterator
+
+# metrics.py
+# Prometheus metrics for the monitoring backend's database access and report uploads, served on GET /metrics
+# Used to size Postgres max_connections against the number of monitoring replicas (pool_size + max_overflow per replica)
+
+POOL_CHECKOUTS      = Counter("monitoring_db_pool_checkouts_total", "Connections checked out of the pool")
+POOL_CONNECTS       = Counter("monitoring_db_pool_connects_total", "New database connections opened by the pool")
+POOL_INVALIDATIONS  = Counter("monitoring_db_pool_invalidations_total", "Pooled connections discarded, e.g. by a failed pre-ping")
+POOL_WAIT           = Histogram(
+    "monitoring_db_pool_wait_seconds",
+    "Time to get a connection from the pool, including opening a new one",
+    buckets=(0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 30),
+)
+POOL_SIZE           = Gauge("monitoring_db_pool_size", "Configured pool size")
+POOL_CHECKED_OUT    = Gauge("monitoring_db_pool_checked_out", "Connections currently checked out")
+POOL_OVERFLOW       = Gauge("monitoring_db_pool_overflow", "Connections open beyond the pool size")
+
+QUERY_LATENCY       = Histogram(
+    "monitoring_db_query_seconds",
+    "Database query latency, including fetching the rows",
+    ["query"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+ROWS_FETCHED        = Histogram(
+    "monitoring_rows_fetched",
+    "Rows read from the database per drift evaluation request",
+    buckets=(0, 10, 100, 1000, 5000, 10000, 50000, 100000),
+)
+
+SNAPSHOT_UPLOADS    = Counter(
+    "monitoring_snapshot_uploads_total",
+    "Full reports by upload outcome: uploaded, unchanged (skipped) or failed",
+    ["outcome"],
+)
+
+
+def instrument_pool(engine: AsyncEngine):
+    """
+    `instrument_pool()` hooks the pool events of an engine and exposes its state as gauges
+
+    :param engine: Engine whose pool is measured
+    :type engine: AsyncEngine
+    """
+    pool = engine.sync_engine.pool
+
+    event.listen(engine.sync_engine, "checkout", lambda *args: POOL_CHECKOUTS.inc())
+    event.listen(engine.sync_engine, "connect", lambda *args: POOL_CONNECTS.inc())
+    event.listen(engine.sync_engine, "invalidate", lambda *args: POOL_INVALIDATIONS.inc())
+
+    POOL_SIZE.set_function(pool.size)
+    POOL_CHECKED_OUT.set_function(pool.checkedout)
+    POOL_OVERFLOW.set_function(lambda: max(pool.overflow(), 0))
+
+@contextlib.asynccontextmanager
+async def connection(engine: AsyncEngine) -> AsyncIterator[AsyncConnection]:
+    """
+    `connection()` checks a connection out of the pool like `engine.connect()`, recording the wait in POOL_WAIT
+    """
+    start = time.perf_counter()
+    async with engine.connect() as conn:
+        POOL_WAIT.observe(time.perf_counter() - start)
+        yield conn
+
+@contextlib.contextmanager
+def timed_query(query: str):
+    """
+    `timed_query()` records the duration of the enclosed query in QUERY_LATENCY under the label `query`
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        QUERY_LATENCY.labels(query=query).observe(time.perf_counter() - start)
@@ -1,3 +1,4 @@
+import numpy as np
 from evidently import Report
 from evidently.metrics import DriftedColumnsCount, ValueDrift
 from evidently.generators import ColumnMetricGenerator
@@ -10,6 +11,11 @@ from typing import Any
 # monitoring.py
 # Utilities for running various monitoring processes
 
+# Drift thresholds shared by the Evidently report and the incremental PSI check
+DATASET_PSI_THRESHOLD   = 0.3   # Per-column PSI counted as drifted by the overall report
+COLUMN_PSI_THRESHOLD    = 0.25  # Per-column PSI of the ValueDrift reports
+DRIFT_SHARE             = 0.5   # Share of drifted columns that fails the overall report (Evidently default)
+
 def generate_report(
         reference_df: DataFrame, 
         current_df: DataFrame, 
@@ -34,10 +40,10 @@ def generate_report(
     """
     drift_report = Report([
         # Overall data drift report on the columns
-        DriftedColumnsCount(columns=columns, threshold=0.3, method="psi"),
+        DriftedColumnsCount(columns=columns, threshold=DATASET_PSI_THRESHOLD, method="psi"),
 
         # Data drift report for each column
-        ColumnMetricGenerator(ValueDrift, columns=columns, metric_kwargs={"method": "psi", "threshold": 0.25}),
+        ColumnMetricGenerator(ValueDrift, columns=columns, metric_kwargs={"method": "psi", "threshold": COLUMN_PSI_THRESHOLD}),
     ], include_tests=True)
 
     # Run the data drift tests
@@ -46,6 +52,23 @@ def generate_report(
 
     return drift_snapshot, drift_snapshot_dict
 
+def generate_report_json(
+        reference_df: DataFrame,
+        current_df: DataFrame,
+        columns: list[str],
+        metadata: dict[str, Any]
+    ) -> tuple[str, dict]:
+    """
+    `generate_report_json()` runs `generate_report()` and serializes the snapshot, so it can run in a worker process
+
+    Snapshots hold references to the report that built them and cannot be pickled; Rebuild them with `Snapshot.loads()`
+
+    :return: Returns the snapshot as a JSON string and the test results in dictionary format
+    :rtype: str, dict
+    """
+    drift_snapshot, drift_snapshot_dict = generate_report(reference_df, current_df, columns, metadata)
+    return drift_snapshot.dumps(), drift_snapshot_dict
+
 def is_data_drift(report_results: dict) -> bool:
     """
     Check if there is data drift in the dataset
@@ -67,4 +90,58 @@ def is_data_drift(report_results: dict) -> bool:
     if test_results["status"] == "FAIL":
         return True
     else:
-        return False
\ No newline at end of file
+        return False
+
+def drift_signature(report_results: dict) -> tuple:
+    """
+    Summarises a drift report as the outcome of each of its tests; Reports with the same signature show the same drift result
+
+    :param report_results: Dictionary type drift report generated by `generate_report()`
+    :type report_results: dict
+
+    :return: (test name, status) of every test, the overall data drift test first
+    :rtype: tuple
+    """
+    return tuple((test["name"], str(test["status"])) for test in report_results["tests"])
+
+def psi(reference_counts: np.ndarray, current_counts: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    `psi()` computes the population stability index from binned counts, the way Evidently's "psi" test does
+
+    Works on any leading shape, e.g. (columns, bins) or (tables, columns, bins); Bins where `valid` is False are ignored.
+    Empty bins are filled like Evidently does (1e-4, or the smallest non-empty share / 1e6 if that is smaller).
+
+    :param reference_counts: Histogram counts of the reference window
+    :param current_counts: Histogram counts of the current window, binned with the same edges
+    :param valid: Mask of the bins in use for each column
+
+    :type reference_counts: np.ndarray
+    :type current_counts: np.ndarray
+    :type valid: np.ndarray
+
+    :return: PSI per column; NaN when a window is empty
+    :rtype: np.ndarray
+    """
+    with np.errstate(divide="ignore", invalid="ignore"):
+        reference = _fill_zeroes(reference_counts / reference_counts.sum(axis=-1, keepdims=True), valid)
+        current = _fill_zeroes(current_counts / current_counts.sum(axis=-1, keepdims=True), valid)
+        psi_values = np.where(valid, (reference - current) * np.log(reference / current), 0.0)
+
+    return psi_values.sum(axis=-1)
+
+def _fill_zeroes(percents: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    smallest = np.where(valid & (percents > 0), percents, np.inf).min(axis=-1, keepdims=True)
+    fill = np.where(smallest <= 0.0001, smallest / 10**6, 0.0001)
+    return np.where(valid & (percents == 0), fill, percents)
+
+def is_psi_drift(psi_values: np.ndarray) -> np.ndarray:
+    """
+    Applies the overall report's rule to PSI values: Drift when the share of columns with PSI >= DATASET_PSI_THRESHOLD reaches DRIFT_SHARE
+
+    :param psi_values: PSI per column, in the last axis
+    :type psi_values: np.ndarray
+
+    :return: Drift flag per leading index (a bool for a single table)
+    :rtype: np.ndarray
+    """
+    return (psi_values >= DATASET_PSI_THRESHOLD).mean(axis=-1) >= DRIFT_SHARE
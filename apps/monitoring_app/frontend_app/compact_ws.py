@@ -0,0 +1,247 @@
+import os
+import sys
+import json
+import time
+import logging
+from datetime import datetime
+
+import requests
+import evidently
+from evidently._pydantic_compat import parse_obj_as
+from evidently.core.serialization import MetricResult, SnapshotModel
+
+logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# compact_ws.py
+# Retention and compaction of the evidently workspace created by setup_ws.py
+#   - The newest KEEP_FULL_RUNS runs of each table keep their full snapshot
+#   - Older runs are reduced to a summary: Metric values and test results are kept (dashboard panels plot these), the
+#     plots and widgets that make up almost all of a snapshot's size are dropped
+#   - While the workspace is over WORKSPACE_BUDGET_MB, older full runs are summarised and then the oldest runs are deleted;
+#     The newest run of each table is never touched
+# Runs next to `evidently ui` and repeats every COMPACT_INTERVAL_S seconds (once if 0)
+# All changes go through the UI's snapshot API, so the UI's state never depends on it noticing file changes; Only the
+# snapshot sizes and contents are read from WORKSPACE_DIR
+
+WORKSPACE_DIR       = os.getenv("WORKSPACE_DIR")
+WORKSPACE_URL       = os.getenv("WORKSPACE_URL", "http://localhost:8000")
+KEEP_FULL_RUNS      = int(os.getenv("KEEP_FULL_RUNS", "24"))
+WORKSPACE_BUDGET_MB = float(os.getenv("WORKSPACE_BUDGET_MB", "1536"))
+COMPACT_INTERVAL_S  = float(os.getenv("COMPACT_INTERVAL_S", "3600"))
+
+EVIDENTLY_VERSION   = "0.7.20"      # Pinned in the Dockerfile; The snapshot layout summarise() relies on
+SNAPSHOT_FIELDS     = {"timestamp", "metadata", "metric_results", "widgets", "tests_widgets"}
+SNAPSHOTS           = "snapshots"   # Snapshot folder of each project, as laid out by the evidently workspace
+SUMMARY_KEY         = "retention"   # Metadata key marking summarised snapshots
+SUMMARY_VALUE       = "summary"
+REQUEST_TIMEOUT_S   = 60
+
+
+def check_schema(workspace_url: str) -> list[str]:
+    """
+    `check_schema()` checks that the installed evidently and the running UI use the snapshot layout `summarise()` expects
+
+    :param workspace_url: URL of the running evidently UI
+    :type workspace_url: str
+
+    :return: Returns the mismatches found, empty if compaction is safe
+    :rtype: list[str]
+    """
+    problems = []
+    if evidently.__version__ != EVIDENTLY_VERSION:
+        problems.append(f"evidently {evidently.__version__} is installed, compaction supports {EVIDENTLY_VERSION}")
+
+    ui_version = requests.get(f"{workspace_url}/api/version", timeout=REQUEST_TIMEOUT_S).json().get("version")
+    if ui_version != EVIDENTLY_VERSION:
+        problems.append(f"The workspace UI runs evidently {ui_version}, compaction supports {EVIDENTLY_VERSION}")
+
+    missing = SNAPSHOT_FIELDS - set(SnapshotModel.__fields__)
+    if missing:
+        problems.append(f"Snapshots no longer have the fields {sorted(missing)}")
+    if "widget" not in MetricResult.__fields__:
+        problems.append("Metric results no longer have a widget field")
+    return problems
+
+def wait_for_workspace(workspace_url: str, retries: int = 30, delay: float = 10):
+    """
+    `wait_for_workspace()` waits until the UI started next to this script answers
+    """
+    for retry in range(retries):
+        try:
+            requests.get(f"{workspace_url}/api/version", timeout=REQUEST_TIMEOUT_S).raise_for_status()
+            return
+        except requests.RequestException:
+            logger.debug(f"Workspace UI not up yet ({retry + 1}/{retries})")
+            time.sleep(delay)
+    raise ConnectionError(f"Workspace UI at {workspace_url} did not answer")
+
+def list_runs(workspace_dir: str, workspace_url: str) -> list[dict]:
+    """
+    `list_runs()` lists the snapshots of every project in the workspace
+
+    Run metadata comes from the UI, the size of each run from its snapshot file
+
+    :param workspace_dir: Path to the evidently workspace
+    :param workspace_url: URL of the running evidently UI
+
+    :type workspace_dir: str
+    :type workspace_url: str
+
+    :return: Returns one dict per run with its ids, path, size, timestamp, table and whether it is a summary, oldest first
+    :rtype: list[dict]
+    """
+    runs = []
+    projects = requests.get(f"{workspace_url}/api/projects/", timeout=REQUEST_TIMEOUT_S)
+    projects.raise_for_status()
+    for project in projects.json():
+        snapshots = requests.get(f"{workspace_url}/api/projects/{project['id']}/snapshots", timeout=REQUEST_TIMEOUT_S)
+        snapshots.raise_for_status()
+
+        for snapshot in snapshots.json():
+            path = os.path.join(workspace_dir, project["id"], SNAPSHOTS, f"{snapshot['id']}.json")
+            try:
+                size = os.path.getsize(path)
+            except OSError:
+                # Deleted since the listing; Gone on the next pass
+                continue
+            runs.append({
+                "id": snapshot["id"],
+                "path": path,
+                "project": project["id"],
+                "table": snapshot["metadata"].get("table", ""),
+                "timestamp": datetime.fromisoformat(snapshot["timestamp"]),
+                "summary": snapshot["metadata"].get(SUMMARY_KEY) == SUMMARY_VALUE,
+                "size": size,
+            })
+
+    runs.sort(key=lambda run: run["timestamp"])
+    return runs
+
+def summarise(snapshot: dict) -> dict:
+    """
+    `summarise()` reduces a snapshot to its metric values and test results
+
+    The result still loads as an evidently snapshot, so the UI lists it and dashboard panels keep plotting its values
+
+    :param snapshot: Snapshot JSON
+    :type snapshot: dict
+
+    :return: Returns the summarised snapshot
+    :rtype: dict
+    """
+    for result in snapshot["metric_results"].values():
+        result["widget"] = []
+    snapshot["widgets"] = []
+    snapshot["tests_widgets"] = []
+    snapshot["metadata"][SUMMARY_KEY] = SUMMARY_VALUE
+    return snapshot
+
+def summarise_run(run: dict, workspace_url: str) -> int:
+    """
+    `summarise_run()` replaces a run with its summary through the UI: The summary is added as a new snapshot, then the
+    full one is deleted, so a failure in between never loses the run
+
+    :return: Returns the number of bytes freed
+    :rtype: int
+    """
+    with open(run["path"]) as f:
+        snapshot = summarise(json.load(f))
+    # Refuse to upload a summary the UI could not load
+    parse_obj_as(SnapshotModel, snapshot)
+
+    url = f"{workspace_url}/api/v2/snapshots/{run['project']}"
+    added = requests.post(url, data=json.dumps(snapshot), timeout=REQUEST_TIMEOUT_S)
+    added.raise_for_status()
+    delete_run(run, workspace_url)
+
+    run["id"] = added.json()["snapshot_id"]
+    run["path"] = os.path.join(os.path.dirname(run["path"]), f"{run['id']}.json")
+    run["summary"] = True
+    freed = run["size"] - os.path.getsize(run["path"])
+    run["size"] -= freed
+    return freed
+
+def delete_run(run: dict, workspace_url: str) -> int:
+    """
+    `delete_run()` deletes a run through the UI
+
+    :return: Returns the number of bytes freed
+    :rtype: int
+    """
+    deleted = requests.delete(f"{workspace_url}/api/projects/{run['project']}/{run['id']}", timeout=REQUEST_TIMEOUT_S)
+    deleted.raise_for_status()
+    return run["size"]
+
+def compact(workspace_dir: str, workspace_url: str, keep_full_runs: int, budget_bytes: float) -> dict[str, int]:
+    """
+    `compact()` applies the retention rules to the workspace once
+
+    :param workspace_dir: Path to the evidently workspace
+    :param workspace_url: URL of the running evidently UI
+    :param keep_full_runs: Newest runs of each table kept in full
+    :param budget_bytes: Size budget of all snapshots together
+
+    :type workspace_dir: str
+    :type workspace_url: str
+    :type keep_full_runs: int
+    :type budget_bytes: float
+
+    :return: Returns the number of runs summarised and deleted, and the workspace size before and after
+    :rtype: dict[str, int]
+    """
+    runs = list_runs(workspace_dir, workspace_url)
+    total = size_before = sum(run["size"] for run in runs)
+    summarised = deleted = 0
+
+    # Runs by table, newest first; The newest run of each table is left alone
+    by_table: dict[tuple[str, str], list[dict]] = {}
+    for run in reversed(runs):
+        by_table.setdefault((run["project"], run["table"]), []).append(run)
+    newest = {id(table_runs[0]) for table_runs in by_table.values()}
+    candidates = [run for run in runs if id(run) not in newest]
+
+    # Summarise full runs beyond the newest `keep_full_runs` of their table
+    for table_runs in by_table.values():
+        for run in table_runs[keep_full_runs:]:
+            if not run["summary"]:
+                total -= summarise_run(run, workspace_url)
+                summarised += 1
+
+    # Over budget: Summarise the remaining full runs, oldest first, then delete the oldest runs
+    for run in candidates:
+        if total <= budget_bytes:
+            break
+        if not run["summary"]:
+            total -= summarise_run(run, workspace_url)
+            summarised += 1
+    for run in candidates:
+        if total <= budget_bytes:
+            break
+        total -= delete_run(run, workspace_url)
+        deleted += 1
+
+    if total > budget_bytes:
+        logger.warning(f"Workspace is {total / 2**20:.0f} MB after compaction, over its {budget_bytes / 2**20:.0f} MB budget")
+
+    return {"runs": len(runs) - deleted, "summarised": summarised, "deleted": deleted, "bytes_before": size_before, "bytes_after": total}
+
+if __name__ == "__main__":
+    # Started before `evidently ui`, so wait for it; Any layout mismatch stops compaction before it touches a snapshot
+    wait_for_workspace(WORKSPACE_URL)
+    problems = check_schema(WORKSPACE_URL)
+    if problems:
+        for problem in problems:
+            logger.error(f"Workspace compaction disabled: {problem}")
+        sys.exit(1)
+
+    while True:
+        try:
+            result = compact(WORKSPACE_DIR, WORKSPACE_URL, KEEP_FULL_RUNS, WORKSPACE_BUDGET_MB * 2**20)
+            logger.debug(f"Workspace compacted: {result}")
+        except Exception:
+            logger.exception("Workspace compaction failed")
+
+        if COMPACT_INTERVAL_S <= 0:
+            break
+        time.sleep(COMPACT_INTERVAL_S)
@@ -0,0 +1,101 @@
+# DESCRIPTION |
+# Benchmarks model artifact formats written by utils._dump_artifact:
+# dump size, write time and cold load time.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_artifacts.py --trees 1000 --depth 100
+#
+# Cold loads run in a fresh process each, after dropping the file from the
+# page cache where possible (posix_fadvise), so earlier loads do not help.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+import pandas as pd  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+
+FORMATS = {
+    "joblib": {"artifact_format": "joblib", "artifact_compress": 0},
+    "joblib-zlib3": {"artifact_format": "joblib", "artifact_compress": 3},
+    "joblib-lz4": {"artifact_format": "joblib", "artifact_compress": ["lz4", 3]},
+    "native": {"artifact_format": "native", "artifact_compress": 0},
+}
+
+
+def _drop_page_cache(final_dir: str):
+    for name in os.listdir(final_dir):
+        with open(os.path.join(final_dir, name), "rb") as f:
+            os.posix_fadvise(f.fileno(), 0, 0, os.POSIX_FADV_DONTNEED)
+
+
+def _cold_load(final_dir: str, manifest: dict, queue: mp.Queue):
+    start = time.perf_counter()
+    utils._load_artifact(final_dir, manifest)
+    queue.put(time.perf_counter() - start)
+
+
+def _models(args):
+    X, y = make_classification(
+        n_samples=args.rows, n_features=9, n_informative=6, n_classes=3, random_state=0
+    )
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(9)])
+
+    models = {
+        "random_forest": RandomForestClassifier(
+            n_estimators=args.trees, max_depth=args.depth, n_jobs=-1, random_state=0
+        ).fit(X, y)
+    }
+
+    try:
+        from xgboost import XGBClassifier
+
+        models["xgboost"] = XGBClassifier(
+            n_estimators=args.trees, max_depth=min(args.depth, 12), n_jobs=-1
+        ).fit(X, y)
+    except ImportError:
+        print("xgboost not installed, skipping")
+
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=100)
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'model':<14} {'format':<13} {'MiB':>8} {'write s':>8} {'cold load s':>12}")
+    for model_name, model in _models(args).items():
+        for format_name, options in FORMATS.items():
+            with tempfile.TemporaryDirectory() as final_dir:
+                manifest = utils._dump_artifact(model, final_dir, options)
+                _drop_page_cache(final_dir)
+
+                queue = ctx.Queue()
+                proc = ctx.Process(target=_cold_load, args=(final_dir, manifest, queue))
+                proc.start()
+                cold_load = queue.get()
+                proc.join()
+
+            print(
+                f"{model_name:<14} {format_name:<13} "
+                f"{manifest['size_bytes'] / (1024 * 1024):>8.1f} "
+                f"{manifest['write_seconds']:>8.2f} {cold_load:>12.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+# DESCRIPTION |
+# Benchmarks the NumPy predictor of compiled tree ensembles (utils._compile_ensemble,
+# inference_app/src/compiled.py) against the native sklearn / XGBoost predict_proba:
+# latency per batch size, rows/sec and the largest probability difference.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_compiled.py --trees 500 --depth 30 --batch-sizes 1 16 256 4096
+#
+# The compiled model is also loaded and scored in a fresh interpreter to check
+# that neither sklearn nor xgboost gets imported.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+INFERENCE_SRC = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "..", "..", "inference_app", "src"
+)
+sys.path.insert(0, INFERENCE_SRC)
+
+import utils  # noqa: E402
+import compiled  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+
+STANDALONE_CHECK = """
+import sys
+sys.path.insert(0, {src!r})
+import numpy as np
+import compiled
+model = compiled.CompiledEnsemble.load({path!r})
+model.predict_proba(np.zeros((4, len(model.feature_names_in_)), dtype=np.float32))
+print(",".join(m for m in ("sklearn", "xgboost") if m in sys.modules) or "none")
+"""
+
+
+def _models(args, X, y):
+    preprocessor = utils._build_preprocessor(X, {"data_encoding": "none"}, n_jobs=1)
+    models = {
+        "random_forest": RandomForestClassifier(
+            n_estimators=args.trees, max_depth=args.depth, n_jobs=-1, random_state=0
+        )
+    }
+
+    try:
+        from xgboost import XGBClassifier
+
+        models["xgboost"] = XGBClassifier(
+            n_estimators=args.trees,
+            max_depth=min(args.depth, 12),
+            objective="multi:softprob",
+            n_jobs=-1,
+        )
+    except ImportError:
+        print("xgboost not installed, skipping")
+
+    return {
+        name: Pipeline([("preprocessor", preprocessor), ("model", model)]).fit(X, y)
+        for name, model in models.items()
+    }
+
+
+def _latency(predict, X: pd.DataFrame, batch_size: int, repeats: int) -> float:
+    # Median seconds per call over 'repeats' batches taken from X
+    timings = []
+    for i in range(repeats):
+        start_row = (i * batch_size) % max(len(X) - batch_size, 1)
+        batch = X.iloc[start_row : start_row + batch_size]
+        start = time.perf_counter()
+        predict(batch)
+        timings.append(time.perf_counter() - start)
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--trees", type=int, default=300)
+    parser.add_argument("--depth", type=int, default=30)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[1, 16, 256, 4096])
+    parser.add_argument("--repeats", type=int, default=50)
+    args = parser.parse_args()
+
+    X, y = make_classification(
+        n_samples=args.rows, n_features=9, n_informative=6, n_classes=3, random_state=0
+    )
+    X = pd.DataFrame(X.astype(np.float32), columns=[f"f{i}" for i in range(9)])
+
+    print(
+        f"{'model':<14} {'batch':>6} {'native ms':>10} {'compiled ms':>12} "
+        f"{'speedup':>8} {'compiled rows/s':>16}"
+    )
+    for model_name, model in _models(args, X, y).items():
+        with tempfile.TemporaryDirectory() as final_dir:
+            manifest = utils._dump_artifact(model, final_dir, {"compile_trees": True})
+            path = os.path.join(final_dir, manifest["compiled"]["file"])
+            ensemble = compiled.CompiledEnsemble.load(path)
+
+            standalone = subprocess.run(
+                [sys.executable, "-c", STANDALONE_CHECK.format(src=INFERENCE_SRC, path=path)],
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+
+        def predict_compiled(batch):
+            return ensemble.predict_proba(batch.to_numpy())
+
+        max_diff = np.abs(predict_compiled(X) - model.predict_proba(X)).max()
+
+        for batch_size in args.batch_sizes:
+            native = _latency(model.predict_proba, X, batch_size, args.repeats)
+            fast = _latency(predict_compiled, X, batch_size, args.repeats)
+            print(
+                f"{model_name:<14} {batch_size:>6} {native * 1000:>10.2f} {fast * 1000:>12.2f} "
+                f"{native / fast:>7.1f}x {batch_size / fast:>16.0f}"
+            )
+
+        print(
+            f"{model_name}: max |p_compiled - p_native| = {max_diff:.2e}, "
+            f"{manifest['compiled']['n_nodes']} nodes, "
+            f"{manifest['compiled']['size_bytes'] / (1024 * 1024):.1f} MiB, "
+            f"modules imported when loaded standalone: {standalone}"
+        )
+
+
+if __name__ == "__main__":
+    main()
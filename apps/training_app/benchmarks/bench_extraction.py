@@ -0,0 +1,111 @@
+# DESCRIPTION |
+# Benchmarks the training data extraction backends against the original
+# 'pd.read_sql' path on a synthetic pond table.
+#
+# Usage (from apps/training_app, with a Postgres reachable via db_config.yaml):
+#   python benchmarks/bench_extraction.py --rows 1000000
+#
+# Every backend runs in a fresh process so the reported peak RSS is its own.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+import pandas as pd  # noqa: E402
+import psycopg2  # noqa: E402
+
+BENCH_TABLE = "bench_iot_pond"
+
+CREATE_TABLE = f"""
+DROP TABLE IF EXISTS {BENCH_TABLE};
+CREATE TABLE {BENCH_TABLE} (
+    created_at TIMESTAMPTZ,
+    entry_id SERIAL PRIMARY KEY,
+    temperature FLOAT,
+    turbidity FLOAT,
+    dissolved_oxygen FLOAT,
+    ph FLOAT,
+    ammonia FLOAT,
+    nitrate FLOAT,
+    population INT,
+    fish_length FLOAT,
+    fish_weight FLOAT
+);
+INSERT INTO {BENCH_TABLE} (
+    created_at, temperature, turbidity, dissolved_oxygen, ph,
+    ammonia, nitrate, population, fish_length, fish_weight
+)
+SELECT
+    now() - (n || ' seconds')::interval,
+    random() * 10 + 20, random() * 100, random() * 10, random() * 4 + 5,
+    random() * 5, random() * 300,
+    CASE WHEN random() < 0.1 THEN NULL ELSE (random() * 100)::int END,
+    random() * 40, random() * 500
+FROM generate_series(1, %s) AS n;
+"""
+
+
+def _seed(con_params: dict, rows: int):
+    with psycopg2.connect(**con_params) as con:
+        with con.cursor() as cursor:
+            cursor.execute(CREATE_TABLE, (rows,))
+    print(f"Seeded {BENCH_TABLE} with {rows} rows")
+
+
+def _run(backend: str, con_params: dict, extraction: dict, queue: mp.Queue):
+    start = time.perf_counter()
+    with psycopg2.connect(**con_params) as con:
+        if backend == "read_sql":
+            df = pd.read_sql(f"SELECT * FROM {BENCH_TABLE};", con)
+        else:
+            df = utils._read_table(con, BENCH_TABLE, {**extraction, "backend": backend})
+    elapsed = time.perf_counter() - start
+
+    frame_mb = df.memory_usage(deep=True).sum() / (1024 * 1024)
+    queue.put((backend, len(df), elapsed, utils._peak_rss_mb(), frame_mb))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--fetch-size", type=int, default=50000)
+    parser.add_argument(
+        "--db-config",
+        default=os.getenv("DB_CONFIG_PATH", "configurations/db_config.yaml"),
+    )
+    parser.add_argument("--skip-seed", action="store_true")
+    args = parser.parse_args()
+
+    con_params, extraction = utils._split_extraction_config(
+        utils._parse_yaml(args.db_config)
+    )
+    extraction["fetch_size"] = args.fetch_size
+
+    if not args.skip_seed:
+        _seed(con_params, args.rows)
+
+    ctx = mp.get_context("spawn")
+    print(f"{'backend':<10} {'rows':>10} {'seconds':>9} {'rows/s':>12} {'peak MiB':>9} {'frame MiB':>10}")
+    for backend in ["read_sql", "cursor", "copy"]:
+        queue = ctx.Queue()
+        proc = ctx.Process(target=_run, args=(backend, con_params, extraction, queue))
+        proc.start()
+        name, n_rows, elapsed, peak_mb, frame_mb = queue.get()
+        proc.join()
+
+        print(
+            f"{name:<10} {n_rows:>10} {elapsed:>9.2f} {n_rows / elapsed:>12,.0f} "
+            f"{peak_mb:>9.1f} {frame_mb:>10.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+# DESCRIPTION |
+# Benchmarks repeated warm-start retraining (nodes._update_model) and checks
+# that 'max_n_estimators' holds: Every retrain is saved with
+# utils._write_to_disk and reloaded like the next training Job would.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_incremental.py --retrains 5 --extra 100 --cap 300
+#
+# Reports the tree / boosting round count, the saved n_estimators, the
+# artifact size and the prediction time after every retrain. Exits non-zero
+# when a model grows past the cap or its saved n_estimators is wrong.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes  # noqa: E402
+import utils  # noqa: E402
+
+import pandas as pd  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.ensemble import RandomForestClassifier  # noqa: E402
+
+
+def _n_trees(model) -> int:
+    if type(model).__module__.startswith("xgboost"):
+        return model.get_booster().num_boosted_rounds()
+    return len(model.estimators_)
+
+
+def _models(initial: int) -> dict:
+    models = {
+        "random_forest": RandomForestClassifier(n_estimators=initial, random_state=0)
+    }
+    try:
+        from xgboost import XGBClassifier
+
+        models["xgboost"] = XGBClassifier(n_estimators=initial, random_state=0)
+    except ImportError:
+        print("xgboost not installed, skipping it")
+    return models
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--initial", type=int, default=100)
+    parser.add_argument("--extra", type=int, default=100)
+    parser.add_argument("--cap", type=int, default=300)
+    parser.add_argument("--retrains", type=int, default=5)
+    args = parser.parse_args()
+
+    X, y = make_classification(
+        n_samples=args.rows * (args.retrains + 1),
+        n_features=9,
+        n_informative=6,
+        n_classes=3,
+        random_state=0,
+    )
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(9)])
+    y = pd.Series(y)
+    options = {
+        "incremental_strategy": "warm_start",
+        "warm_start_n_estimators": args.extra,
+        "max_n_estimators": args.cap,
+    }
+
+    failed = False
+    print(
+        f"{'model':<14} {'retrain':>7} {'trees':>6} {'saved':>6} {'MiB':>6} "
+        f"{'predict ms':>11}"
+    )
+    for name, model in _models(args.initial).items():
+        with tempfile.TemporaryDirectory() as output_path:
+            os.environ["OUTPUT_PATH"] = output_path
+            model.fit(X.iloc[: args.rows], y.iloc[: args.rows])
+            params = {"n_estimators": args.initial}
+            utils._write_to_disk(model, params, name, "bench.yaml")
+
+            for retrain in range(1, args.retrains + 1):
+                # Each retrain sees the next window of rows
+                window = slice(retrain * args.rows, (retrain + 1) * args.rows)
+                previous, params = utils._read_from_disk(name, "bench.yaml")
+                model, params = nodes._update_model(
+                    previous, params, X.iloc[window], y.iloc[window], options
+                )
+                utils._write_to_disk(model, params, name, "bench.yaml")
+
+                start = time.perf_counter()
+                model.predict(X.iloc[: args.rows])
+                predict_ms = (time.perf_counter() - start) * 1000
+
+                model_path = os.path.join(output_path, name, "bench", "model.joblib")
+                size = os.path.getsize(model_path)
+                trees, saved = _n_trees(model), params["n_estimators"]
+                print(
+                    f"{name:<14} {retrain:>7} {trees:>6} {saved:>6} "
+                    f"{size / (1024 * 1024):>6.1f} {predict_ms:>11.1f}"
+                )
+                if trees > args.cap or saved != trees:
+                    failed = True
+
+    if failed:
+        print(
+            f"FAILED: a model exceeded max_n_estimators={args.cap} "
+            "or saved a wrong n_estimators"
+        )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+# DESCRIPTION |
+# Benchmarks search throughput (fits/sec) of blanket n_jobs=-1 against the
+# worker counts assigned by utils._resolve_n_jobs under different CPU quotas.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_n_jobs.py --cpus 1 2 4
+#
+# Every run executes in a fresh process restricted to the given number of
+# cores via CPU affinity. To measure a real cgroup quota instead, run the
+# script inside a container started with e.g. 'docker run --cpus=2' and pass
+# '--cpus 0' (no affinity change).
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import multiprocessing as mp
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes  # noqa: E402
+import utils  # noqa: E402
+
+import pandas as pd  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+
+BLANKET = {"search_n_jobs": -1, "transformer_n_jobs": -1, "estimator_n_jobs": -1}
+
+
+def _run(cpus: int, mode: str, args, queue: mp.Queue):
+    if cpus:
+        os.sched_setaffinity(0, list(sorted(os.sched_getaffinity(0)))[:cpus])
+
+    X, y = make_classification(
+        n_samples=args.rows, n_features=9, n_informative=6, n_classes=3, random_state=0
+    )
+    X_train = pd.DataFrame(X, columns=[f"f{i}" for i in range(9)])
+    y_train = pd.Series(y)
+
+    global_config = utils._parse_yaml(args.global_config)
+    model_config = utils._parse_yaml(args.model_config)
+    options = {
+        **global_config,
+        "search_strategy": "bayes",
+        "search_history": False,
+    }
+
+    if mode == "blanket":
+        options = {**options, **BLANKET, "limit_threadpools": False}
+    else:
+        options = utils._resolve_n_jobs(options)
+
+    start = time.perf_counter()
+    nodes.train_model(X_train, y_train, model_config, options)
+    elapsed = time.perf_counter() - start
+
+    # Every candidate is fit once per split, plus the final refit
+    n_fits = options["bayes_search_n_iters"] * options["cv_splits"] + 1
+    queue.put((utils._available_cpus(), n_fits / elapsed, elapsed))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cpus", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument(
+        "--model-config", default="configurations/random_forest_config.yaml"
+    )
+    parser.add_argument(
+        "--global-config", default="configurations/global_config.yaml"
+    )
+    args = parser.parse_args()
+
+    ctx = mp.get_context("spawn")
+    print(f"{'cpus':>5} {'mode':<8} {'fits/s':>8} {'seconds':>9}")
+    for cpus in args.cpus:
+        for mode in ["blanket", "policy"]:
+            queue = ctx.Queue()
+            proc = ctx.Process(target=_run, args=(cpus, mode, args, queue))
+            proc.start()
+            available, fits_per_sec, elapsed = queue.get()
+            proc.join()
+
+            print(f"{available:>5} {mode:<8} {fits_per_sec:>8.2f} {elapsed:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+# DESCRIPTION |
+# Benchmarks caching the fitted preprocessor of every CV fold during the Bayes
+# search (Pipeline(memory=...)) against refitting it for every candidate.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_preprocessor_cache.py --rows 5000 --scaling \
+#       --categories 50
+#
+# Only the model step is searched, so a cached fold preprocessor is reused by
+# every candidate. The preprocessor fits of the search itself are timed by
+# wrapping sklearn.pipeline._fit_transform_one: With the cache, the wrapper
+# only runs on a miss, so every other Pipeline fit is a hit. Reports the
+# search time, the preprocessor fits run and their time, and the CV score.
+# The search runs on one process so the wrapper sees every fit.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import utils  # noqa: E402
+
+import joblib  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+import sklearn.pipeline  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.model_selection import StratifiedKFold  # noqa: E402
+from sklearn.pipeline import Pipeline  # noqa: E402
+
+_fit_transform_one = sklearn.pipeline._fit_transform_one
+preprocessor_fits = {"count": 0, "seconds": 0.0}
+
+
+def _timed_fit_transform_one(*args, **kwargs):
+    start = time.perf_counter()
+    result = _fit_transform_one(*args, **kwargs)
+    preprocessor_fits["count"] += 1
+    preprocessor_fits["seconds"] += time.perf_counter() - start
+    return result
+
+
+def _synthetic_dataset(rows: int, categories: int) -> tuple[pd.DataFrame, pd.Series]:
+    X, y = make_classification(
+        n_samples=rows,
+        n_features=9,
+        n_informative=6,
+        n_classes=3,
+        random_state=0,
+    )
+    X = pd.DataFrame(X, columns=[f"f{i}" for i in range(9)])
+    if categories:
+        # Categorical columns give the one-hot encoder real work
+        rng = np.random.default_rng(0)
+        for i in range(3):
+            X[f"c{i}"] = rng.integers(categories, size=rows).astype(str)
+    return X, pd.Series(y)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--iters", type=int, default=10)
+    parser.add_argument("--folds", type=int, default=3)
+    parser.add_argument("--scaling", action="store_true")
+    parser.add_argument(
+        "--categories", type=int, default=0, help="One-hot encoded columns' size"
+    )
+    parser.add_argument(
+        "--model-config", default="configurations/random_forest_config.yaml"
+    )
+    parser.add_argument(
+        "--global-config", default="configurations/global_config.yaml"
+    )
+    args = parser.parse_args()
+
+    global_config = utils._parse_yaml(args.global_config)
+    X, y = _synthetic_dataset(args.rows, args.categories)
+    sklearn.pipeline._fit_transform_one = _timed_fit_transform_one
+
+    print(
+        f"{'cache':<6} {'seconds':>8} {'pipeline fits':>14} "
+        f"{'preprocessor fits':>18} {'fit seconds':>12} {'cv score':>9}"
+    )
+    for cache in (False, True):
+        # Model configs are mutated by _init_model, reload for every run
+        model_config = utils._parse_yaml(args.model_config)
+        model_config["requires_scaling"] = args.scaling
+        model_config["data_encoding"] = "ohe" if args.categories else "none"
+        options = {**global_config, "search_n_jobs": 1}
+
+        preprocessor_fits.update(count=0, seconds=0.0)
+        with tempfile.TemporaryDirectory() as location:
+            memory = joblib.Memory(location=location, verbose=0) if cache else None
+            pipeline = Pipeline(
+                steps=[
+                    ("preprocessor", utils._build_preprocessor(X, model_config, 1)),
+                    ("model", utils._init_model(X, model_config, options)),
+                ],
+                memory=memory,
+            )
+            search_space = {
+                f"model__{k}": v for k, v in model_config["search_space"].items()
+            }
+            search = utils._PersistentBayesSearchCV(
+                estimator=pipeline,
+                search_spaces=utils._parse_search_space(search_space),
+                cv=StratifiedKFold(
+                    n_splits=args.folds,
+                    shuffle=True,
+                    random_state=global_config["random_state"],
+                ),
+                scoring=global_config["bayes_scoring"],
+                n_jobs=1,
+                n_iter=args.iters,
+                random_state=global_config["random_state"],
+            )
+
+            start = time.perf_counter()
+            search.fit(X, y)
+            elapsed = time.perf_counter() - start
+
+        # Every candidate is fit once per split, plus the refit
+        pipeline_fits = args.iters * args.folds + 1
+        print(
+            f"{str(cache):<6} {elapsed:>8.1f} {pipeline_fits:>14} "
+            f"{preprocessor_fits['count']:>18} {preprocessor_fits['seconds']:>12.2f} "
+            f"{search.best_score_:>9.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# DESCRIPTION |
+# Benchmarks the hyperparameter search strategies of nodes.train_model
+# (bayes, halving, hyperband) on a synthetic dataset shaped like the pond tables.
+#
+# Usage (from apps/training_app):
+#   python benchmarks/bench_search.py --rows 20000 \
+#       --model-config configurations/random_forest_config.yaml
+#
+# Reports wall-clock time to the returned best model, its cross-validated
+# score and its score on a held-out split.
+
+# Linted and formatted with Ruff
+
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import nodes  # noqa: E402
+import utils  # noqa: E402
+
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+from sklearn.datasets import make_classification  # noqa: E402
+from sklearn.metrics import get_scorer  # noqa: E402
+
+FEATURES = [
+    "temperature",
+    "turbidity",
+    "dissolved_oxygen",
+    "ph",
+    "ammonia",
+    "nitrate",
+    "population",
+    "fish_length",
+    "fish_weight",
+]
+
+
+def _synthetic_ponds(rows: int, random_state: int) -> pd.DataFrame:
+    X, y = make_classification(
+        n_samples=rows,
+        n_features=len(FEATURES),
+        n_informative=6,
+        n_classes=3,
+        weights=[0.6, 0.3, 0.1],
+        random_state=random_state,
+    )
+    df = pd.DataFrame(X.astype(np.float32), columns=FEATURES)
+    df["target"] = y
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument(
+        "--model-config", default="configurations/random_forest_config.yaml"
+    )
+    parser.add_argument(
+        "--global-config", default="configurations/global_config.yaml"
+    )
+    parser.add_argument(
+        "--strategies", nargs="+", default=["bayes", "halving", "hyperband"]
+    )
+    args = parser.parse_args()
+
+    global_config = utils._parse_yaml(args.global_config)
+    global_config["target_column"] = "target"
+
+    df = _synthetic_ponds(args.rows, global_config["random_state"])
+    X_train, X_test, y_train, y_test = nodes.split_dataset(df, global_config)
+    scorer = get_scorer(global_config["bayes_scoring"])
+
+    print(f"{'strategy':<10} {'seconds':>9} {'test score':>11}  best params")
+    for strategy in args.strategies:
+        # Model configs are mutated by _init_model, reload for every run
+        model_config = utils._parse_yaml(args.model_config)
+        # No search history: Every strategy starts cold, without resuming or
+        # seeding from earlier runs
+        options = {
+            **global_config,
+            "search_strategy": strategy,
+            "search_history": False,
+        }
+
+        start = time.perf_counter()
+        best_model, best_params = nodes.train_model(
+            X_train, y_train, model_config, options
+        )
+        elapsed = time.perf_counter() - start
+
+        test_score = scorer(best_model, X_test, y_test)
+        print(f"{strategy:<10} {elapsed:>9.1f} {test_score:>11.4f}  {dict(best_params)}")
+
+
+if __name__ == "__main__":
+    main()
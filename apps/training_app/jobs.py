@@ -0,0 +1,217 @@
+#      ██╗ ██████╗ ██████╗ ███████╗
+#      ██║██╔═══██╗██╔══██╗██╔════╝
+#      ██║██║   ██║██████╔╝███████╗
+# ██   ██║██║   ██║██╔══██╗╚════██║
+# ╚█████╔╝╚██████╔╝██████╔╝███████║
+#  ╚════╝  ╚═════╝ ╚═════╝ ╚══════╝
+
+# DESCRIPTION |
+# Entry point that trains several (table, model config) jobs in parallel.
+# Every table is loaded once and shared by all jobs training on it.
+
+# Linted and formatted with Ruff
+
+import utils
+import nodes
+
+from typing import Dict, List, Optional, Tuple
+
+import os
+import time
+import resource
+import tempfile
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from joblib.externals.loky import get_reusable_executor
+from pyarrow import feather
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _init_worker():
+    """
+    Configures logging in spawned job processes.
+    """
+    logging.basicConfig(
+        level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
+    )
+
+
+def _cpu_seconds() -> float:
+    """
+    Returns user + system CPU time of this process and its reaped children.
+    """
+    own = resource.getrusage(resource.RUSAGE_SELF)
+    children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    return own.ru_utime + own.ru_stime + children.ru_utime + children.ru_stime
+
+
+def _split_cpu_budget(
+    n_jobs: int, cpu_budget: int, max_parallel_jobs: Optional[int] = None
+) -> Tuple[int, int]:
+    """
+    Splits the CPU budget between parallel jobs and the search inside each job.
+
+    Parameters
+    ----------
+    n_jobs: int
+        Number of training jobs.
+
+    cpu_budget: int
+        Cores available to all jobs together.
+
+    max_parallel_jobs: Optional[int]
+        Upper bound of jobs running at the same time; No bound when None.
+
+    Returns
+    -------
+    Tuple[int, int]
+        Number of parallel jobs and cores given to each job.
+    """
+    workers = min(n_jobs, cpu_budget, max_parallel_jobs or cpu_budget)
+    workers = max(1, workers)
+    return workers, max(1, cpu_budget // workers)
+
+
+def _run_job(job: Dict, input_path: str, global_config: Dict, cores: int) -> Dict:
+    """
+    Trains one model config on one table and writes the result to disk.
+
+    Parameters
+    ----------
+    job: Dict
+        Job definition with keys 'table' and 'model_config' (config file path).
+
+    input_path: str
+        Arrow file holding the job's table.
+
+    global_config: Dict
+        Defined in configurations/global_config.yaml under key 'global_training_config'
+
+    cores: int
+        Cores assigned to this job.
+
+    Returns
+    -------
+    Dict
+        Job definition with its wall time, CPU time and assigned cores.
+    """
+    start_wall = time.perf_counter()
+    start_cpu = _cpu_seconds()
+
+    # The job's cores are handed to one level (search by default) and the
+    # nested levels run single-threaded inside it
+    options = utils._resolve_n_jobs({**global_config, "cpu_budget": cores})
+    model_config = utils._parse_yaml(job["model_config"])
+
+    # Output paths (saved model) follow the same environment variables as
+    # main.py; Every job runs in its own process
+    os.environ["TARGET_TABLE"] = job["table"]
+    os.environ["MODEL_CONFIG_PATH"] = job["model_config"]
+
+    df = feather.read_feather(input_path, memory_map=True)
+    X_train, X_test, y_train, y_test = nodes.split_dataset(df, options)
+
+    history_path = utils._search_history_path(job["table"], job["model_config"])
+    best_model, best_params = nodes.train_model(
+        X_train, y_train, model_config, options, history_path
+    )
+
+    utils._write_to_disk(
+        best_model,
+        best_params,
+        table_name=job["table"],
+        model_config_path=job["model_config"],
+        options=options,
+    )
+
+    # Stop the search's worker processes so their CPU time is counted
+    get_reusable_executor().shutdown(wait=True)
+
+    return {
+        **job,
+        "wall": time.perf_counter() - start_wall,
+        "cpu": _cpu_seconds() - start_cpu,
+        "cores": cores,
+    }
+
+
+def _log_report(results: List[Dict]):
+    """
+    Logs wall time and CPU utilisation of every finished job.
+    """
+    lines = [f"{'table':<20} {'model config':<45} {'wall s':>8} {'cpu s':>9} {'util':>6}"]
+    for r in results:
+        if "error" in r:
+            lines.append(f"{r['table']:<20} {r['model_config']:<45} failed: {r['error']}")
+            continue
+
+        utilisation = r["cpu"] / (r["wall"] * r["cores"]) if r["wall"] > 0 else 0.0
+        lines.append(
+            f"{r['table']:<20} {r['model_config']:<45} {r['wall']:>8.1f} "
+            f"{r['cpu']:>9.1f} {utilisation:>6.0%}"
+        )
+
+    logger.info("Training job report:\n" + "\n".join(lines))
+
+
+def run_training_jobs():
+    # Get configuration file paths
+    db_config_path = os.getenv("DB_CONFIG_PATH")
+    global_config_path = os.getenv("GLOBAL_CONFIG_PATH")
+    jobs_config_path = os.getenv("JOBS_CONFIG_PATH")
+
+    # Parse YAML configurations into python dictionaries
+    db_config = utils._parse_yaml(db_config_path)
+    global_config = utils._parse_yaml(global_config_path)
+    jobs_config = utils._parse_yaml(jobs_config_path)
+
+    jobs = jobs_config["jobs"]
+    cpu_budget = min(
+        jobs_config.get("cpu_budget") or utils._available_cpus(), utils._available_cpus()
+    )
+    workers, cores = _split_cpu_budget(
+        len(jobs), cpu_budget, jobs_config.get("max_parallel_jobs")
+    )
+    logger.info(f"Running {len(jobs)} jobs, {workers} at a time with {cores} cores each")
+
+    results = []
+    with tempfile.TemporaryDirectory() as input_dir:
+        # Load every table once; Jobs on the same table memory-map the same file
+        inputs = {}
+        for table in dict.fromkeys(job["table"] for job in jobs):
+            df = utils._parse_to_pd(db_config, target_table=table)
+            inputs[table] = os.path.join(input_dir, f"{table}.arrow")
+            feather.write_feather(df, inputs[table], compression="uncompressed")
+            del df
+
+        # Fresh process per job, so every job starts with clean CPU counters
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp.get_context("spawn"),
+            max_tasks_per_child=1,
+            initializer=_init_worker,
+        ) as pool:
+            futures = {
+                pool.submit(_run_job, job, inputs[job["table"]], global_config, cores): job
+                for job in jobs
+            }
+
+            for future in as_completed(futures):
+                job = futures[future]
+                try:
+                    results.append(future.result())
+                    logger.info(f"Finished {job['table']} / {job['model_config']}")
+                except Exception as e:
+                    logger.error(f"Failed {job['table']} / {job['model_config']}: {e}")
+                    results.append({**job, "error": str(e)})
+
+    _log_report(results)
+
+
+if __name__ == "__main__":
+    _init_worker()
+    run_training_jobs()
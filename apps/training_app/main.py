@@ -31,20 +31,34 @@ def run_training_pipeline():
     global_config = utils._parse_yaml(global_config_path)
     model_config = utils._parse_yaml(model_config_path)
 
+    # Split the pod's CPU quota between the search, preprocessor and estimator
+    global_config = utils._resolve_n_jobs(global_config)
+
+    # Bayes search history next to the saved model; None without an output dir
+    history_path = utils._search_history_path()
+
     # Parse .db file to pandas DataFrame
     df = utils._parse_to_pd(db_config)
 
-    X_train, X_test, y_train, y_test = nodes.split_dataset(df, global_config)
+    # Incremental mode updates the previously saved model instead of searching
+    if global_config.get("training_mode", "full") == "incremental":
+        best_model, best_params = nodes.retrain_model(
+            df, model_config, global_config, history_path
+        )
 
-    best_model, best_params = nodes.train_model(
-        X_train, y_train, model_config, global_config
-    )
+    else:
+        X_train, X_test, y_train, y_test = nodes.split_dataset(df, global_config)
+
+        best_model, best_params = nodes.train_model(
+            X_train, y_train, model_config, global_config, history_path
+        )
 
     # Add Evaluation Node! >.<
 
     utils._write_to_disk(
         best_model,
         best_params,
+        options=global_config,
     )
 
 
@@ -12,14 +12,25 @@
 
 import utils
 
-from typing import Dict, Tuple
+from typing import Dict, List, Optional, Tuple
 
+import numpy as np
 import pandas as pd
-from sklearn.base import BaseEstimator
-from sklearn.model_selection import StratifiedKFold, train_test_split
+from sklearn.base import BaseEstimator, clone
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.metrics import get_scorer
+from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+from sklearn.model_selection import (
+    HalvingRandomSearchCV,
+    StratifiedKFold,
+    train_test_split,
+)
+from sklearn.model_selection._search import BaseSearchCV
 from sklearn.pipeline import Pipeline
 from skopt import BayesSearchCV
 
+import copy
+import time
 import logging
 import sklearn
 
@@ -53,7 +64,7 @@ def split_dataset(df: pd.DataFrame, options: Dict) -> Tuple:
     X_train, X_test, y_train, y_test = train_test_split(
         X,
         y,
-        test_size=options["train_size"],
+        test_size=options["test_size"],
         random_state=options["random_state"],
         stratify=y,
     )
@@ -62,10 +73,16 @@ def split_dataset(df: pd.DataFrame, options: Dict) -> Tuple:
 
 
 def train_model(
-    X_train: pd.DataFrame, y_train: pd.DataFrame, model_config: Dict, options: Dict
+    X_train: pd.DataFrame,
+    y_train: pd.DataFrame,
+    model_config: Dict,
+    options: Dict,
+    history_path: Optional[str] = None,
 ) -> Tuple[BaseEstimator, Dict]:
     """
-    Trains a model using Bayesian Optimization for hyperparameter tuning
+    Trains a model, tuning its hyperparameters with the strategy set in
+    'search_strategy': Bayesian Optimization ('bayes', default), successive
+    halving ('halving') or Hyperband ('hyperband').
 
     Parameters
     ----------
@@ -81,6 +98,10 @@ def train_model(
     options: Dict
         Defined in configurations/global_configurations.yml under key 'global_configurations'
 
+    history_path: Optional[str]
+        Bayes search history file (utils._search_history_path); Without one,
+        the search neither resumes, seeds nor records its points.
+
     Returns
     -------
     Tuple[BaseEstimator, Dict]
@@ -91,7 +112,9 @@ def train_model(
     model = utils._init_model(X_train, model_config, options)
 
     # Create dataset preprocessor object
-    preprocessor = utils._build_preprocessor(X_train, model_config)
+    preprocessor = utils._build_preprocessor(
+        X_train, model_config, n_jobs=options.get("transformer_n_jobs", -1)
+    )
 
     # Pipes ColumnTransformer object to Pipeline object
     # When dataset is passed into the Pipeline object, the necessary dataset
@@ -111,27 +134,412 @@ def train_model(
 
     search_space = model_config.get("search_space", {})
     search_space = {f"{prefix}{k}": v for k, v in search_space.items()}
-    param_grid = utils._parse_search_space(search_space)
 
     # Use StratifiedKFold over KFold due to imbalanced datset
     cv_strategy = StratifiedKFold(
-        n_splits=options["no_cv_splits"],
+        n_splits=options["cv_splits"],
         shuffle=True,
         random_state=options["random_state"],
     )
 
+    search_strategy = options.get("search_strategy", "bayes").lower()
+    logger.info(f"Tuning hyperparameters with '{search_strategy}' search")
+
     # Hyperparameter optimization with Bayesian Optimisation
-    bs = BayesSearchCV(
-        estimator=model_to_tune,
-        search_spaces=param_grid,
-        cv=cv_strategy,
-        scoring=options["bayes_scoring"],
-        n_jobs=-1,
-        verbose=0,
-        n_iter=options["bayes_search_n_iters"],
-        random_state=options["random_state"],
+    if search_strategy == "bayes":
+        param_grid = utils._parse_search_space(search_space)
+
+        bs = utils._PersistentBayesSearchCV(
+            estimator=model_to_tune,
+            search_spaces=param_grid,
+            cv=cv_strategy,
+            scoring=options["bayes_scoring"],
+            n_jobs=options.get("search_n_jobs", -1),
+            verbose=0,
+            n_iter=options["bayes_search_n_iters"],
+            random_state=options["random_state"],
+        )
+
+        resumed = []
+        if history_path and options.get("search_history", True):
+            resumed = _attach_search_history(bs, history_path, options)
+
+        with utils._threadpool_limits(options):
+            bs.fit(X_train, y_train)
+
+        if bs.history_path:
+            utils._append_search_history(
+                bs.history_path, {"run_id": bs.run_id, "completed": True}
+            )
+
+        # Points evaluated before an interruption are part of this search too
+        _apply_resumed_best(bs, resumed, model_to_tune, X_train, y_train)
+
+        searches = [bs]
+
+    # Resource-aware strategies: Candidates are first scored on a small budget
+    # (n_estimators or training samples) and only the best ones get more
+    elif search_strategy in ("halving", "hyperband"):
+        with utils._threadpool_limits(options):
+            searches = _halving_search(
+                model_to_tune, search_space, cv_strategy, X_train, y_train, prefix, options
+            )
+
+    else:
+        raise ValueError(f"Unknown search strategy: {search_strategy}")
+
+    best_search = max(searches, key=lambda search: search.best_score_)
+    return best_search.best_estimator_, best_search.best_params_
+
+
+def retrain_model(
+    df: pd.DataFrame,
+    model_config: Dict,
+    options: Dict,
+    history_path: Optional[str] = None,
+) -> Tuple[BaseEstimator, Dict]:
+    """
+    Retrains the previously saved model without a hyperparameter search.
+
+    The model and hyperparameters written by utils._write_to_disk are reused and
+    updated on the most recent 'incremental_window_rows' rows:
+        - 'warm_start' (default): Adds 'warm_start_n_estimators' trees
+          (RandomForest) or boosting rounds (XGBoost) trained on the window,
+          up to 'max_n_estimators'. Other estimators are refit.
+        - 'refit': Refits the stored hyperparameters on the window.
+
+    Falls back to a full search (train_model) on the whole dataset when no
+    previous model exists, updating fails, or the validation score of the
+    updated model drops more than 'max_score_drop' below the previous model.
+
+    Parameters
+    ----------
+    df: pd.DataFrame
+        Full dataset, oldest rows first
+
+    model_config: Dict
+        Defined in configurations/model_configurations/*.yml under key '<model_header>'
+
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+
+    history_path: Optional[str]
+        Bayes search history file used by the full search fallback
+
+    Returns
+    -------
+    Tuple[BaseEstimator, Dict]
+        Returns a tuple containing the updated model and its corresponsing hyperparameters.
+    """
+
+    def _full_search():
+        X_train, X_test, y_train, y_test = split_dataset(df, options)
+        return train_model(X_train, y_train, model_config, options, history_path)
+
+    previous = utils._read_from_disk()
+    if previous is None:
+        logger.info("No previous model found, running a full search")
+        return _full_search()
+
+    previous_model, params = previous
+
+    window_rows = options.get("incremental_window_rows")
+    window = df.tail(window_rows) if window_rows else df
+    X_train, X_val, y_train, y_val = split_dataset(window, options)
+
+    scorer = get_scorer(options["bayes_scoring"])
+    previous_score = scorer(previous_model, X_val, y_val)
+
+    start = time.perf_counter()
+    try:
+        model, params = _update_model(previous_model, params, X_train, y_train, options)
+    except Exception as e:
+        logger.warning(f"Incremental update failed ({e}), running a full search")
+        return _full_search()
+
+    score = scorer(model, X_val, y_val)
+    logger.info(
+        f"Incremental update took {time.perf_counter() - start:.1f}s: "
+        f"validation score {previous_score:.4f} -> {score:.4f}"
+    )
+
+    if score < previous_score - options.get("max_score_drop", 0.02):
+        logger.info("Validation score degraded past the threshold, running a full search")
+        return _full_search()
+
+    return model, params
+
+
+def _update_model(
+    previous_model: BaseEstimator,
+    params: Dict,
+    X_train: pd.DataFrame,
+    y_train: pd.DataFrame,
+    options: Dict,
+) -> Tuple[BaseEstimator, Dict]:
+    """
+    Warm starts or refits a copy of 'previous_model' on new data.
+
+    A fitted preprocessor is kept as is, so trees added by a warm start see the
+    same feature encoding as the existing ones.
+
+    Parameters
+    ----------
+    previous_model: BaseEstimator
+        Model or Pipeline loaded from disk
+
+    params: Dict
+        Hyperparameters loaded from disk
+
+    X_train: pd.DataFrame
+        Features of the new data window
+
+    y_train: pd.DataFrame
+        Targets of the new data window
+
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+
+    Returns
+    -------
+    Tuple[BaseEstimator, Dict]
+        Updated model and hyperparameters.
+    """
+    strategy = options.get("incremental_strategy", "warm_start").lower()
+    extra = options.get("warm_start_n_estimators", 100)
+    max_n_estimators = options.get("max_n_estimators")
+
+    if strategy == "refit":
+        model = clone(previous_model).set_params(**params)
+        model.fit(X_train, y_train)
+        return model, params
+
+    elif strategy != "warm_start":
+        raise ValueError(f"Unknown incremental strategy: {strategy}")
+
+    # Separate the fitted preprocessor from the estimator
+    X_train_raw = X_train
+    if isinstance(previous_model, Pipeline):
+        steps = previous_model.steps[:-1]
+        step_name, estimator = previous_model.steps[-1]
+        prefix = f"{step_name}__"
+        X_train = previous_model[:-1].transform(X_train)
+    else:
+        steps, estimator, prefix = [], previous_model, ""
+
+    # XGBoost's n_estimators is only the rounds of its last fit; After a warm
+    # start the booster holds more, so the real total is read from it
+    if type(estimator).__module__.startswith("xgboost"):
+        n_estimators = estimator.get_booster().num_boosted_rounds()
+    else:
+        n_estimators = estimator.get_params().get("n_estimators")
+
+    # RandomForest: Keep the fitted trees and grow 'extra' new ones on the window;
+    # Past 'max_n_estimators' the oldest trees, fit on the stalest windows, are dropped
+    if isinstance(estimator, RandomForestClassifier):
+        estimator = copy.deepcopy(estimator)
+        estimator.set_params(warm_start=True, n_estimators=n_estimators + extra)
+        estimator.fit(X_train, y_train)
+        estimator.set_params(warm_start=False)
+
+        n_estimators += extra
+        if max_n_estimators and n_estimators > max_n_estimators:
+            dropped = n_estimators - max_n_estimators
+            estimator.estimators_ = estimator.estimators_[dropped:]
+            estimator.set_params(n_estimators=max_n_estimators)
+            n_estimators = max_n_estimators
+            logger.info(f"Dropped the {dropped} oldest trees (max_n_estimators={max_n_estimators})")
+
+    # XGBoost: Continue boosting from the existing booster for 'extra' rounds;
+    # Boosting rounds build on each other and cannot be dropped, so past
+    # 'max_n_estimators' the stored hyperparameters are refit on the window
+    elif type(estimator).__module__.startswith("xgboost"):
+        if max_n_estimators and n_estimators + extra > max_n_estimators:
+            logger.info(f"Refitting instead of warm starting (max_n_estimators={max_n_estimators})")
+            params = {**params, f"{prefix}n_estimators": min(n_estimators, max_n_estimators)}
+            model = clone(previous_model).set_params(**params)
+            model.fit(X_train_raw, y_train)
+            return model, params
+
+        booster = estimator.get_booster()
+        estimator = clone(estimator).set_params(n_estimators=extra)
+        estimator.fit(X_train, y_train, xgb_model=booster)
+
+        # Saved with the total, so params.json and a later refit see every round
+        n_estimators = estimator.get_booster().num_boosted_rounds()
+        estimator.set_params(n_estimators=n_estimators)
+
+    else:
+        estimator = clone(estimator)
+        estimator.fit(X_train, y_train)
+        extra = 0
+
+    if extra:
+        params = {**params, f"{prefix}n_estimators": n_estimators}
+        logger.info(f"Warm started {type(estimator).__name__} with {extra} estimators")
+
+    model = Pipeline(steps=steps + [(step_name, estimator)]) if steps else estimator
+    return model, params
+
+
+def _attach_search_history(
+    bs: BayesSearchCV, history_path: str, options: Dict
+) -> List[Dict]:
+    """
+    Connects a Bayes search to its history file next to the model output.
+
+    Resumes the last run if it was interrupted and seeds the optimizer with
+    prior observations of the same table and model config.
+
+    Returns
+    -------
+    List[Dict]
+        Points resumed from an interrupted run.
+    """
+    run_id, resumed, seeds = utils._plan_search_history(
+        utils._load_search_history(history_path), options
     )
 
-    bs.fit(X_train, y_train)
+    bs.history_path = history_path
+    bs.run_id = run_id
+    bs.prior_observations = resumed + seeds
+
+    if resumed:
+        # n_iter stays at least 1; skopt needs one step to build its result
+        bs.n_iter = max(1, bs.n_iter - len(resumed))
+        logger.info(
+            f"Resuming search {run_id}: {len(resumed)} points done, {bs.n_iter} left"
+        )
+
+    return resumed
+
+
+def _apply_resumed_best(
+    bs: BayesSearchCV,
+    resumed: List[Dict],
+    model_to_tune: BaseEstimator,
+    X_train: pd.DataFrame,
+    y_train: pd.DataFrame,
+):
+    """
+    Makes the best resumed point the search result if it beats this process's best.
+    """
+    scored = [p for p in resumed if p["score"] is not None and not np.isnan(p["score"])]
+    if not scored:
+        return
+
+    best_resumed = max(scored, key=lambda p: p["score"])
+    if best_resumed["score"] <= bs.best_score_:
+        return
+
+    logger.info(f"Best point was evaluated before the interruption: {best_resumed['params']}")
+    bs.best_params_ = best_resumed["params"]
+    bs.best_score_ = best_resumed["score"]
+    bs.best_estimator_ = clone(model_to_tune).set_params(**bs.best_params_)
+    bs.best_estimator_.fit(X_train, y_train)
+
+
+def _halving_search(
+    model_to_tune: BaseEstimator,
+    search_space: Dict,
+    cv_strategy: StratifiedKFold,
+    X_train: pd.DataFrame,
+    y_train: pd.DataFrame,
+    prefix: str,
+    options: Dict,
+) -> List[BaseSearchCV]:
+    """
+    Tunes a model with successive halving or Hyperband.
+
+    'halving' runs a single HalvingRandomSearchCV. 'hyperband' runs one
+    HalvingRandomSearchCV per Hyperband bracket; train_model keeps the best one.
+
+    Parameters
+    ----------
+    model_to_tune: BaseEstimator
+        Model or Pipeline to tune
+
+    search_space: Dict
+        Search space with Pipeline prefixes applied
+
+    cv_strategy: StratifiedKFold
+        Cross validation splitter
+
+    X_train: pd.DataFrame
+        Features of the training dataset
+
+    y_train: pd.DataFrame
+        Targets of the training dataset
+
+    prefix: str
+        Pipeline parameter prefix of the model step
+
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+
+    Returns
+    -------
+    List[BaseSearchCV]
+        Fitted searches; One for 'halving', one per bracket for 'hyperband'.
+    """
+    factor = options.get("halving_factor", 3)
+    resource = options.get("halving_resource", "n_samples")
+
+    # With n_estimators as budget, the searched range becomes the budget range
+    if resource == "n_samples":
+        max_resources = len(X_train)
+        min_resources = options.get("halving_min_resources", "smallest")
+    else:
+        resource = f"{prefix}{resource}"
+        if resource not in search_space:
+            raise ValueError(f"Halving resource '{resource}' is not in the search space")
+
+        budget = search_space.pop(resource)
+        max_resources = budget["high"]
+        min_resources = options.get("halving_min_resources", budget["low"])
+
+    param_distributions = utils._parse_search_distributions(search_space)
+
+    def _build_search(n_candidates, min_resources):
+        return HalvingRandomSearchCV(
+            estimator=model_to_tune,
+            param_distributions=param_distributions,
+            n_candidates=n_candidates,
+            factor=factor,
+            resource=resource,
+            min_resources=min_resources,
+            max_resources=max_resources,
+            cv=cv_strategy,
+            scoring=options["bayes_scoring"],
+            n_jobs=options.get("search_n_jobs", -1),
+            verbose=0,
+            random_state=options["random_state"],
+        )
+
+    if options.get("search_strategy", "halving").lower() == "halving":
+        # Bounded by default: "exhaust" fills the first round with as many
+        # candidates as its budget allows, hundreds of fits on small tables
+        n_candidates = (
+            options.get("halving_n_candidates") or options["bayes_search_n_iters"]
+        )
+        search = _build_search(n_candidates, min_resources)
+        search.fit(X_train, y_train)
+        return [search]
+
+    # Hyperband needs a numeric starting budget to lay out its brackets
+    if not isinstance(min_resources, int):
+        min_resources = 2 * cv_strategy.get_n_splits() * y_train.nunique()
+
+    searches = []
+    for n_candidates, bracket_min in utils._hyperband_brackets(
+        min_resources, max_resources, factor
+    ):
+        search = _build_search(n_candidates, bracket_min)
+        search.fit(X_train, y_train)
+        logger.debug(
+            f"Hyperband bracket ({n_candidates} candidates from {bracket_min} "
+            f"{resource}): best score {search.best_score_:.4f}"
+        )
+        searches.append(search)
 
-    return bs.best_estimator_, bs.best_params_
+    return searches
@@ -10,24 +10,52 @@
 
 # Linted and formatted with Ruff
 
-from typing import Any, Dict, Type
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Type
 
 import os
+import sys
+import time
+import resource
+import threading
+import contextlib
+import uuid
+import hashlib
 import yaml
 import json
 import importlib
 import joblib
 import psycopg2
+from psycopg2 import sql
+import numpy as np
 import pandas as pd
+from scipy import stats
 from sklearn.compose import ColumnTransformer
-from sklearn.base import BaseEstimator
+from sklearn.pipeline import Pipeline
+from sklearn.base import BaseEstimator, clone
+from skopt import BayesSearchCV
 from skopt.space import Categorical, Integer, Real
 from sklearn.preprocessing import OneHotEncoder, OrdinalEncoder, StandardScaler
+from threadpoolctl import threadpool_limits
 
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Compact dtypes applied per fetched chunk; Postgres FLOAT arrives as float64
+# and INT as Python ints, which would otherwise be stored as float64/object
+COMPACT_DTYPES = {
+    "entry_id": "Int32",
+    "temperature": "float32",
+    "turbidity": "float32",
+    "dissolved_oxygen": "float32",
+    "ph": "float32",
+    "ammonia": "float32",
+    "nitrate": "float32",
+    "population": "Int32",
+    "fish_length": "float32",
+    "fish_weight": "float32",
+}
+
 #####################
 # General Utilities #
 #####################
@@ -58,50 +86,1051 @@ def _parse_yaml(file_path: str) -> Dict[str, Any]:
         logger.debug(f"Failed to parse configuration file to python Dictionary: {e}")
 
 
-def _parse_to_pd(con_params: Dict) -> pd.DataFrame:
+def _parse_to_pd(con_params: Dict, target_table: Optional[str] = None) -> pd.DataFrame:
     """
     Fetches PostgreSQL table and converts it to a pandas DataFrame.
 
+    The extraction backend is selected with 'extraction.backend':
+        - 'cursor' (default): Rows are streamed through a named (server-side)
+          cursor in batches of 'fetch_size' rows and cast to compact dtypes per batch.
+        - 'copy': The query is exported with 'COPY ... TO STDOUT' as CSV and piped
+          straight into the pyarrow CSV parser, so no Python row objects are built.
+
+    With 'extraction.cache' enabled, a local snapshot of the table is kept under
+    OUTPUT_PATH and only rows past its highest 'entry_id' are fetched.
+
     Parameters
     ----------
     con_params: Dict
         Postgres connection data.
+        Optional 'extraction' key configures the loader (backend, fetch_size, columns, cache).
+
+    target_table: Optional[str]
+        Table to read; Defaults to the TARGET_TABLE environment variable.
 
     Returns
     -------
     pd.DataFrame
         Converted table as pandas DataFrame.
     """
-    target_table = os.getenv("TARGET_TABLE")
+    target_table = target_table or os.getenv("TARGET_TABLE")
+    con_params, extraction = _split_extraction_config(con_params)
+
+    start = time.perf_counter()
     with psycopg2.connect(**con_params) as con:
-        query = f"SELECT * FROM {target_table};"
-        df = pd.read_sql(query, con)
+        if extraction.get("cache", False):
+            df = _read_cached_table(con, target_table, extraction)
+        else:
+            df = _read_table(con, target_table, extraction)
 
-        logger.info(f"Converted {target_table} to pandas DataFrame")
-        return df
+    _log_extraction_stats(target_table, len(df), time.perf_counter() - start)
+    return df
 
 
-def _write_to_disk(model: BaseEstimator, params: dict):
+def _read_table(
+    con, target_table: str, extraction: Dict, min_entry_id: Optional[int] = None
+) -> pd.DataFrame:
     """
-    Writes data to disk.
+    Reads a table with the extraction backend defined in 'extraction'.
+
+    Parameters
+    ----------
+    con:
+        Open psycopg2 connection.
+
+    target_table: str
+        Table to read.
+
+    extraction: Dict
+        Defined in configurations/db_config.yaml under key 'extraction'
+
+    min_entry_id: Optional[int]
+        Only rows with a greater 'entry_id' are read; Whole table when None.
+
+    Returns
+    -------
+    pd.DataFrame
+        Table as a DataFrame with compact dtypes.
     """
+    backend = extraction.get("backend", "cursor").lower()
+    columns = extraction.get("columns")
+
+    if backend == "cursor":
+        return _stream_table(
+            con,
+            target_table,
+            columns=columns,
+            fetch_size=extraction.get("fetch_size", 50000),
+            min_entry_id=min_entry_id,
+        )
 
-    base_path = os.getenv("OUTPUT_PATH")
-    table_name = os.getenv("TARGET_TABLE")
-    model_name = os.getenv("MODEL_CONFIG_PATH").replace(".yaml", "")
+    elif backend == "copy":
+        return _copy_table(
+            con, target_table, columns=columns, min_entry_id=min_entry_id
+        )
+
+    raise ValueError(f"Unknown extraction backend: {backend}")
+
+
+def _split_extraction_config(con_params: Dict) -> Tuple[Dict, Dict]:
+    """
+    Separates loader options from the psycopg2 connection parameters.
+
+    Parameters
+    ----------
+    con_params: Dict
+        Defined in configurations/db_config.yaml under key 'database_config'
+
+    Returns
+    -------
+    Tuple[Dict, Dict]
+        Connection parameters and the 'extraction' options.
+    """
+    con_params = dict(con_params)
+    extraction = con_params.pop("extraction", None) or {}
+    return con_params, extraction
+
+
+def _select_query(
+    target_table: str, columns: Optional[List[str]], min_entry_id: Optional[int] = None
+) -> sql.Composed:
+    """
+    Builds a 'SELECT <columns> FROM <table>' query with quoted identifiers.
+    Selects every column when 'columns' is empty.
+    Adds 'WHERE entry_id > <min_entry_id>' when 'min_entry_id' is given.
+    """
+    if columns:
+        selected = sql.SQL(", ").join(sql.Identifier(c) for c in columns)
+    else:
+        selected = sql.SQL("*")
+
+    query = sql.SQL("SELECT {} FROM {}").format(selected, sql.Identifier(target_table))
+
+    # Inlined as a literal so the query also works inside COPY, which takes no parameters
+    if min_entry_id is not None:
+        query += sql.SQL(" WHERE entry_id > {}").format(sql.Literal(int(min_entry_id)))
+
+    return query
+
+
+def _compact_dtypes(chunk: pd.DataFrame) -> pd.DataFrame:
+    """
+    Downcasts known pond columns to compact dtypes.
+    Sensor readings become float32 and integer columns become nullable Int32.
+    """
+    dtypes = {c: t for c, t in COMPACT_DTYPES.items() if c in chunk.columns}
+    return chunk.astype(dtypes)
+
+
+def _stream_table(
+    con,
+    target_table: str,
+    columns: Optional[List[str]],
+    fetch_size: int,
+    min_entry_id: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Reads a table through a named server-side cursor in batches.
+
+    Parameters
+    ----------
+    con:
+        Open psycopg2 connection.
+
+    target_table: str
+        Table to read.
+
+    columns: Optional[List[str]]
+        Columns to select; All columns when None.
+
+    fetch_size: int
+        Number of rows transferred per round trip.
+
+    min_entry_id: Optional[int]
+        Only rows with a greater 'entry_id' are read; Whole table when None.
+
+    Returns
+    -------
+    pd.DataFrame
+        Table as a DataFrame with compact dtypes.
+    """
+    chunks = []
+    # Named cursors are server-side; Postgres keeps the result set and hands
+    # over 'itersize' rows per round trip
+    with con.cursor(name=f"{target_table}_loader") as cursor:
+        cursor.itersize = fetch_size
+        cursor.execute(_select_query(target_table, columns, min_entry_id))
+
+        while True:
+            rows = cursor.fetchmany(fetch_size)
+            if not rows:
+                break
+
+            # cursor.description is only populated after the first fetch
+            names = [d.name for d in cursor.description]
+            chunk = pd.DataFrame.from_records(rows, columns=names)
+            chunks.append(_compact_dtypes(chunk))
+            del rows
+
+            logger.debug(f"Fetched chunk {len(chunks)} of {target_table}")
+
+    if not chunks:
+        return _compact_dtypes(pd.DataFrame(columns=columns or []))
+
+    # Chunks already hold compact dtypes; One concat into the final frame
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _copy_table(
+    con,
+    target_table: str,
+    columns: Optional[List[str]],
+    min_entry_id: Optional[int] = None,
+) -> pd.DataFrame:
+    """
+    Reads a table with 'COPY (SELECT ...) TO STDOUT' parsed by pyarrow.
+
+    psycopg2 pushes the CSV export into one end of an OS pipe from a worker
+    thread while pyarrow parses the other end into columnar buffers, so the
+    export is never materialized as Python objects or as one large bytes blob.
+
+    Parameters
+    ----------
+    con:
+        Open psycopg2 connection.
+
+    target_table: str
+        Table to read.
+
+    columns: Optional[List[str]]
+        Columns to select; All columns when None.
+
+    min_entry_id: Optional[int]
+        Only rows with a greater 'entry_id' are read; Whole table when None.
+
+    Returns
+    -------
+    pd.DataFrame
+        Table as a DataFrame with compact dtypes.
+    """
+    # Only required by the 'copy' backend
+    import pyarrow as pa
+    from pyarrow import csv as pa_csv
+
+    arrow_types = {"float32": pa.float32(), "Int32": pa.int32()}
+    column_types = {c: arrow_types[t] for c, t in COMPACT_DTYPES.items()}
+
+    copy_query = sql.SQL("COPY ({}) TO STDOUT WITH (FORMAT csv, HEADER true)").format(
+        _select_query(target_table, columns, min_entry_id)
+    )
+    query = copy_query.as_string(con)
+
+    read_fd, write_fd = os.pipe()
+    errors = []
+
+    def _produce():
+        try:
+            with os.fdopen(write_fd, "wb") as sink:
+                con.cursor().copy_expert(query, sink)
+        except BrokenPipeError:
+            # Reader stopped early; Its own error is raised in the main thread
+            pass
+        except Exception as e:
+            errors.append(e)
+
+    producer = threading.Thread(target=_produce, daemon=True)
+    producer.start()
+
+    read_error = None
+    try:
+        with os.fdopen(read_fd, "rb") as source:
+            table = pa_csv.read_csv(
+                source,
+                convert_options=pa_csv.ConvertOptions(
+                    column_types=column_types, strings_can_be_null=True
+                ),
+            )
+    except Exception as e:
+        read_error = e
+    finally:
+        producer.join()
+
+    # A failed COPY closes the pipe early, so pyarrow then only reports a
+    # symptom such as "Empty CSV file"; The database error is raised first
+    if errors:
+        raise errors[0] from read_error
+    if read_error is not None:
+        raise read_error
+
+    # Nullable Int32 for integer columns so missing population stays <NA>
+    return table.to_pandas(types_mapper={pa.int32(): pd.Int32Dtype()}.get)
+
+
+def _snapshot_path(target_table: str) -> str:
+    """
+    Returns the local snapshot file of a table: OUTPUT_PATH/<table>/snapshot.arrow
+    """
+    return os.path.join(os.getenv("OUTPUT_PATH"), target_table, "snapshot.arrow")
+
+
+def _read_cached_table(con, target_table: str, extraction: Dict) -> pd.DataFrame:
+    """
+    Reads a table through a local columnar snapshot keyed by max(entry_id).
+
+    The snapshot is an uncompressed Arrow IPC (Feather v2) file so it can be
+    memory-mapped. Only rows with an 'entry_id' above the snapshot's high-water
+    mark are fetched from Postgres and appended. If the table's max(entry_id)
+    drops below the high-water mark (table was recreated) or the fetched columns
+    no longer match, the snapshot is rebuilt from scratch.
+
+    Rows updated or deleted in Postgres after being cached are not picked up;
+    Delete the snapshot file to force a full reload.
+
+    Parameters
+    ----------
+    con:
+        Open psycopg2 connection.
+
+    target_table: str
+        Table to read.
+
+    extraction: Dict
+        Defined in configurations/db_config.yaml under key 'extraction'
+
+    Returns
+    -------
+    pd.DataFrame
+        Table as a DataFrame with compact dtypes.
+    """
+    # Only required by the snapshot cache
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    from pyarrow import feather
+
+    # 'entry_id' is needed to track the high-water mark, even if not a feature
+    columns = extraction.get("columns")
+    if columns and "entry_id" not in columns:
+        extraction = {**extraction, "columns": ["entry_id", *columns]}
+
+    snapshot_path = _snapshot_path(target_table)
+    cached = None
+    high_water_mark = None
+
+    if os.path.exists(snapshot_path):
+        cached = feather.read_table(snapshot_path, memory_map=True)
+        expected = extraction.get("columns")
+        if expected and cached.column_names != expected:
+            logger.info(f"Snapshot columns of {target_table} changed, rebuilding")
+            cached = None
+        elif cached.num_rows > 0:
+            high_water_mark = pc.max(cached["entry_id"]).as_py()
+
+    with con.cursor() as cursor:
+        cursor.execute(
+            sql.SQL("SELECT max(entry_id) FROM {}").format(sql.Identifier(target_table))
+        )
+        table_max = cursor.fetchone()[0]
+
+    if high_water_mark is not None and (table_max is None or table_max < high_water_mark):
+        logger.info(f"{target_table} was recreated since its snapshot, rebuilding")
+        cached, high_water_mark = None, None
+
+    if cached is not None and table_max == high_water_mark:
+        logger.info(
+            f"Snapshot cache hit for {target_table}: {cached.num_rows} rows, "
+            f"0 bytes transferred"
+        )
+        snapshot = cached
+
+    else:
+        delta = _read_table(con, target_table, extraction, min_entry_id=high_water_mark)
+        transferred = delta.memory_usage(deep=True).sum()
+        delta_table = pa.Table.from_pandas(delta, preserve_index=False)
+
+        if cached is not None and not cached.schema.equals(delta_table.schema):
+            logger.info(f"Snapshot schema of {target_table} changed, rebuilding")
+            cached = None
+            delta = _read_table(con, target_table, extraction)
+            transferred += delta.memory_usage(deep=True).sum()
+            delta_table = pa.Table.from_pandas(delta, preserve_index=False)
+
+        if cached is None:
+            logger.info(
+                f"Snapshot cache miss for {target_table}: fetched {delta_table.num_rows} "
+                f"rows, {transferred / (1024 * 1024):.1f} MiB transferred"
+            )
+            snapshot = delta_table
+        else:
+            logger.info(
+                f"Snapshot cache partial hit for {target_table}: reused "
+                f"{cached.num_rows} rows, fetched {delta_table.num_rows} new rows, "
+                f"{transferred / (1024 * 1024):.1f} MiB transferred"
+            )
+            snapshot = pa.concat_tables([cached, delta_table])
+
+        # Write next to the old snapshot and swap, so a crash never leaves a
+        # half-written file; The old file stays valid for its existing mmap
+        os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+        tmp_path = f"{snapshot_path}.tmp"
+        feather.write_feather(snapshot, tmp_path, compression="uncompressed")
+        os.replace(tmp_path, snapshot_path)
+        snapshot = feather.read_table(snapshot_path, memory_map=True)
+
+    # split_blocks keeps one block per column, so null-free numeric columns stay
+    # zero-copy views over the memory-mapped file
+    df = snapshot.to_pandas(split_blocks=True)
+    if columns and "entry_id" not in columns:
+        df = df.drop(columns="entry_id")
+
+    return df
 
-    final_dir = os.path.join(base_path, table_name, model_name)
+
+def _peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of this process in MiB.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux
+    if sys.platform == "darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def _log_extraction_stats(target_table: str, n_rows: int, elapsed: float):
+    """
+    Logs row count, throughput and peak RSS of a table extraction.
+    Used to size memory requests of the training Job.
+    """
+    rows_per_sec = n_rows / elapsed if elapsed > 0 else float("inf")
+    logger.info(
+        f"Converted {target_table} to pandas DataFrame: {n_rows} rows in "
+        f"{elapsed:.2f}s ({rows_per_sec:,.0f} rows/s), peak RSS {_peak_rss_mb():.1f} MiB"
+    )
+
+
+def _write_to_disk(
+    model: BaseEstimator,
+    params: dict,
+    table_name: Optional[str] = None,
+    model_config_path: Optional[str] = None,
+    options: Optional[Dict] = None,
+):
+    """
+    Writes data to disk.
+    Output goes to OUTPUT_PATH/<table_name>/<model config path without .yaml>;
+    Table and model config default to the TARGET_TABLE and MODEL_CONFIG_PATH
+    environment variables.
+
+    Besides the model artifact and params.json, a manifest.json records the
+    artifact format, size, write and load time and the feature schema.
+    The artifact layout is set by 'artifact_format' and 'artifact_compress' in
+    'options', see '_dump_artifact'.
+    """
+
+    final_dir = _output_dir(table_name, model_config_path)
 
     os.makedirs(final_dir, exist_ok=True)
 
+    param_path = os.path.join(final_dir, "params.json")
+    with _atomic_path(param_path) as tmp_path, open(tmp_path, "w") as f:
+        # Search results hold numpy scalars, which json cannot serialize
+        json.dump(dict(params), f, indent=4, default=_to_builtin)
+
+    # Every file is swapped in whole and the manifest goes last, so its
+    # version changes only once the artifact it describes is complete
+    manifest = _dump_artifact(model, final_dir, options or {})
+    manifest_path = os.path.join(final_dir, "manifest.json")
+    with _atomic_path(manifest_path) as tmp_path, open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=4)
+
+    logger.info(
+        f"Saved data to: {final_dir} ({manifest['size_bytes'] / (1024 * 1024):.1f} MiB, "
+        f"{manifest['format']}, loads in {manifest['load_seconds']:.2f}s)"
+    )
+
+
+def _read_from_disk(
+    table_name: Optional[str] = None, model_config_path: Optional[str] = None
+) -> Optional[Tuple[BaseEstimator, Dict]]:
+    """
+    Reads the model and hyperparameters written by '_write_to_disk'.
+
+    Returns
+    -------
+    Optional[Tuple[BaseEstimator, Dict]]
+        Fitted model and its hyperparameters, or None when nothing was saved yet.
+    """
+    final_dir = _output_dir(table_name, model_config_path)
     model_path = os.path.join(final_dir, "model.joblib")
     param_path = os.path.join(final_dir, "params.json")
 
-    joblib.dump(model, model_path)
-    with open(param_path, "w") as f:
-        json.dump(params, f, indent=4)
+    if not (os.path.exists(model_path) and os.path.exists(param_path)):
+        return None
+
+    model = _load_artifact(final_dir)
+    with open(param_path, "r") as f:
+        params = json.load(f)
 
-    logger.info(f"Saved data to: {final_dir}")
+    logger.info(f"Loaded previous model from: {final_dir}")
+    return model, params
+
+
+def _dump_artifact(model: BaseEstimator, final_dir: str, options: Dict) -> Dict:
+    """
+    Writes a fitted model to 'final_dir' and returns its manifest.
+
+    Formats ('artifact_format'):
+        - 'joblib' (default): The whole model in model.joblib.
+        - 'native': XGBoost boosters are saved in XGBoost's own UBJSON format
+          (booster.ubj) and model.joblib keeps the rest of the Pipeline with
+          an unfitted estimator. Loads faster and survives XGBoost upgrades.
+          Other estimators are written as 'joblib'.
+
+    'artifact_compress' is passed to joblib.dump (e.g. 3 or ["lz4", 3]).
+    Uncompressed dumps (0, default) load fastest and are opened memory-mapped.
+    sklearn trees copy their node arrays when unpickled, so a loaded forest
+    still takes about its file size in memory and is not shared between
+    processes; Only arrays kept as-is by the model stay mapped.
+
+    Every file is written under a temporary name and moved into place with
+    os.replace, so a reader never opens a half-written file.
+
+    Parameters
+    ----------
+    model: BaseEstimator
+        Fitted model or Pipeline
+
+    final_dir: str
+        Output directory
+
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+
+    Returns
+    -------
+    Dict
+        Manifest describing the written artifact.
+    """
+    artifact_format = options.get("artifact_format", "joblib").lower()
+    compress = options.get("artifact_compress", 0)
+    if isinstance(compress, list):
+        compress = tuple(compress)
+
+    model_path = os.path.join(final_dir, "model.joblib")
+    booster_path = os.path.join(final_dir, "booster.ubj")
+    files = ["model.joblib"]
+
+    start = time.perf_counter()
+    estimator = model.steps[-1][1] if isinstance(model, Pipeline) else model
+
+    if artifact_format == "native" and type(estimator).__module__.startswith("xgboost"):
+        # XGBoost picks the format from the file extension
+        with _atomic_path(booster_path) as tmp_path:
+            estimator.save_model(tmp_path)
+        files.append("booster.ubj")
+
+        # Keep the preprocessor and the estimator's parameters, not its booster
+        if isinstance(model, Pipeline):
+            shell = Pipeline(
+                steps=model.steps[:-1] + [(model.steps[-1][0], clone(estimator))]
+            )
+        else:
+            shell = clone(estimator)
+        with _atomic_path(model_path) as tmp_path:
+            joblib.dump(shell, tmp_path, compress=compress)
+
+    else:
+        artifact_format = "joblib"
+        if os.path.exists(booster_path):
+            os.remove(booster_path)
+        with _atomic_path(model_path) as tmp_path:
+            joblib.dump(model, tmp_path, compress=compress)
+
+    write_seconds = time.perf_counter() - start
+
+    manifest = {
+        "format": artifact_format,
+        "compress": compress,
+        "files": files,
+        "size_bytes": sum(os.path.getsize(os.path.join(final_dir, f)) for f in files),
+        "write_seconds": write_seconds,
+        **_feature_schema(model),
+    }
+
+    start = time.perf_counter()
+    _load_artifact(final_dir, manifest)
+    manifest["load_seconds"] = time.perf_counter() - start
+
+    # Flat tree arrays for the NumPy predictor of the inference app
+    compiled_path = os.path.join(final_dir, "compiled.npz")
+    compiled = _compile_ensemble(model) if options.get("compile_trees", False) else None
+    if compiled is not None:
+        with _atomic_path(compiled_path) as tmp_path:
+            np.savez(tmp_path, **compiled)
+        manifest["compiled"] = {
+            "file": "compiled.npz",
+            "size_bytes": os.path.getsize(compiled_path),
+            "n_trees": int(compiled["roots"].size),
+            "n_nodes": int(compiled["feature"].size),
+        }
+    elif os.path.exists(compiled_path):
+        os.remove(compiled_path)
+
+    return manifest
+
+
+@contextlib.contextmanager
+def _atomic_path(path: str) -> Iterator[str]:
+    """
+    Yields a temporary path next to 'path' and moves it over 'path' once written.
+
+    The temporary name keeps the extension (model.tmp.joblib), since np.savez
+    and XGBoost's save_model decide the file format from it. On failure the
+    temporary file is removed and 'path' is left untouched.
+    """
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"
+    try:
+        yield tmp_path
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def _load_artifact(final_dir: str, manifest: Optional[Dict] = None) -> BaseEstimator:
+    """
+    Loads a model written by '_dump_artifact'.
+    Uncompressed joblib files are memory-mapped read-only.
+
+    Parameters
+    ----------
+    final_dir: str
+        Directory holding model.joblib (and booster.ubj for 'native' artifacts)
+
+    manifest: Optional[Dict]
+        Artifact manifest; Read from manifest.json when None. Artifacts written
+        before manifests existed load as plain joblib.
+
+    Returns
+    -------
+    BaseEstimator
+        Fitted model or Pipeline.
+    """
+    if manifest is None:
+        manifest_path = os.path.join(final_dir, "manifest.json")
+        manifest = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+
+    mmap_mode = None if manifest.get("compress") else "r"
+    model = joblib.load(os.path.join(final_dir, "model.joblib"), mmap_mode=mmap_mode)
+
+    if manifest.get("format") == "native":
+        estimator = model.steps[-1][1] if isinstance(model, Pipeline) else model
+        estimator.load_model(os.path.join(final_dir, "booster.ubj"))
+
+    return model
+
+
+def _feature_schema(model: BaseEstimator) -> Dict:
+    """
+    Describes the input features a fitted model expects.
+
+    Tree ensembles compare features as float32 internally, so inputs are
+    declared as float32 and can be cast before predicting without changing
+    any prediction. The hash lets consumers check that a request's columns
+    match the model they are sent to.
+
+    Returns
+    -------
+    Dict
+        'feature_schema' (name and dtype per feature) and 'feature_schema_hash'.
+    """
+    names = [str(name) for name in getattr(model, "feature_names_in_", [])]
+    schema = [{"name": name, "dtype": "float32"} for name in names]
+    digest = hashlib.sha256(json.dumps(schema).encode()).hexdigest()
+
+    return {"feature_schema": schema, "feature_schema_hash": digest}
+
+
+def _compile_ensemble(model: BaseEstimator) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Flattens a fitted tree ensemble into contiguous arrays.
+
+    Every tree of the ensemble is appended to one node table (feature,
+    threshold, left/right child, missing value direction, leaf value); 'roots'
+    holds the first node of each tree. Leaves point to themselves, so a batched
+    traversal can step every row through every tree for 'max_depth' steps
+    without branching. A node sends a row left when x <= threshold.
+
+    Supported estimators:
+        - sklearn forests (RandomForestClassifier, ExtraTreesClassifier):
+          leaf values are class fractions, averaged over trees ('mean').
+        - XGBoost gbtree classifiers: leaf values are margins, summed per
+          class ('group') and passed through 'softmax' or 'sigmoid'.
+
+    Pipelines are only compiled when every step before the estimator passes
+    its input columns through unchanged, which holds for the tree model
+    configurations (no encoding, no scaling).
+
+    Parameters
+    ----------
+    model: BaseEstimator
+        Fitted model or Pipeline
+
+    Returns
+    -------
+    Optional[Dict[str, np.ndarray]]
+        Arrays for np.savez, or None when the model cannot be compiled.
+    """
+    steps = model.steps if isinstance(model, Pipeline) else [("model", model)]
+    estimator = steps[-1][1]
+
+    for name, step in steps[:-1]:
+        if not _is_passthrough(step):
+            logger.info(f"Not compiling trees: Pipeline step '{name}' transforms its input")
+            return None
+
+    if type(estimator).__module__.startswith("xgboost"):
+        compiled = _compile_xgboost(estimator)
+    elif hasattr(estimator, "classes_") and all(
+        hasattr(tree, "tree_") for tree in getattr(estimator, "estimators_", [None])
+    ):
+        compiled = _compile_sklearn_forest(estimator)
+    else:
+        compiled = None
+
+    if compiled is None:
+        logger.info(f"Not compiling trees: {type(estimator).__name__} is not supported")
+        return None
+
+    names = [str(name) for name in getattr(model, "feature_names_in_", [])]
+    meta = json.loads(str(compiled["meta"]))
+    meta["feature_names"] = names
+    meta["n_features"] = len(names) or meta["n_features"]
+    compiled["meta"] = np.array(json.dumps(meta, default=_to_builtin))
+
+    return compiled
+
+
+def _is_passthrough(step: BaseEstimator) -> bool:
+    """
+    Checks that a fitted ColumnTransformer outputs its input columns unchanged and in order.
+
+    Recent sklearn versions store the passthrough remainder as an identity FunctionTransformer.
+    """
+    transformers = getattr(step, "transformers_", None)
+    if transformers is None:
+        return False
+
+    for _, transformer, cols in transformers:
+        identity = transformer == "passthrough" or (
+            type(transformer).__name__ == "FunctionTransformer" and transformer.func is None
+        )
+        if len(cols) and not identity:
+            return False
+
+    return list(step.get_feature_names_out()) == list(step.feature_names_in_)
+
+
+def _compile_sklearn_forest(estimator: BaseEstimator) -> Dict[str, np.ndarray]:
+    """
+    Node tables of every DecisionTreeClassifier in a fitted sklearn forest.
+    """
+    trees = []
+    for tree in (t.tree_ for t in estimator.estimators_):
+        is_leaf = tree.children_left == -1
+        nodes = np.arange(tree.node_count)
+
+        # Class counts (or fractions) are normalised per leaf, as tree.predict_proba does
+        value = tree.value[:, 0, :]
+        value = value / value.sum(axis=1, keepdims=True)
+
+        trees.append(
+            {
+                "feature": np.where(is_leaf, 0, tree.feature),
+                "threshold": np.where(is_leaf, np.inf, tree.threshold),
+                "left": np.where(is_leaf, nodes, tree.children_left),
+                "right": np.where(is_leaf, nodes, tree.children_right),
+                "missing_left": np.asarray(
+                    getattr(tree, "missing_go_to_left", np.ones(tree.node_count)), dtype=bool
+                ),
+                "value": value,
+                "depth": tree.max_depth,
+            }
+        )
+
+    meta = {
+        "link": "mean",
+        "classes": list(estimator.classes_),
+        "n_features": int(estimator.n_features_in_),
+    }
+    return _stack_trees(trees, np.zeros(len(trees), dtype=np.int32), np.zeros(0), meta)
+
+
+def _compile_xgboost(estimator: BaseEstimator) -> Optional[Dict[str, np.ndarray]]:
+    """
+    Node tables of every tree in a fitted XGBoost classifier, read from its JSON model.
+
+    XGBoost sends a row left when x < split; Features are float32, so the
+    threshold is lowered to the next float32 below the split to get x <= threshold.
+    The intercept (base score) is recovered from the margin XGBoost predicts for
+    an all-zero row, which holds across XGBoost versions and objectives.
+    """
+    booster = estimator.get_booster()
+    learner = json.loads(booster.save_raw(raw_format="json"))["learner"]
+    gradient_booster = learner["gradient_booster"]
+    objective = learner["objective"]["name"]
+
+    if gradient_booster["name"] != "gbtree":
+        return None
+    if objective in ("multi:softprob", "multi:softmax"):
+        link = "softmax"
+    elif objective == "binary:logistic":
+        link = "sigmoid"
+    else:
+        return None
+
+    trees = []
+    for tree in gradient_booster["model"]["trees"]:
+        if any(tree.get("split_type", [])):
+            return None  # Categorical splits
+
+        left = np.asarray(tree["left_children"])
+        right = np.asarray(tree["right_children"])
+        split = np.asarray(tree["split_conditions"], dtype=np.float32)
+        is_leaf = left == -1
+        nodes = np.arange(left.size)
+
+        depth = np.zeros(left.size, dtype=np.int32)
+        stack = [0]
+        while stack:
+            node = stack.pop()
+            if not is_leaf[node]:
+                depth[[left[node], right[node]]] = depth[node] + 1
+                stack.extend([left[node], right[node]])
+
+        trees.append(
+            {
+                "feature": np.where(is_leaf, 0, tree["split_indices"]),
+                "threshold": np.where(
+                    is_leaf, np.inf, np.nextafter(split, np.float32(-np.inf)).astype(np.float64)
+                ),
+                "left": np.where(is_leaf, nodes, left),
+                "right": np.where(is_leaf, nodes, right),
+                "missing_left": np.asarray(tree["default_left"], dtype=bool),
+                # Leaf weights are stored in split_conditions
+                "value": np.where(is_leaf, split, 0.0)[:, None],
+                "depth": int(depth.max()),
+            }
+        )
+
+    group = np.asarray(gradient_booster["model"]["tree_info"], dtype=np.int32)
+    n_features = int(learner["learner_model_param"]["num_feature"])
+    meta = {
+        "link": link,
+        "classes": list(getattr(estimator, "classes_", range(max(group.max() + 1, 2)))),
+        "n_features": n_features,
+    }
+    compiled = _stack_trees(trees, group, np.zeros(int(group.max()) + 1), meta)
+
+    # Intercept = XGBoost's margin of a zero row minus the summed leaf values it reaches
+    zero_row = np.zeros((1, n_features), dtype=np.float32)
+    margin = np.ravel(booster.inplace_predict(zero_row, predict_type="margin"))
+    leaves = _walk_compiled(compiled, zero_row[0])
+    tree_margin = np.bincount(
+        compiled["group"], weights=compiled["value"][leaves, 0], minlength=margin.size
+    )
+    compiled["intercept"] = (margin - tree_margin).astype(np.float64)
+
+    return compiled
+
+
+def _stack_trees(
+    trees: List[Dict], group: np.ndarray, intercept: np.ndarray, meta: Dict
+) -> Dict[str, np.ndarray]:
+    """
+    Concatenates per-tree node tables into one, offsetting child indices.
+    """
+    sizes = np.array([tree["feature"].size for tree in trees])
+    offsets = np.concatenate([[0], np.cumsum(sizes)[:-1]])
+
+    def _concat(key, dtype, offset=False):
+        return np.concatenate(
+            [tree[key] + (start if offset else 0) for tree, start in zip(trees, offsets)]
+        ).astype(dtype)
+
+    meta = {**meta, "max_depth": max(int(tree["depth"]) for tree in trees)}
+    return {
+        "feature": _concat("feature", np.int32),
+        "threshold": _concat("threshold", np.float64),
+        "left": _concat("left", np.int32, offset=True),
+        "right": _concat("right", np.int32, offset=True),
+        "missing_left": _concat("missing_left", bool),
+        "value": _concat("value", np.float32),
+        "roots": offsets.astype(np.int32),
+        "group": group,
+        "intercept": intercept.astype(np.float64),
+        "meta": np.array(json.dumps(meta, default=_to_builtin)),
+    }
+
+
+def _walk_compiled(compiled: Dict[str, np.ndarray], x: np.ndarray) -> np.ndarray:
+    """
+    Returns the leaf every tree of a compiled ensemble reaches for one row.
+    """
+    leaves = []
+    for node in compiled["roots"]:
+        while compiled["left"][node] != node:
+            value = x[compiled["feature"][node]]
+            go_left = (
+                compiled["missing_left"][node]
+                if np.isnan(value)
+                else value <= compiled["threshold"][node]
+            )
+            node = compiled["left"][node] if go_left else compiled["right"][node]
+        leaves.append(node)
+    return np.asarray(leaves)
+
+
+def _output_dir(
+    table_name: Optional[str] = None, model_config_path: Optional[str] = None
+) -> str:
+    """
+    Returns OUTPUT_PATH/<table_name>/<model config path without .yaml>.
+    Table and model config default to the TARGET_TABLE and MODEL_CONFIG_PATH
+    environment variables.
+    """
+    base_path = os.getenv("OUTPUT_PATH")
+    table_name = table_name or os.getenv("TARGET_TABLE")
+    model_config_path = model_config_path or os.getenv("MODEL_CONFIG_PATH")
+    model_name = model_config_path.replace(".yaml", "")
+
+    return os.path.join(base_path, table_name, model_name)
+
+
+def _to_builtin(value: Any) -> Any:
+    """
+    Converts numpy scalars to python builtins for json serialization.
+    """
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+######################
+# Resource Utilities #
+######################
+
+
+def _cgroup_cpu_quota() -> Optional[float]:
+    """
+    Reads the container CPU limit from the cgroup filesystem.
+
+    Supports cgroup v2 ('cpu.max') and v1 ('cpu.cfs_quota_us' / 'cpu.cfs_period_us').
+
+    Returns
+    -------
+    Optional[float]
+        CPU limit in cores (e.g. 1.5), or None when no limit is set.
+    """
+    try:
+        with open("/sys/fs/cgroup/cpu.max", "r") as f:
+            quota, period = f.read().split()
+        if quota != "max":
+            return int(quota) / int(period)
+        return None
+
+    except (OSError, ValueError):
+        pass
+
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", "r") as f:
+            quota = int(f.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", "r") as f:
+            period = int(f.read())
+        if quota > 0:
+            return quota / period
+
+    except (OSError, ValueError):
+        pass
+
+    return None
+
+
+def _available_cpus() -> int:
+    """
+    Returns the cores this process can actually use.
+    The lower of the CPU affinity and the cgroup quota (rounded up); A pod
+    limited to 2 CPUs on a 32 core node returns 2, not 32.
+    """
+    cpus = len(os.sched_getaffinity(0))
+
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, int(np.ceil(quota))))
+
+    return cpus
+
+
+def _resolve_n_jobs(options: Dict) -> Dict:
+    """
+    Assigns worker counts to each parallel level of the training pipeline.
+
+    The search, the ColumnTransformer and the estimator are nested, so giving
+    each of them every core multiplies the number of workers. The CPU budget is
+    given to one level ('parallel_level') and the other levels run with one worker.
+    Levels explicitly set in 'options' are kept.
+
+    Parameters
+    ----------
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+        'cpu_budget' caps the cores used; Defaults to _available_cpus().
+        'parallel_level' is "search" (default) or "estimator".
+
+    Returns
+    -------
+    Dict
+        Copy of 'options' with 'search_n_jobs', 'transformer_n_jobs' and 'estimator_n_jobs' set.
+    """
+    available = _available_cpus()
+    budget = min(options.get("cpu_budget") or available, available)
+    level = options.get("parallel_level", "search").lower()
+
+    if level == "search":
+        assigned = {"search_n_jobs": budget, "transformer_n_jobs": 1, "estimator_n_jobs": 1}
+
+    elif level == "estimator":
+        assigned = {"search_n_jobs": 1, "transformer_n_jobs": 1, "estimator_n_jobs": budget}
+
+    else:
+        raise ValueError(f"Unknown parallel level: {level}")
+
+    resolved = {**assigned, **options, "cpu_budget": budget}
+    logger.info(
+        f"CPU budget {budget} (available {available}): search {resolved['search_n_jobs']}, "
+        f"transformer {resolved['transformer_n_jobs']}, estimator {resolved['estimator_n_jobs']}"
+    )
+    return resolved
+
+
+def _threadpool_limits(options: Dict):
+    """
+    Limits BLAS/OpenMP threads of native libraries to 'estimator_n_jobs'.
+    Returns a no-op context when 'limit_threadpools' is disabled or no limit is resolved.
+
+    Example
+    -------
+    with _threadpool_limits(options):
+        search.fit(X_train, y_train)
+    """
+    if not options.get("limit_threadpools", True) or "estimator_n_jobs" not in options:
+        return contextlib.nullcontext()
+
+    return threadpool_limits(limits=max(1, options["estimator_n_jobs"]))
 
 
 ##################
@@ -157,6 +1186,236 @@ def _parse_search_space(search_space: dict) -> Dict[str, Any]:
     return bayes_search_params
 
 
+def _parse_search_distributions(search_space: dict) -> Dict[str, Any]:
+    """
+    Parses a dictionary into scipy.stats distributions and lists.
+    Used by the successive halving strategies, which sample candidates with
+    sklearn's ParameterSampler instead of skopt's optimizer.
+
+    Parameters
+    ----------
+    search_space: dict
+        Same format as the input of '_parse_search_space'
+
+    Returns
+    -------
+    Dict[str, Any]
+        Dictionary with parameters wrapped in scipy.stats distributions or lists
+
+    Example
+    -------
+        space = {
+            'x': {'type': 'Integer', 'low': 1, 'high': 10},
+            'y': {'type': 'Categorical', 'categories': ['a', 'b']}
+        }
+
+        _parse_search_distributions(space):
+            Returns -> {'x': randint(1, 11), 'y': ['a', 'b']}
+    """
+    distributions = {}
+    for identifier, values in search_space.items():
+        value_type = values["type"]
+
+        # scipy.stats.randint excludes its upper bound, skopt.Integer includes it
+        if value_type == "Integer":
+            distributions[identifier] = stats.randint(values["low"], values["high"] + 1)
+
+        # Matches skopt's 'prior' parameter; Uniform by default
+        elif value_type == "Real":
+            if values.get("prior") == "log-uniform":
+                distributions[identifier] = stats.loguniform(values["low"], values["high"])
+            else:
+                distributions[identifier] = stats.uniform(
+                    values["low"], values["high"] - values["low"]
+                )
+
+        elif value_type == "Categorical":
+            distributions[identifier] = list(values["categories"])
+
+    return distributions
+
+
+def _hyperband_brackets(
+    min_resources: int, max_resources: int, factor: int
+) -> List[Tuple[int, int]]:
+    """
+    Computes the Hyperband brackets as (n_candidates, min_resources) pairs.
+
+    Each bracket is one successive halving run. The first bracket starts many
+    candidates on the smallest budget, the last one evaluates a few candidates
+    on the full budget only (plain random search).
+
+    Parameters
+    ----------
+    min_resources: int
+        Smallest budget a candidate is evaluated with.
+
+    max_resources: int
+        Full budget.
+
+    factor: int
+        Halving factor; 1/factor of the candidates survive each round.
+
+    Returns
+    -------
+    List[Tuple[int, int]]
+        Number of candidates and starting budget of every bracket.
+    """
+    # Largest s with min_resources * factor**s <= max_resources; Integer loop
+    # instead of math.log, which rounds exact powers down (log(27, 3) < 3)
+    s_max = 0
+    while min_resources * factor ** (s_max + 1) <= max_resources:
+        s_max += 1
+
+    brackets = []
+    for s in range(s_max, -1, -1):
+        n_candidates = int(np.ceil((s_max + 1) / (s + 1) * factor**s))
+        brackets.append((n_candidates, max(min_resources, int(max_resources / factor**s))))
+
+    return brackets
+
+
+def _search_history_path(
+    table_name: Optional[str] = None, model_config_path: Optional[str] = None
+) -> Optional[str]:
+    """
+    Returns the Bayes search history file next to the model output.
+    None when the output directory is not configured (OUTPUT_PATH, table or
+    model config missing), in which case no history is kept.
+    """
+    table_name = table_name or os.getenv("TARGET_TABLE")
+    model_config_path = model_config_path or os.getenv("MODEL_CONFIG_PATH")
+    if not (os.getenv("OUTPUT_PATH") and table_name and model_config_path):
+        return None
+
+    return os.path.join(
+        _output_dir(table_name, model_config_path), "search_history.jsonl"
+    )
+
+
+def _load_search_history(history_path: str) -> List[Dict]:
+    """
+    Reads every record of a search history file; Empty when it does not exist.
+    """
+    if not os.path.exists(history_path):
+        return []
+
+    with open(history_path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def _append_search_history(history_path: str, record: Dict):
+    """
+    Appends one record to a search history file.
+    Flushed immediately so a preempted Job keeps every finished evaluation.
+    """
+    os.makedirs(os.path.dirname(history_path), exist_ok=True)
+    with open(history_path, "a") as f:
+        f.write(json.dumps(record, default=_to_builtin) + "\n")
+        f.flush()
+
+
+def _plan_search_history(history: List[Dict], options: Dict) -> Tuple[str, List, List]:
+    """
+    Splits a search history into points to resume and points to seed with.
+
+    If the most recent run never completed and 'resume_search' is enabled, its
+    points are resumed: They count towards 'bayes_search_n_iters' and are
+    candidates for the best model. Points of every other run only seed the
+    optimizer, capped at the 'max_prior_points' most recent ones.
+
+    Parameters
+    ----------
+    history: List[Dict]
+        Records read by '_load_search_history'
+
+    options: Dict
+        Defined in configurations/global_configurations.yml under key 'global_configurations'
+
+    Returns
+    -------
+    Tuple[str, List, List]
+        Run id of this search, resumed points and seed points.
+    """
+    completed = {r["run_id"] for r in history if r.get("completed")}
+    points = [r for r in history if "params" in r]
+
+    run_id = None
+    if points and options.get("resume_search", True):
+        last_run = points[-1]["run_id"]
+        if last_run not in completed:
+            run_id = last_run
+
+    resumed = [p for p in points if p["run_id"] == run_id]
+    seeds = [p for p in points if p["run_id"] != run_id]
+
+    max_prior_points = options.get("max_prior_points", 50)
+    seeds = seeds[-max_prior_points:] if max_prior_points else []
+
+    return run_id or uuid.uuid4().hex, resumed, seeds
+
+
+class _PersistentBayesSearchCV(BayesSearchCV):
+    """
+    BayesSearchCV that records every evaluated point and can be seeded with
+    earlier observations.
+
+    'history_path', 'run_id' and 'prior_observations' are set on the instance
+    before fitting. They are deliberately not constructor parameters, so
+    get_params/clone behave exactly like BayesSearchCV.
+    """
+
+    history_path = None
+    run_id = None
+    prior_observations = ()
+
+    def _make_optimizer(self, params_space):
+        optimizer = super()._make_optimizer(params_space)
+
+        # skopt orders dimensions by sorted parameter name
+        names = sorted(params_space.keys())
+        points, values = [], []
+        for observation in self.prior_observations:
+            params, score = observation["params"], observation["score"]
+
+            # Skip points of an older search space or failed fits
+            if sorted(params) != names or score is None or np.isnan(score):
+                continue
+
+            point = [params[name] for name in names]
+            if point in optimizer.space:
+                points.append(point)
+                values.append(-score)  # Optimizer minimizes, scores are maximized
+
+        if points:
+            optimizer.tell(points, values)
+            logger.info(f"Seeded Bayes optimizer with {len(points)} prior observations")
+
+        return optimizer
+
+    def _run_search(self, evaluate_candidates):
+        def _recording_evaluate(candidate_params, *args, **kwargs):
+            results = evaluate_candidates(candidate_params, *args, **kwargs)
+
+            # The newest candidates are the last entries of the results
+            if self.history_path:
+                n_results = len(results["params"])
+                for i in range(n_results - len(candidate_params), n_results):
+                    _append_search_history(
+                        self.history_path,
+                        {
+                            "run_id": self.run_id,
+                            "params": results["params"][i],
+                            "score": results["mean_test_score"][i],
+                            "fit_time": results["mean_fit_time"][i],
+                        },
+                    )
+
+            return results
+
+        super()._run_search(_recording_evaluate)
+
+
 def _get_model_class(class_path: str) -> Type[BaseEstimator]:
     """
     Imports and returns a class from a dotted string path.
@@ -220,10 +1479,16 @@ def _init_model(
         model_config["data_encoding"] = "none"
         logger.debug("Added categorical cat_features")
 
+    # Estimator threads are capped when jobs or search candidates already run in parallel
+    if "n_jobs" in model_params and "estimator_n_jobs" in options:
+        model_params["n_jobs"] = options["estimator_n_jobs"]
+
     return model_class(random_state=options["random_state"], **model_params)
 
 
-def _build_preprocessor(X_train: pd.DataFrame, model_config: dict) -> ColumnTransformer:
+def _build_preprocessor(
+    X_train: pd.DataFrame, model_config: dict, n_jobs: int = -1
+) -> ColumnTransformer:
     """
     Creates dataset transformation object.
 
@@ -243,6 +1508,9 @@ def _build_preprocessor(X_train: pd.DataFrame, model_config: dict) -> ColumnTran
         Used to check datset how dataset should be encoded, as well as if the dataset requires scaling.
         Defined in conf/base/parameters_model_config/*.yml under key 'model_params'
 
+    n_jobs: int
+        Number of transformers fit in parallel; -1 uses every core.
+
     Returns
     -------
     ColumnTransformer
@@ -253,9 +1521,7 @@ def _build_preprocessor(X_train: pd.DataFrame, model_config: dict) -> ColumnTran
     categorical_cols = X_train.select_dtypes(
         include=["object", "category"]
     ).columns.tolist()
-    numerical_cols = X_train.select_dtypes(
-        include=["int64", "float64"]
-    ).columns.tolist()
+    numerical_cols = X_train.select_dtypes(include="number").columns.tolist()
 
     preprocessing_steps = []
     data_encoding = model_config.get(
@@ -296,6 +1562,6 @@ def _build_preprocessor(X_train: pd.DataFrame, model_config: dict) -> ColumnTran
     return ColumnTransformer(
         transformers=preprocessing_steps,
         remainder="passthrough",
-        n_jobs=-1,
+        n_jobs=n_jobs,
         verbose_feature_names_out=False,
     )
@@ -3,6 +3,11 @@ import psycopg2
 
 POSTGRES_PASS = os.getenv('POSTGRES_PASS')
 
+# Index on created_at for the monitoring backend's recent-window reads
+# "btree" on (created_at, entry_id) serves ORDER BY created_at DESC LIMIT n and keyset reads
+# "brin" is a few pages in size for append-only tables, but only serves range scans (WHERE created_at > ...)
+CREATED_AT_INDEX = os.getenv('CREATED_AT_INDEX', 'btree').lower()
+
 clean_data_path = os.path.join(os.getcwd(), "data", "kaggle_dataset_clean")
 
 for file in os.listdir(clean_data_path):
@@ -39,6 +44,14 @@ for file in os.listdir(clean_data_path):
 
         print(f"Successfully added {file} data to postgres db")
 
+        # Index after loading: Building it once is faster than updating it on every copied row
+        if CREATED_AT_INDEX == "brin":
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_created_at_brin ON {table_name} USING BRIN (created_at);")
+        else:
+            cursor.execute(f"CREATE INDEX IF NOT EXISTS {table_name}_created_at_entry_id_idx ON {table_name} (created_at, entry_id);")
+        cursor.execute(f"ANALYZE {table_name};")
+        print(f"Successfully indexed {table_name} on created_at ({CREATED_AT_INDEX})")
+
 with psycopg2.connect(user="admin", password=POSTGRES_PASS, host="127.0.0.1", port="5432", database="sensor-db") as conn:
     cursor = conn.cursor()
     cursor.execute("SELECT table_name FROM information_schema.tables WHERE table_type = 'BASE TABLE' AND table_schema NOT IN ('pg_catalog', 'information_schema', 'pg_toast');")